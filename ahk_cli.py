@@ -0,0 +1,131 @@
+"""
+AHK CLI - headless runner for macros, scripts and hotkeys
+Description: Command-line front end to the Automation API for unattended machines;
+starts without the GUI toolkit, PIL or OpenCV
+
+Usage:
+    python -m ahk_cli run-macro macro.ahkm [--speed 2] [--fast] [--repeat 3]
+    python -m ahk_cli run-script script.ahk [--timeout 30]
+    python -m ahk_cli serve-hotkeys [profile.json]
+    python -m ahk_cli bench-startup
+"""
+
+import argparse
+import sys
+import time
+
+from automation_api import Automation, load_hotkeys
+from config_store import default_hotkeys_path
+
+# Modules a headless start must not pull in
+GUI_MODULES = ("customtkinter", "PIL", "cv2")
+
+
+def cmd_run_macro(api, args):
+    for i in range(args.repeat):
+        report = api.play_macro(args.file, speed=args.speed, fast=args.fast)
+        if report.error:
+            print(f"Playback failed: {report.error}", file=sys.stderr)
+            return 1
+        stats = report.stats()
+        print(f"Run {i + 1}/{args.repeat}: {stats['events']} events in {report.elapsed_ns / 1e9:.2f}s, "
+              f"timing error p99 {stats['p99_ms']:.3f} ms")
+    return 0
+
+
+def cmd_run_script(api, args):
+    output = api.run_script(args.file, timeout=args.timeout)
+    if output:
+        print(output, end="" if output.endswith("\n") else "\n")
+    return 0
+
+
+def cmd_serve_hotkeys(api, args):
+    hotkeys = load_hotkeys(args.file)
+    source = args.file or default_hotkeys_path()
+    if not hotkeys:
+        print(f"No hotkeys found in {source}", file=sys.stderr)
+        return 1
+    print(f"Serving {len(hotkeys)} hotkeys from {source}; press Ctrl+C to stop")
+    api.serve_hotkeys(hotkeys)
+    return 0
+
+
+def startup_benchmark(runs=5):
+    """Median cold-start time (s) of importing the GUI vs starting the headless CLI"""
+    import os
+    import statistics
+    import subprocess
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    probe = "import sys; print(','.join(m for m in {mods} if m in sys.modules))"
+    commands = {
+        "gui": [sys.executable, "-c", "import ahk_gui; " + probe.format(mods=GUI_MODULES)],
+        "headless": [sys.executable, "-c", "import ahk_cli; " + probe.format(mods=GUI_MODULES)],
+    }
+    results = {}
+    for name, command in commands.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run(command, cwd=here, capture_output=True, text=True, check=True)
+            times.append(time.perf_counter() - start)
+        results[name] = {"median_s": statistics.median(times), "min_s": min(times),
+                         "gui_modules_loaded": proc.stdout.strip() or "none"}
+    return results
+
+
+def cmd_bench_startup(api, args):
+    for name, r in startup_benchmark(args.runs).items():
+        print(f"{name:<9} median {r['median_s'] * 1000:7.1f} ms  min {r['min_s'] * 1000:7.1f} ms  "
+              f"GUI modules loaded: {r['gui_modules_loaded']}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ahk_cli", description="Run AHK automation without the GUI")
+    parser.add_argument("--ahk-path", help="path to AutoHotkey.exe (default: PATH / AHK_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run-macro", help="play a recorded macro (.ahkm or .json)")
+    p.add_argument("file")
+    p.add_argument("--speed", type=float, default=1.0, help="playback speed, 0.5 to 10")
+    p.add_argument("--fast", action="store_true", help="ignore timing and play as fast as possible")
+    p.add_argument("--repeat", type=int, default=1)
+    p.set_defaults(func=cmd_run_macro)
+
+    p = sub.add_parser("run-script", help="run an AHK script file and print its output")
+    p.add_argument("file")
+    p.add_argument("--timeout", type=int, default=None, help="seconds before the script is killed")
+    p.set_defaults(func=cmd_run_script)
+
+    p = sub.add_parser("serve-hotkeys", help="register a hotkey table and keep it active")
+    p.add_argument("file", nargs="?", default=None,
+                   help="hotkey profile (default: the GUI's saved hotkeys)")
+    p.set_defaults(func=cmd_serve_hotkeys)
+
+    p = sub.add_parser("bench-startup", help="compare GUI and headless cold start times")
+    p.add_argument("--runs", type=int, default=5)
+    p.set_defaults(func=cmd_bench_startup, needs_ahk=False)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    api = None
+    try:
+        if getattr(args, "needs_ahk", True):
+            api = Automation(ahk_path=args.ahk_path)
+        return args.func(api, args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if api:
+            api.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
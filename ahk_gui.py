@@ -4,17 +4,31 @@ Author: Claude
 Description: Dynamic GUI that flexes the power of Python with full AHK integration
 """
 
+import startup_profile
+startup_profile.install()
+
 import customtkinter as ctk
-from ahk import AHK
 import threading
 import time
-import json
 import os
+import re
 from datetime import datetime
+from functools import cached_property
 from tkinter import messagebox, scrolledtext
-import pyperclip
-from PIL import Image, ImageGrab
-import psutil
+from automation_api import Automation
+from click_sequence import ClickStep, format_click_list, parse_click_list
+from config_store import ConfigStore
+from key_combo import compile_send
+from macro_recorder import EventBuffer, MacroRecorder
+from virtual_list import VirtualList
+from event_view import EVENT_FILTERS, EventView
+from command_executor import CommandExecutor, LagMonitor
+from log_sink import LogSink
+from script_manager import MAX_OUTPUT_LINES
+
+# ahk, NumPy, OpenCV, psutil and pyperclip are imported where first used so the
+# window can paint before they load; the startup report shows what each costs
+startup_profile.mark("module imports")
 
 # Initialize CustomTkinter
 ctk.set_appearance_mode("dark")
@@ -23,13 +37,14 @@ ctk.set_default_color_theme("blue")
 class PythonAHKGUI(ctk.CTk):
     def __init__(self):
         super().__init__()
+        startup_profile.mark("Tk root window")
 
-        # Initialize AHK
-        try:
-            self.ahk = AHK()
-        except Exception as e:
-            messagebox.showerror("AHK Error", f"Failed to initialize AutoHotkey: {str(e)}\n\nPlease ensure AutoHotkey is installed.")
-            self.ahk = None
+        # AHK starts in the background (see start_ahk); until then self.ahk is None
+        self.ahk = None
+        self.api = None
+        self.typing_engine = None
+        self.hotkey_engine = None
+        self.window_registry = None
 
         # Configure window
         self.title("Python AHK Power GUI")
@@ -37,15 +52,109 @@ class PythonAHKGUI(ctk.CTk):
 
         # Variables
         self.hotkeys = {}
-        self.running_scripts = []
-        self.recorded_actions = []
+        self.script_rows = []
+        self._script_refresh_scheduled = False
+        self.recorded_actions = EventBuffer()
+        self.recorded_view = EventView(self.recorded_actions)
+        self.recorder = None
+        self.macro_writer = None
+        self.player = None
+        self._watch_status_pending = False
+        self.window_rows = []
+        self.selected_window = None
+        self.process_page = 0
+        # Views to redraw once the process index has its first snapshot
+        self._process_redraws = set()
         self.is_recording = False
+        self.executor = CommandExecutor(dispatch=lambda fn, *args: self.after(0, fn, *args))
+        self.lag_monitor = LagMonitor(self.after)
+        # Hotkeys persist to the per-user config dir, written in the background
+        self.config_store = ConfigStore()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Create UI
         self.create_widgets()
+        startup_profile.mark("first tab built")
+        self.lag_monitor.start()
+        self.update_executor_status()
 
-        # Load saved hotkeys
+        # Load saved hotkeys; they are registered once AHK is up
         self.load_hotkeys()
+        threading.Thread(target=self.start_ahk, name="AHKStartup", daemon=True).start()
+        self.after(500, self.clipboard_watcher.start)
+        self.after(0, startup_profile.mark, "event loop running")
+
+    def start_ahk(self):
+        """Create the AHK connection and engines off the Tk thread"""
+        try:
+            api = Automation(on_typing_progress=self.on_typing_progress)
+            # The first call spawns the AHK daemon process; pay for it here, not on a click
+            api.ahk.mouse_position
+            startup_profile.mark("AutoHotkey ready")
+            self.after(0, self.on_ahk_ready, api, None)
+        except Exception as e:
+            self.after(0, self.on_ahk_ready, None, e)
+
+    def on_ahk_ready(self, api, error):
+        if error is not None:
+            messagebox.showerror("AHK Error", f"Failed to initialize AutoHotkey: {str(error)}\n\nPlease ensure AutoHotkey is installed.")
+            return
+        # Headless automation layer; the GUI is a front end over it
+        self.api = api
+        self.typing_engine = api.typing
+        self.hotkey_engine = api.hotkeys
+        self.window_registry = api.windows
+        self.ahk = api.ahk
+        api.scripts.on_output = self.on_script_output
+        api.scripts.on_exit = self.on_script_exit
+        self.register_hotkeys()
+
+    @property
+    def running_scripts(self):
+        """ScriptRun per id for every script started from the Scripts tab"""
+        return self.api.scripts.runs if self.api else {}
+
+    # Services below load NumPy/OpenCV/psutil, so they are created on first use
+
+    @cached_property
+    def screen_capture(self):
+        from screen_capture import ScreenCapture
+        return ScreenCapture()
+
+    @cached_property
+    def image_searcher(self):
+        from image_search import ImageSearcher
+        return ImageSearcher(capture=self.screen_capture)
+
+    @cached_property
+    def screen_watcher(self):
+        from screen_watch import ScreenWatcher
+        return ScreenWatcher(self.screen_capture)
+
+    @cached_property
+    def screenshots(self):
+        from screenshot_pipeline import ScreenshotPipeline
+        return ScreenshotPipeline(self.screen_capture)
+
+    @cached_property
+    def clipboard_watcher(self):
+        from clipboard_history import ClipboardHistory, ClipboardWatcher
+        return ClipboardWatcher(ClipboardHistory(),
+                                on_change=lambda entry: self.after(0, self.update_clipboard_history))
+
+    @cached_property
+    def process_index(self):
+        from process_index import ProcessIndex
+        index = ProcessIndex(on_change=lambda delta: self.after(0, self.on_process_index_change))
+        index.start()
+        return index
+
+    @cached_property
+    def system_monitor(self):
+        from system_monitor import SystemMonitor
+        monitor = SystemMonitor(process_index=self.process_index)
+        monitor.start()
+        return monitor
 
     def create_widgets(self):
         """Create all GUI widgets"""
@@ -57,6 +166,10 @@ class PythonAHKGUI(ctk.CTk):
         self.tabview = ctk.CTkTabview(self, width=1180, height=780)
         self.tabview.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
 
+        # Status bar: background AHK commands and UI responsiveness
+        self.executor_status = ctk.CTkLabel(self, text="", anchor="w", font=ctk.CTkFont(size=12))
+        self.executor_status.grid(row=1, column=0, padx=15, pady=(0, 5), sticky="ew")
+
         # Add tabs
         self.tab_hotkeys = self.tabview.add("Hotkeys")
         self.tab_mouse = self.tabview.add("Mouse Control")
@@ -67,15 +180,33 @@ class PythonAHKGUI(ctk.CTk):
         self.tab_recorder = self.tabview.add("Macro Recorder")
         self.tab_system = self.tabview.add("System")
 
-        # Setup each tab
-        self.setup_hotkeys_tab()
-        self.setup_mouse_tab()
-        self.setup_keyboard_tab()
-        self.setup_windows_tab()
-        self.setup_advanced_tab()
-        self.setup_scripts_tab()
-        self.setup_recorder_tab()
-        self.setup_system_tab()
+        # Only the visible tab is built now; the rest on first activation
+        self._tab_builders = {
+            "Hotkeys": self.setup_hotkeys_tab,
+            "Mouse Control": self.setup_mouse_tab,
+            "Keyboard": self.setup_keyboard_tab,
+            "Windows": self.setup_windows_tab,
+            "Advanced": self.setup_advanced_tab,
+            "Scripts": self.setup_scripts_tab,
+            "Macro Recorder": self.setup_recorder_tab,
+            "System": self.setup_system_tab,
+        }
+        self.built_tabs = set()
+        self.tabview.configure(command=self.on_tab_changed)
+        self.build_tab(self.tabview.get())
+
+    def build_tab(self, name):
+        """Build a tab's widgets the first time it is shown"""
+        builder = self._tab_builders.pop(name, None)
+        if builder is None:
+            return
+        start = time.perf_counter()
+        builder()
+        self.built_tabs.add(name)
+        startup_profile.mark(f"built tab '{name}' in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def on_tab_changed(self):
+        self.build_tab(self.tabview.get())
 
     def setup_hotkeys_tab(self):
         """Setup hotkeys management tab"""
@@ -117,6 +248,8 @@ class PythonAHKGUI(ctk.CTk):
                      fg_color="red", hover_color="darkred").pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Clear All", command=self.clear_hotkeys,
                      fg_color="orange", hover_color="darkorange").pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Import...", command=self.import_hotkeys).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Export...", command=self.export_hotkeys).pack(side="left", padx=5)
 
         # Hotkeys list
         list_frame = ctk.CTkFrame(self.tab_hotkeys)
@@ -127,6 +260,12 @@ class PythonAHKGUI(ctk.CTk):
 
         self.hotkeys_listbox = ctk.CTkTextbox(list_frame, height=300)
         self.hotkeys_listbox.pack(fill="both", expand=True, padx=10, pady=10)
+        self.hotkeys_log = LogSink(self.hotkeys_listbox, self.after, follow=False)
+
+        self.hotkey_overhead = ctk.CTkLabel(list_frame, text="Hotkey dispatch overhead: no triggers yet",
+                                           font=ctk.CTkFont(size=12))
+        self.hotkey_overhead.pack(pady=5)
+        self.after(1000, self.update_hotkey_overhead)
 
     def setup_mouse_tab(self):
         """Setup mouse control tab"""
@@ -157,6 +296,20 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkButton(coord_frame, text="Move Mouse",
                      command=self.move_mouse).pack(side="left", padx=5)
 
+        path_frame = ctk.CTkFrame(pos_frame)
+        path_frame.pack(pady=5)
+
+        ctk.CTkLabel(path_frame, text="Path:").pack(side="left", padx=5)
+        self.mouse_path_style = ctk.CTkComboBox(path_frame, values=["Instant", "Linear", "Bezier", "Human"],
+                                                width=110)
+        self.mouse_path_style.set("Human")
+        self.mouse_path_style.pack(side="left", padx=5)
+
+        ctk.CTkLabel(path_frame, text="Speed:").pack(side="left", padx=5)
+        self.mouse_speed = ctk.CTkEntry(path_frame, width=60)
+        self.mouse_speed.insert(0, "1.0")
+        self.mouse_speed.pack(side="left", padx=5)
+
         # Click frame
         click_frame = ctk.CTkFrame(self.tab_mouse)
         click_frame.pack(pady=10, padx=20, fill="x")
@@ -219,9 +372,28 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkButton(wheel_frame, text="Scroll Down",
                      command=lambda: self.mouse_wheel("down")).pack(side="left", padx=5)
 
+        # Click list: one "x, y, button, count, delay_ms" step per line, run as a single script
+        click_list_frame = ctk.CTkFrame(adv_frame)
+        click_list_frame.pack(pady=5, fill="x", padx=10)
+
+        ctk.CTkLabel(click_list_frame, text="Click List (x, y, button, count, delay ms):").pack(anchor="w", padx=5)
+        self.click_list = ctk.CTkTextbox(click_list_frame, height=90)
+        self.click_list.pack(pady=5, padx=5, fill="x")
+
+        click_list_btns = ctk.CTkFrame(click_list_frame)
+        click_list_btns.pack(pady=5)
+
+        ctk.CTkButton(click_list_btns, text="Add Current Position",
+                     command=self.add_click_position).pack(side="left", padx=5)
+        ctk.CTkButton(click_list_btns, text="Run Click List",
+                     command=self.run_click_list).pack(side="left", padx=5)
+        ctk.CTkButton(click_list_btns, text="Clear",
+                     command=lambda: self.click_list.delete("1.0", "end")).pack(side="left", padx=5)
+
         # Status
         self.mouse_status = ctk.CTkTextbox(adv_frame, height=100)
         self.mouse_status.pack(pady=10, padx=10, fill="both", expand=True)
+        self.mouse_log = LogSink(self.mouse_status, self.after, timestamps=True)
 
     def setup_keyboard_tab(self):
         """Setup keyboard automation tab"""
@@ -247,10 +419,21 @@ class PythonAHKGUI(ctk.CTk):
         self.type_delay.insert(0, "50")
         self.type_delay.pack(side="left", padx=5)
 
+        ctk.CTkLabel(btn_frame, text="Mode:").pack(side="left", padx=5)
+        self.send_mode = ctk.CTkComboBox(btn_frame, values=["Auto", "Type", "Paste"], width=90)
+        self.send_mode.set("Auto")
+        self.send_mode.pack(side="left", padx=5)
+
         ctk.CTkButton(btn_frame, text="Send Text",
                      command=self.send_text).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Send Raw",
                      command=self.send_raw_text).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Cancel Typing", command=self.cancel_typing,
+                     fg_color="red", hover_color="darkred").pack(side="left", padx=5)
+
+        self.typing_status = ctk.CTkLabel(text_frame, text="Typing: idle",
+                                          font=ctk.CTkFont(size=12))
+        self.typing_status.pack(pady=5)
 
         # Send keys
         keys_frame = ctk.CTkFrame(self.tab_keyboard)
@@ -283,7 +466,7 @@ class PythonAHKGUI(ctk.CTk):
 
         ctk.CTkLabel(combo_frame, text="Key Combo:").pack(side="left", padx=5)
         self.key_combo = ctk.CTkEntry(combo_frame, width=200,
-                                      placeholder_text="e.g., Ctrl+C, Alt+Tab")
+                                      placeholder_text="e.g., Ctrl+C or Ctrl+K, Ctrl+C")
         self.key_combo.pack(side="left", padx=5)
         ctk.CTkButton(combo_frame, text="Send Combo",
                      command=self.send_combo).pack(side="left", padx=5)
@@ -308,6 +491,29 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkButton(clip_btn_frame, text="Clear Clipboard",
                      command=self.clear_clipboard).pack(side="left", padx=5)
 
+        # Clipboard history
+        history_frame = ctk.CTkFrame(clip_frame)
+        history_frame.pack(pady=5, padx=10, fill="both", expand=True)
+
+        search_frame = ctk.CTkFrame(history_frame)
+        search_frame.pack(pady=5, fill="x")
+
+        ctk.CTkLabel(search_frame, text="History:").pack(side="left", padx=5)
+        self.clipboard_search = ctk.CTkEntry(search_frame, width=250, placeholder_text="Search copied text")
+        self.clipboard_search.pack(side="left", padx=5)
+        self.clipboard_search.bind("<KeyRelease>", lambda e: self.update_clipboard_history())
+        ctk.CTkButton(search_frame, text="Clear History", width=100,
+                     command=self.clear_clipboard_history).pack(side="left", padx=5)
+        self.clipboard_history_status = ctk.CTkLabel(search_frame, text="")
+        self.clipboard_history_status.pack(side="left", padx=10)
+
+        self.clipboard_rows = []
+        self.clipboard_list = VirtualList(history_frame, self.clipboard_row_text, height=120,
+                                          on_select=self.select_clipboard_entry,
+                                          on_activate=self.copy_clipboard_entry)
+        self.clipboard_list.pack(pady=5, fill="both", expand=True)
+        self.update_clipboard_history()
+
     def setup_windows_tab(self):
         """Setup window management tab"""
         title = ctk.CTkLabel(self.tab_windows, text="Window Management",
@@ -321,9 +527,27 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkLabel(list_frame, text="Active Windows",
                     font=ctk.CTkFont(size=14, weight="bold")).pack(pady=5)
 
-        self.windows_list = ctk.CTkTextbox(list_frame, height=200)
+        filter_frame = ctk.CTkFrame(list_frame)
+        filter_frame.pack(pady=5, fill="x", padx=10)
+
+        ctk.CTkLabel(filter_frame, text="Filter:").pack(side="left", padx=5)
+        self.window_filter = ctk.CTkEntry(filter_frame, width=300,
+                                          placeholder_text="text, re:pattern, ahk_exe name.exe")
+        self.window_filter.pack(side="left", padx=5)
+        self.window_filter.bind("<KeyRelease>", lambda e: self.update_windows_list())
+
+        self.show_hidden_windows = ctk.CTkCheckBox(filter_frame, text="Include Hidden",
+                                                   command=self.update_windows_list)
+        self.show_hidden_windows.pack(side="left", padx=5)
+
+        self.windows_list = VirtualList(list_frame, self.window_row_text, height=200,
+                                        on_select=self.select_window,
+                                        on_activate=lambda i: self.activate_window())
         self.windows_list.pack(pady=5, padx=10, fill="both", expand=True)
 
+        self.windows_status = ctk.CTkLabel(list_frame, text="")
+        self.windows_status.pack(pady=2)
+
         ctk.CTkButton(list_frame, text="Refresh Windows List",
                      command=self.refresh_windows).pack(pady=5)
 
@@ -408,6 +632,29 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkButton(img_input_frame, text="Search Screen",
                      command=self.image_search).pack(side="left", padx=5)
 
+        img_opts_frame = ctk.CTkFrame(img_frame)
+        img_opts_frame.pack(pady=5, fill="x", padx=10)
+
+        ctk.CTkLabel(img_opts_frame, text="Threshold:").pack(side="left", padx=5)
+        self.image_threshold = ctk.CTkEntry(img_opts_frame, width=60)
+        self.image_threshold.insert(0, "0.8")
+        self.image_threshold.pack(side="left", padx=5)
+
+        ctk.CTkLabel(img_opts_frame, text="Region (x,y,w,h):").pack(side="left", padx=5)
+        self.image_region = ctk.CTkEntry(img_opts_frame, width=160,
+                                         placeholder_text="whole screen")
+        self.image_region.pack(side="left", padx=5)
+
+        self.image_multiscale = ctk.CTkCheckBox(img_opts_frame, text="Multi-scale")
+        self.image_multiscale.pack(side="left", padx=10)
+
+        self.image_color = ctk.CTkCheckBox(img_opts_frame, text="Match Color")
+        self.image_color.pack(side="left", padx=10)
+
+        self.image_result = ctk.CTkLabel(img_frame, text="Matches: ",
+                                         font=ctk.CTkFont(size=12))
+        self.image_result.pack(pady=5)
+
         # Pixel color detection
         pixel_frame = ctk.CTkFrame(self.tab_advanced)
         pixel_frame.pack(pady=10, padx=20, fill="x")
@@ -433,6 +680,73 @@ class PythonAHKGUI(ctk.CTk):
                                          font=ctk.CTkFont(size=12))
         self.pixel_result.pack(pady=5)
 
+        # Screen watch
+        watch_frame = ctk.CTkFrame(self.tab_advanced)
+        watch_frame.pack(pady=10, padx=20, fill="x")
+
+        ctk.CTkLabel(watch_frame, text="Screen Watch",
+                    font=ctk.CTkFont(size=14, weight="bold")).pack(pady=5)
+
+        watch_input_frame = ctk.CTkFrame(watch_frame)
+        watch_input_frame.pack(pady=5, fill="x", padx=10)
+
+        ctk.CTkLabel(watch_input_frame, text="Region (x,y,w,h):").pack(side="left", padx=5)
+        self.watch_region = ctk.CTkEntry(watch_input_frame, width=140)
+        self.watch_region.pack(side="left", padx=5)
+
+        self.watch_mode = ctk.CTkComboBox(watch_input_frame, width=190,
+                                          values=["Wait for Color", "Wait for Change",
+                                                  "Wait for Change (Hash)"])
+        self.watch_mode.pack(side="left", padx=5)
+
+        ctk.CTkLabel(watch_input_frame, text="Color:").pack(side="left", padx=5)
+        self.watch_color = ctk.CTkEntry(watch_input_frame, width=90, placeholder_text="#00ff00")
+        self.watch_color.pack(side="left", padx=5)
+
+        ctk.CTkLabel(watch_input_frame, text="Tolerance:").pack(side="left", padx=5)
+        self.watch_tolerance = ctk.CTkEntry(watch_input_frame, width=50)
+        self.watch_tolerance.insert(0, "10")
+        self.watch_tolerance.pack(side="left", padx=5)
+
+        ctk.CTkLabel(watch_input_frame, text="Fraction:").pack(side="left", padx=5)
+        self.watch_fraction = ctk.CTkEntry(watch_input_frame, width=50)
+        self.watch_fraction.insert(0, "0.5")
+        self.watch_fraction.pack(side="left", padx=5)
+
+        ctk.CTkLabel(watch_input_frame, text="Hash Bits:").pack(side="left", padx=5)
+        self.watch_hash_bits = ctk.CTkEntry(watch_input_frame, width=50)
+        self.watch_hash_bits.insert(0, "8")
+        self.watch_hash_bits.pack(side="left", padx=5)
+
+        watch_action_frame = ctk.CTkFrame(watch_frame)
+        watch_action_frame.pack(pady=5, fill="x", padx=10)
+
+        ctk.CTkLabel(watch_action_frame, text="Then:").pack(side="left", padx=5)
+        self.watch_action = ctk.CTkComboBox(watch_action_frame, width=150,
+                                            values=["Notify", "Send Text", "Run Script",
+                                                    "Mouse Click", "Open Program", "Custom AHK"])
+        self.watch_action.pack(side="left", padx=5)
+
+        self.watch_value = ctk.CTkEntry(watch_action_frame, width=200, placeholder_text="Action value...")
+        self.watch_value.pack(side="left", padx=5)
+
+        self.watch_repeat = ctk.CTkCheckBox(watch_action_frame, text="Repeat")
+        self.watch_repeat.pack(side="left", padx=5)
+
+        ctk.CTkLabel(watch_action_frame, text="Rate (Hz):").pack(side="left", padx=5)
+        self.watch_rate = ctk.CTkEntry(watch_action_frame, width=50)
+        self.watch_rate.insert(0, "10")
+        self.watch_rate.pack(side="left", padx=5)
+
+        ctk.CTkButton(watch_action_frame, text="Add Watch",
+                     command=self.add_screen_watch).pack(side="left", padx=5)
+        ctk.CTkButton(watch_action_frame, text="Clear Watches",
+                     command=self.clear_screen_watches).pack(side="left", padx=5)
+
+        self.watch_status = ctk.CTkTextbox(watch_frame, height=80)
+        self.watch_status.pack(pady=5, padx=10, fill="x")
+        self.watch_log = LogSink(self.watch_status, self.after, follow=False)
+
         # Screen capture
         capture_frame = ctk.CTkFrame(self.tab_advanced)
         capture_frame.pack(pady=10, padx=20, fill="x")
@@ -451,6 +765,36 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkButton(capture_btn_frame, text="Capture Screen",
                      command=self.capture_screen).pack(side="left", padx=5)
 
+        capture_opts_frame = ctk.CTkFrame(capture_frame)
+        capture_opts_frame.pack(pady=5)
+
+        ctk.CTkLabel(capture_opts_frame, text="Format:").pack(side="left", padx=5)
+        self.screenshot_format = ctk.CTkComboBox(capture_opts_frame, width=90,
+                                                 values=["png", "jpeg", "webp", "npy"])
+        self.screenshot_format.set("png")
+        self.screenshot_format.pack(side="left", padx=5)
+
+        ctk.CTkLabel(capture_opts_frame, text="Quality/Level:").pack(side="left", padx=5)
+        self.screenshot_quality = ctk.CTkEntry(capture_opts_frame, width=50)
+        self.screenshot_quality.insert(0, "1")
+        self.screenshot_quality.pack(side="left", padx=5)
+
+        ctk.CTkLabel(capture_opts_frame, text="Burst frames:").pack(side="left", padx=5)
+        self.burst_frames = ctk.CTkEntry(capture_opts_frame, width=50)
+        self.burst_frames.insert(0, "10")
+        self.burst_frames.pack(side="left", padx=5)
+
+        ctk.CTkLabel(capture_opts_frame, text="FPS:").pack(side="left", padx=5)
+        self.burst_fps = ctk.CTkEntry(capture_opts_frame, width=50)
+        self.burst_fps.insert(0, "5")
+        self.burst_fps.pack(side="left", padx=5)
+
+        ctk.CTkButton(capture_opts_frame, text="Burst",
+                     command=self.capture_burst).pack(side="left", padx=5)
+
+        self.capture_status = ctk.CTkLabel(capture_frame, text="", font=ctk.CTkFont(size=12))
+        self.capture_status.pack(pady=5)
+
         # Process management
         process_frame = ctk.CTkFrame(self.tab_advanced)
         process_frame.pack(pady=10, padx=20, fill="both", expand=True)
@@ -470,6 +814,26 @@ class PythonAHKGUI(ctk.CTk):
         ctk.CTkButton(proc_input_frame, text="List All Processes",
                      command=self.list_processes).pack(side="left", padx=5)
 
+        proc_list_frame = ctk.CTkFrame(process_frame)
+        proc_list_frame.pack(pady=5)
+
+        ctk.CTkLabel(proc_list_frame, text="Sort by:").pack(side="left", padx=5)
+        self.process_sort = ctk.CTkComboBox(proc_list_frame, width=90, values=["PID", "Name", "CPU", "RSS"],
+                                            command=lambda v: self.list_processes())
+        self.process_sort.set("PID")
+        self.process_sort.pack(side="left", padx=5)
+
+        self.process_descending = ctk.CTkCheckBox(proc_list_frame, text="Descending",
+                                                  command=self.list_processes)
+        self.process_descending.pack(side="left", padx=5)
+
+        ctk.CTkButton(proc_list_frame, text="< Prev", width=70,
+                     command=lambda: self.change_process_page(-1)).pack(side="left", padx=5)
+        self.process_page_label = ctk.CTkLabel(proc_list_frame, text="Page 1/1")
+        self.process_page_label.pack(side="left", padx=5)
+        ctk.CTkButton(proc_list_frame, text="Next >", width=70,
+                     command=lambda: self.change_process_page(1)).pack(side="left", padx=5)
+
         self.process_output = ctk.CTkTextbox(process_frame, height=150)
         self.process_output.pack(pady=5, padx=10, fill="both", expand=True)
 
@@ -524,6 +888,31 @@ return
         ctk.CTkButton(btn_frame, text="Load Script", command=self.load_script).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Clear", command=lambda: self.script_editor.delete("1.0", "end")).pack(side="left", padx=5)
 
+        ctk.CTkLabel(btn_frame, text="Timeout (s):").pack(side="left", padx=(15, 5))
+        self.script_timeout = ctk.CTkEntry(btn_frame, width=60, placeholder_text="none")
+        self.script_timeout.pack(side="left", padx=5)
+
+        # Running scripts
+        runs_frame = ctk.CTkFrame(self.tab_scripts)
+        runs_frame.pack(pady=10, padx=20, fill="x")
+
+        ctk.CTkLabel(runs_frame, text="Script Runs",
+                    font=ctk.CTkFont(size=14, weight="bold")).pack(pady=5)
+
+        self.script_runs_list = VirtualList(runs_frame, self.script_row_text, height=100)
+        self.script_runs_list.pack(pady=5, padx=10, fill="x")
+
+        runs_btn_frame = ctk.CTkFrame(runs_frame)
+        runs_btn_frame.pack(pady=5)
+
+        ctk.CTkButton(runs_btn_frame, text="Stop Selected",
+                     command=self.stop_selected_script).pack(side="left", padx=5)
+        ctk.CTkButton(runs_btn_frame, text="Clear Finished",
+                     command=self.clear_finished_scripts).pack(side="left", padx=5)
+
+        self.script_launch_status = ctk.CTkLabel(runs_frame, text="")
+        self.script_launch_status.pack(pady=2)
+
         # Output
         output_frame = ctk.CTkFrame(self.tab_scripts)
         output_frame.pack(pady=10, padx=20, fill="x")
@@ -533,6 +922,7 @@ return
 
         self.script_output = ctk.CTkTextbox(output_frame, height=100)
         self.script_output.pack(pady=5, padx=10, fill="x")
+        self.script_log = LogSink(self.script_output, self.after, max_lines=MAX_OUTPUT_LINES)
 
     def setup_recorder_tab(self):
         """Setup macro recorder tab"""
@@ -553,6 +943,10 @@ return
                      command=self.playback_macro,
                      fg_color="blue", hover_color="darkblue").pack(side="left", padx=5, pady=10)
 
+        ctk.CTkButton(control_frame, text="Stop Playback",
+                     command=self.stop_playback,
+                     fg_color="red", hover_color="darkred").pack(side="left", padx=5, pady=10)
+
         ctk.CTkButton(control_frame, text="Clear Recording",
                      command=self.clear_recording,
                      fg_color="orange", hover_color="darkorange").pack(side="left", padx=5, pady=10)
@@ -563,6 +957,9 @@ return
         ctk.CTkButton(control_frame, text="Load Macro",
                      command=self.load_macro).pack(side="left", padx=5, pady=10)
 
+        ctk.CTkButton(control_frame, text="Export JSON",
+                     command=self.export_macro_json).pack(side="left", padx=5, pady=10)
+
         # Options
         options_frame = ctk.CTkFrame(self.tab_recorder)
         options_frame.pack(pady=10, padx=20, fill="x")
@@ -579,6 +976,32 @@ return
         self.record_keyboard.pack(side="left", padx=10)
         self.record_keyboard.select()
 
+        self.record_stream = ctk.CTkCheckBox(options_frame, text="Stream to Disk")
+        self.record_stream.pack(side="left", padx=10)
+
+        # Mouse move decimation
+        decimate_frame = ctk.CTkFrame(self.tab_recorder)
+        decimate_frame.pack(pady=5, padx=20, fill="x")
+
+        ctk.CTkLabel(decimate_frame, text="Skip moves closer than (px):").pack(side="left", padx=5)
+        self.move_min_distance = ctk.CTkEntry(decimate_frame, width=60)
+        self.move_min_distance.insert(0, "0")
+        self.move_min_distance.pack(side="left", padx=5)
+
+        ctk.CTkLabel(decimate_frame, text="or sooner than (ms):").pack(side="left", padx=5)
+        self.move_min_interval = ctk.CTkEntry(decimate_frame, width=60)
+        self.move_min_interval.insert(0, "0")
+        self.move_min_interval.pack(side="left", padx=5)
+
+        ctk.CTkLabel(decimate_frame, text="Playback speed:").pack(side="left", padx=(20, 5))
+        self.playback_speed = ctk.CTkComboBox(decimate_frame, width=90,
+                                              values=["0.5x", "1x", "2x", "5x", "10x"])
+        self.playback_speed.set("1x")
+        self.playback_speed.pack(side="left", padx=5)
+
+        self.playback_fast = ctk.CTkCheckBox(decimate_frame, text="As fast as possible")
+        self.playback_fast.pack(side="left", padx=10)
+
         # Recorded actions display
         display_frame = ctk.CTkFrame(self.tab_recorder)
         display_frame.pack(pady=10, padx=20, fill="both", expand=True)
@@ -586,7 +1009,24 @@ return
         ctk.CTkLabel(display_frame, text="Recorded Actions",
                     font=ctk.CTkFont(size=14, weight="bold")).pack(pady=5)
 
-        self.recorded_display = ctk.CTkTextbox(display_frame, height=400)
+        view_frame = ctk.CTkFrame(display_frame)
+        view_frame.pack(pady=5, padx=10, fill="x")
+
+        ctk.CTkLabel(view_frame, text="Show:").pack(side="left", padx=5)
+        self.recorded_filter = ctk.CTkComboBox(view_frame, width=150, values=list(EVENT_FILTERS),
+                                               command=self.filter_recorded_actions)
+        self.recorded_filter.set("All events")
+        self.recorded_filter.pack(side="left", padx=5)
+
+        ctk.CTkLabel(view_frame, text="Jump to (s):").pack(side="left", padx=(20, 5))
+        self.recorded_jump = ctk.CTkEntry(view_frame, width=80)
+        self.recorded_jump.pack(side="left", padx=5)
+        self.recorded_jump.bind("<Return>", lambda e: self.jump_recorded_actions())
+        ctk.CTkButton(view_frame, text="Go", width=50,
+                     command=self.jump_recorded_actions).pack(side="left", padx=5)
+
+        # Rows are formatted from the event buffer only while on screen
+        self.recorded_display = VirtualList(display_frame, self.recorded_view.row_text, height=400)
         self.recorded_display.pack(pady=5, padx=10, fill="both", expand=True)
 
         # Status
@@ -596,6 +1036,9 @@ return
 
     def setup_system_tab(self):
         """Setup system information and control tab"""
+        from sparkline import Sparkline
+        from system_monitor import STAT_WINDOWS
+
         title = ctk.CTkLabel(self.tab_system, text="System Information & Control",
                             font=ctk.CTkFont(size=20, weight="bold"))
         title.pack(pady=10)
@@ -607,11 +1050,38 @@ return
         ctk.CTkLabel(info_frame, text="System Information",
                     font=ctk.CTkFont(size=14, weight="bold")).pack(pady=5)
 
+        graphs_frame = ctk.CTkFrame(info_frame)
+        graphs_frame.pack(pady=5, padx=10, fill="x")
+
+        self.system_graphs = {}
+        for column, (name, label) in enumerate((("cpu", "CPU"), ("memory", "Memory"),
+                                                ("disk", "Disk I/O"), ("net", "Network"))):
+            ctk.CTkLabel(graphs_frame, text=label).grid(row=0, column=column, padx=5)
+            graph = Sparkline(graphs_frame)
+            graph.grid(row=1, column=column, padx=5, pady=2)
+            value = ctk.CTkLabel(graphs_frame, text="", font=ctk.CTkFont(size=12))
+            value.grid(row=2, column=column, padx=5)
+            self.system_graphs[name] = (graph, value)
+
+        window_frame = ctk.CTkFrame(info_frame)
+        window_frame.pack(pady=5)
+
+        ctk.CTkLabel(window_frame, text="Stats Window:").pack(side="left", padx=5)
+        self.system_window = ctk.CTkComboBox(window_frame, width=80, values=list(STAT_WINDOWS),
+                                             command=lambda v: self.refresh_system_info())
+        self.system_window.set("1m")
+        self.system_window.pack(side="left", padx=5)
+
         self.system_info = ctk.CTkTextbox(info_frame, height=200)
         self.system_info.pack(pady=5, padx=10, fill="both", expand=True)
 
-        ctk.CTkButton(info_frame, text="Refresh System Info",
-                     command=self.refresh_system_info).pack(pady=5)
+        button_frame = ctk.CTkFrame(info_frame)
+        button_frame.pack(pady=5)
+
+        ctk.CTkButton(button_frame, text="Refresh System Info",
+                     command=self.refresh_system_info).pack(side="left", padx=5)
+        ctk.CTkButton(button_frame, text="Startup Report",
+                     command=self.show_startup_report).pack(side="left", padx=5)
 
         # Sound controls
         sound_frame = ctk.CTkFrame(self.tab_system)
@@ -654,6 +1124,26 @@ return
 
         # Initialize system info
         self.refresh_system_info()
+        self.after(500, self.update_system_monitor)
+
+    # ===== Background Commands =====
+
+    def run_command(self, fn, *args, on_done=None, error="Command failed", query=False):
+        """Run an AHK call on the executor; `on_done(result)` runs back on the Tk thread"""
+        submit = self.executor.run_query if query else self.executor.run_input
+        return submit(fn, *args, on_done=on_done,
+                      on_error=lambda e: messagebox.showerror("Error", f"{error}: {str(e)}"))
+
+    def update_executor_status(self):
+        """Show queued/running commands and event-loop lag in the status bar"""
+        stats = self.executor.stats()
+        lag = self.lag_monitor.stats()
+        ahk_state = "AHK: ready   " if self.ahk else "AHK: starting...   "
+        self.executor_status.configure(
+            text=f"{ahk_state}Input: {stats['input_running']} running, {stats['input_queued']} queued   "
+                 f"Queries: {stats['query_running']} running, {stats['query_queued']} queued   "
+                 f"UI lag p99: {lag['p99']:.0f} ms (max {lag['max']:.0f} ms)")
+        self.after(250, self.update_executor_status)
 
     # ===== Hotkey Methods =====
 
@@ -671,8 +1161,16 @@ return
             messagebox.showerror("AHK Error", "AutoHotkey not initialized")
             return
 
+        hotkeys = dict(self.hotkeys)
+        hotkeys[hotkey] = {"action": action, "value": value}
         try:
-            self.hotkeys[hotkey] = {"action": action, "value": value}
+            self.hotkey_engine.validate(hotkey, hotkeys[hotkey])
+        except ValueError as e:
+            messagebox.showerror("Error", f"Failed to add hotkey: {str(e)}")
+            return
+
+        def added(result):
+            self.hotkeys = hotkeys
             self.update_hotkeys_display()
             self.save_hotkeys()
             messagebox.showinfo("Success", f"Hotkey '{hotkey}' added successfully!")
@@ -681,8 +1179,9 @@ return
             self.hotkey_input.delete(0, "end")
             self.hotkey_value.delete(0, "end")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to add hotkey: {str(e)}")
+        # Syncing stops and restarts AHK's hotkey process, which can take seconds
+        self.executor.run_input(self.hotkey_engine.sync, hotkeys, on_done=added,
+                                on_error=lambda e: messagebox.showerror("Error", f"Failed to add hotkey: {str(e)}"))
 
     def remove_hotkey(self):
         """Remove selected hotkey"""
@@ -693,49 +1192,105 @@ return
         """Clear all hotkeys"""
         if messagebox.askyesno("Confirm", "Clear all hotkeys?"):
             self.hotkeys.clear()
+            self.register_hotkeys()
             self.update_hotkeys_display()
             self.save_hotkeys()
 
     def update_hotkeys_display(self):
         """Update the hotkeys list display"""
-        self.hotkeys_listbox.delete("1.0", "end")
-        for hotkey, data in self.hotkeys.items():
-            self.hotkeys_listbox.insert("end",
-                f"{hotkey} → {data['action']}: {data['value']}\n")
+        self.hotkeys_log.replace(f"{hotkey} → {data['action']}: {data['value']}"
+                                 for hotkey, data in self.hotkeys.items())
 
     def save_hotkeys(self):
-        """Save hotkeys to file"""
-        try:
-            with open("hotkeys.json", "w") as f:
-                json.dump(self.hotkeys, f, indent=2)
-        except Exception as e:
-            print(f"Error saving hotkeys: {e}")
+        """Queue the hotkey table for saving; bursts of edits become one write"""
+        self.config_store.save(self.hotkeys)
 
     def load_hotkeys(self):
         """Load hotkeys from file"""
         try:
-            if os.path.exists("hotkeys.json"):
-                with open("hotkeys.json", "r") as f:
-                    self.hotkeys = json.load(f)
+            self.hotkeys = self.config_store.load()
+            if self.hotkeys:
                 self.update_hotkeys_display()
+                self.register_hotkeys()
         except Exception as e:
             print(f"Error loading hotkeys: {e}")
 
+    def import_hotkeys(self):
+        """Merge a hotkey profile file into the table (one save, one re-register)"""
+        from tkinter import filedialog
+        filename = filedialog.askopenfilename(title="Import Hotkeys",
+                                              filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")])
+        if not filename:
+            return
+        try:
+            before = len(self.hotkeys)
+            self.hotkeys = self.config_store.import_file(filename, into=self.hotkeys)
+            self.register_hotkeys()
+            self.update_hotkeys_display()
+            messagebox.showinfo("Success", f"Imported {len(self.hotkeys) - before} new hotkeys "
+                                           f"({len(self.hotkeys)} total)")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import hotkeys: {str(e)}")
+
+    def export_hotkeys(self):
+        """Write the hotkey table to a file of the user's choice"""
+        from tkinter import filedialog
+        filename = filedialog.asksaveasfilename(title="Export Hotkeys", defaultextension=".json",
+                                                filetypes=[("JSON Files", "*.json")])
+        if not filename:
+            return
+        try:
+            self.config_store.export_file(self.hotkeys, filename)
+            messagebox.showinfo("Success", f"Exported {len(self.hotkeys)} hotkeys to {filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export hotkeys: {str(e)}")
+
+    def register_hotkeys(self):
+        """Sync the hotkey table with the AHK hotkey process"""
+        if not self.hotkey_engine:
+            return
+
+        def register(hotkeys):
+            self.api.register_hotkeys(hotkeys)
+            return dict(self.hotkey_engine.invalid)
+
+        def registered(invalid):
+            if invalid:
+                skipped = "\n".join(f"{hotkey}: {reason}" for hotkey, reason in invalid.items())
+                messagebox.showwarning("Hotkeys", f"These hotkeys were not registered:\n{skipped}")
+
+        # Off the Tk thread: stopping AHK's hotkey process can block for seconds
+        self.executor.run_input(register, dict(self.hotkeys), on_done=registered,
+                                on_error=lambda e: messagebox.showerror("Error", f"Failed to register hotkeys: {str(e)}"))
+
+    def update_hotkey_overhead(self):
+        """Refresh the hotkey dispatch overhead label once a second"""
+        if self.hotkey_engine:
+            stats = self.hotkey_engine.dispatch_stats()
+            if stats["count"]:
+                self.hotkey_overhead.configure(
+                    text=f"Hotkey dispatch overhead ({stats['count']} samples): "
+                         f"p50 {stats['dispatch_overhead_p50_ms']:.3f} ms / "
+                         f"p99 {stats['dispatch_overhead_p99_ms']:.3f} ms, "
+                         f"action p50 {stats['handler_p50_ms']:.2f} ms / p99 {stats['handler_p99_ms']:.2f} ms")
+        self.after(1000, self.update_hotkey_overhead)
+
     # ===== Mouse Methods =====
 
     def get_mouse_position(self):
         """Get current mouse position"""
         if not self.ahk:
             return
-        try:
-            pos = self.ahk.mouse_position
+
+        def show(pos):
             self.mouse_x.delete(0, "end")
             self.mouse_x.insert(0, str(pos[0]))
             self.mouse_y.delete(0, "end")
             self.mouse_y.insert(0, str(pos[1]))
             self.update_mouse_status(f"Current position: X={pos[0]}, Y={pos[1]}")
-        except Exception as e:
-            self.update_mouse_status(f"Error: {str(e)}")
+
+        self.executor.run_query(lambda: self.ahk.mouse_position, on_done=show,
+                                on_error=self.on_mouse_error)
 
     def move_mouse(self):
         """Move mouse to specified position"""
@@ -744,24 +1299,68 @@ return
         try:
             x = int(self.mouse_x.get())
             y = int(self.mouse_y.get())
-            self.ahk.mouse_move(x, y)
-            self.update_mouse_status(f"Moved mouse to X={x}, Y={y}")
+            style, speed = self.mouse_path_settings()
         except ValueError:
-            self.update_mouse_status("Error: Invalid coordinates")
-        except Exception as e:
-            self.update_mouse_status(f"Error: {str(e)}")
+            self.update_mouse_status("Error: Invalid coordinates or speed")
+            return
+
+        def done(report):
+            self.update_mouse_status(f"Moved mouse to X={x}, Y={y} ({self.path_summary(report)})")
+
+        self.executor.run_input(self.api.mouse.move, x, y, style, speed,
+                                on_error=self.on_mouse_error, on_done=done)
+
+    def mouse_path_settings(self):
+        """(style, speed) from the path controls; ValueError for a bad speed"""
+        speed = float(self.mouse_speed.get())
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+        return self.mouse_path_style.get().lower(), speed
+
+    def path_summary(self, report):
+        if report.planned <= 1:
+            return "instant"
+        return f"{report.sent} points in {report.elapsed_s:.2f}s, {report.rate_hz:.0f} Hz"
 
     def mouse_click(self, button="left", clicks=1):
         """Perform mouse click"""
+        if not self.ahk:
+            return
+
+        # AHK's own click count, so a double click is one real double click
+        self.executor.run_input(lambda: self.ahk.click(button=button, click_count=clicks),
+                                on_error=self.on_mouse_error,
+                                on_done=lambda _: self.update_mouse_status(
+                                    f"{button.capitalize()} clicked {clicks} time(s)"))
+
+    def add_click_position(self):
+        """Append the cursor's current position to the click list"""
+        if not self.ahk:
+            return
+
+        def add(pos):
+            text = self.click_list.get("1.0", "end-1c")
+            separator = "\n" if text and not text.endswith("\n") else ""
+            self.click_list.insert("end", f"{separator}{format_click_list([ClickStep(*pos)])}")
+
+        self.executor.run_query(lambda: self.ahk.mouse_position, on_done=add,
+                                on_error=self.on_mouse_error)
+
+    def run_click_list(self):
+        """Run every step of the click list as one AHK script"""
         if not self.ahk:
             return
         try:
-            for _ in range(clicks):
-                self.ahk.click(button=button)
-                time.sleep(0.1)
-            self.update_mouse_status(f"{button.capitalize()} clicked {clicks} time(s)")
-        except Exception as e:
-            self.update_mouse_status(f"Error: {str(e)}")
+            steps = parse_click_list(self.click_list.get("1.0", "end-1c"))
+        except ValueError as e:
+            messagebox.showerror("Click List", str(e))
+            return
+        if not steps:
+            return
+        clicks = sum(step.count for step in steps)
+        self.executor.run_input(self.api.click_sequence, steps, on_error=self.on_mouse_error,
+                                on_done=lambda _: self.update_mouse_status(
+                                    f"Ran click list: {len(steps)} steps, {clicks} clicks"))
 
     def mouse_drag(self):
         """Drag mouse from one position to another"""
@@ -772,36 +1371,36 @@ return
             y1 = int(self.drag_y1.get())
             x2 = int(self.drag_x2.get())
             y2 = int(self.drag_y2.get())
-
-            self.ahk.mouse_move(x1, y1)
-            time.sleep(0.1)
-            self.ahk.mouse_drag(x2, y2)
-            self.update_mouse_status(f"Dragged from ({x1},{y1}) to ({x2},{y2})")
+            style, speed = self.mouse_path_settings()
         except ValueError:
-            self.update_mouse_status("Error: Invalid coordinates")
-        except Exception as e:
-            self.update_mouse_status(f"Error: {str(e)}")
+            self.update_mouse_status("Error: Invalid coordinates or speed")
+            return
+
+        self.executor.run_input(self.api.mouse.drag, x1, y1, x2, y2, "left", style, speed,
+                                on_error=self.on_mouse_error,
+                                on_done=lambda report: self.update_mouse_status(
+                                    f"Dragged from ({x1},{y1}) to ({x2},{y2}) ({self.path_summary(report)})"))
 
     def mouse_wheel(self, direction):
         """Scroll mouse wheel"""
         if not self.ahk:
             return
         try:
-            amount = int(self.scroll_amount.get())
-            if direction == "down":
-                amount = -amount
-            self.ahk.wheel_down(abs(amount)) if direction == "down" else self.ahk.wheel_up(amount)
-            self.update_mouse_status(f"Scrolled {direction} by {abs(amount)}")
+            amount = abs(int(self.scroll_amount.get()))
+            button = "WD" if direction == "down" else "WU"
+            self.executor.run_input(lambda: self.ahk.click(button=button, click_count=amount),
+                                    on_error=self.on_mouse_error,
+                                    on_done=lambda _: self.update_mouse_status(
+                                        f"Scrolled {direction} by {amount}"))
         except ValueError:
             self.update_mouse_status("Error: Invalid scroll amount")
-        except Exception as e:
-            self.update_mouse_status(f"Error: {str(e)}")
+
+    def on_mouse_error(self, error):
+        self.update_mouse_status(f"Error: {str(error)}")
 
     def update_mouse_status(self, message):
         """Update mouse status display"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.mouse_status.insert("end", f"[{timestamp}] {message}\n")
-        self.mouse_status.see("end")
+        self.mouse_log.write(message)
 
     # ===== Keyboard Methods =====
 
@@ -813,27 +1412,47 @@ return
             text = self.text_to_send.get("1.0", "end-1c")
             delay = int(self.type_delay.get())
 
-            def type_text():
-                for char in text:
-                    self.ahk.type(char)
-                    time.sleep(delay / 1000.0)
-
-            thread = threading.Thread(target=type_text)
-            thread.daemon = True
-            thread.start()
+            self.typing_engine.submit(text, delay, self.send_mode.get().lower())
 
             messagebox.showinfo("Success", "Typing started...")
+        except ValueError:
+            messagebox.showerror("Error", "Invalid delay")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to send text: {str(e)}")
 
+    def cancel_typing(self):
+        """Cancel the running typing job and anything queued"""
+        if self.typing_engine:
+            self.typing_engine.cancel_all()
+
+    def on_typing_progress(self, job):
+        """Typing engine callback, runs on the worker thread"""
+        self.after(0, self.update_typing_status, job)
+
+    def update_typing_status(self, job):
+        """Update typing progress label"""
+        if job.error:
+            state = f"failed ({job.error})"
+        elif job.cancelled:
+            state = "cancelled"
+        elif job.done:
+            state = "done"
+        else:
+            state = "typing"
+        if "Keyboard" not in self.built_tabs:
+            return
+        queued = self.typing_engine.pending()
+        method = "Pasting" if job.method == "paste" else "Typing"
+        self.typing_status.configure(
+            text=f"{method}: {job.sent}/{job.total} chars {state}, {queued} queued")
+
     def send_raw_text(self):
-        """Send text instantly"""
+        """Send text instantly (no key delay; large text is pasted in Auto mode)"""
         if not self.ahk:
             return
         try:
             text = self.text_to_send.get("1.0", "end-1c")
-            self.ahk.type(text)
-            messagebox.showinfo("Success", "Text sent!")
+            self.typing_engine.submit(text, 0, self.send_mode.get().lower())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to send text: {str(e)}")
 
@@ -842,8 +1461,8 @@ return
         if not self.ahk:
             return
         try:
-            self.ahk.send(f"{{{key}}}")
-            messagebox.showinfo("Success", f"'{key}' key sent!")
+            self.run_command(self.ahk.send, f"{{{key}}}", error="Failed to send key",
+                             on_done=lambda _: messagebox.showinfo("Success", f"'{key}' key sent!"))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to send key: {str(e)}")
 
@@ -856,15 +1475,17 @@ return
             if not combo:
                 return
 
-            # Convert common notation to AHK format
-            combo = combo.replace("Ctrl", "^").replace("Alt", "!").replace("Shift", "+").replace("Win", "#")
-            self.ahk.send(combo)
-            messagebox.showinfo("Success", f"Combo '{combo}' sent!")
+            keys = compile_send(combo)
+            self.run_command(self.ahk.send, keys, error="Failed to send combo",
+                             on_done=lambda _: messagebox.showinfo("Success", f"Combo '{combo}' sent!"))
+        except ValueError as e:
+            messagebox.showerror("Invalid Combo", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to send combo: {str(e)}")
 
     def get_clipboard(self):
         """Get clipboard content"""
+        import pyperclip
         try:
             content = pyperclip.paste()
             self.clipboard_text.delete("1.0", "end")
@@ -874,6 +1495,7 @@ return
 
     def set_clipboard(self):
         """Set clipboard content"""
+        import pyperclip
         try:
             content = self.clipboard_text.get("1.0", "end-1c")
             pyperclip.copy(content)
@@ -883,6 +1505,7 @@ return
 
     def clear_clipboard(self):
         """Clear clipboard"""
+        import pyperclip
         try:
             pyperclip.copy("")
             self.clipboard_text.delete("1.0", "end")
@@ -890,178 +1513,380 @@ return
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clear clipboard: {str(e)}")
 
+    def update_clipboard_history(self):
+        """Re-list history entries matching the search box, newest first"""
+        if "Keyboard" not in self.built_tabs:
+            return
+        history = self.clipboard_watcher.history
+        query = self.clipboard_search.get().strip()
+        self.clipboard_rows = history.search(query) if query else history.entries()
+        self.clipboard_list.set_count(len(self.clipboard_rows))
+        self.clipboard_history_status.configure(
+            text=f"{len(history)} entries, {history.total_bytes / 1024:.0f} KB")
+
+    def clipboard_row_text(self, index):
+        entry = self.clipboard_rows[index]
+        copies = f"  x{entry.copies}" if entry.copies > 1 else ""
+        return f"{datetime.fromtimestamp(entry.last_used).strftime('%H:%M:%S')}  {entry.title()}  " \
+               f"({entry.size:,} B{copies})"
+
+    def select_clipboard_entry(self, index):
+        """Show a history entry in the clipboard editor"""
+        try:
+            text = self.clipboard_watcher.history.text(self.clipboard_rows[index])
+            self.clipboard_text.delete("1.0", "end")
+            self.clipboard_text.insert("1.0", text)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read history entry: {str(e)}")
+
+    def copy_clipboard_entry(self, index):
+        """Put a history entry back on the clipboard"""
+        import pyperclip
+        entry = self.clipboard_rows[index]
+        try:
+            pyperclip.copy(self.clipboard_watcher.history.text(entry))
+            self.clipboard_watcher.history.touch(entry.digest)
+            self.update_clipboard_history()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to set clipboard: {str(e)}")
+
+    def clear_clipboard_history(self):
+        self.clipboard_watcher.history.clear()
+        self.update_clipboard_history()
+
     # ===== Window Methods =====
 
     def refresh_windows(self):
         """Refresh the list of windows"""
         if not self.ahk:
             return
+        self.run_command(self.window_registry.refresh, query=True, on_done=self.on_windows_refreshed,
+                         error="Failed to refresh windows")
+
+    def on_windows_refreshed(self, diff):
+        self.update_windows_list()
+        self.windows_status.configure(
+            text=f"{len(self.window_registry)} windows in {self.window_registry.last_refresh_ms:.0f} ms "
+                 f"(+{len(diff.added)} -{len(diff.removed)} ~{len(diff.changed)})")
+
+    def update_windows_list(self):
+        """Re-apply the filter to the current window snapshot"""
+        if not self.window_registry:
+            return
+        visible_only = not self.show_hidden_windows.get()
+        query = self.window_filter.get().strip()
         try:
-            windows = self.ahk.windows()
-            self.windows_list.delete("1.0", "end")
-            for i, win in enumerate(windows[:50], 1):  # Limit to 50 windows
-                try:
-                    title = win.title
-                    if title:
-                        self.windows_list.insert("end", f"{i}. {title}\n")
-                except:
-                    pass
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to refresh windows: {str(e)}")
-
-    def activate_window(self):
-        """Activate window by title"""
+            if query:
+                self.window_rows = self.window_registry.find(query, visible_only)
+            else:
+                self.window_rows = self.window_registry.windows(visible_only)
+        except re.error:
+            return
+        self.windows_list.set_count(len(self.window_rows))
+
+    def window_row_text(self, index):
+        win = self.window_rows[index]
+        hidden = "" if win.visible else " [hidden]"
+        return (f"{index + 1:>4}. {win.title or '(untitled)'}{hidden}  -  {win.process} "
+                f"({win.width}x{win.height} at {win.x},{win.y})")
+
+    def select_window(self, index):
+        """Put the selected window into the operations and position fields"""
+        win = self.window_rows[index]
+        self.selected_window = win
+        self.window_title.delete(0, "end")
+        self.window_title.insert(0, win.title)
+        for entry, value in ((self.win_x, win.x), (self.win_y, win.y),
+                             (self.win_width, win.width), (self.win_height, win.height)):
+            entry.delete(0, "end")
+            entry.insert(0, str(value))
+
+    def resolve_window(self, title, selected=None):
+        """ahk Window for `title` via the registry; runs on the executor"""
+        info = None
+        if selected and selected.title == title:
+            # The row the user clicked, even if other windows share its title
+            info = next(iter(self.window_registry.find(f"ahk_id {selected.hwnd}")), None)
+        info = info or self.window_registry.resolve(title)
+        return self.window_registry.window(info) if info else None
+
+    def window_command(self, action, done, error):
+        """Resolve the window named in the title field and run `action(win)` on the input lane"""
         if not self.ahk:
             return
-        try:
-            title = self.window_title.get().strip()
-            if not title:
-                return
-            win = self.ahk.find_window(title=title)
+        title = self.window_title.get().strip()
+        if not title:
+            return
+        selected = self.selected_window
+
+        def run():
+            win = self.resolve_window(title, selected)
             if win:
-                win.activate()
-                messagebox.showinfo("Success", f"Window '{title}' activated!")
+                action(win)
+                self.window_registry.invalidate()
+            return win
+
+        def finished(win):
+            if win:
+                messagebox.showinfo("Success", done.format(title=title))
             else:
                 messagebox.showwarning("Not Found", f"Window '{title}' not found")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to activate window: {str(e)}")
+
+        self.run_command(run, on_done=finished, error=error)
+
+    def activate_window(self):
+        """Activate window by title"""
+        self.window_command(lambda win: win.activate(), "Window '{title}' activated!",
+                            "Failed to activate window")
 
     def minimize_window(self):
         """Minimize window"""
-        if not self.ahk:
-            return
-        try:
-            title = self.window_title.get().strip()
-            win = self.ahk.find_window(title=title)
-            if win:
-                win.minimize()
-                messagebox.showinfo("Success", f"Window minimized!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to minimize: {str(e)}")
+        self.window_command(lambda win: win.minimize(), "Window minimized!", "Failed to minimize")
 
     def maximize_window(self):
         """Maximize window"""
-        if not self.ahk:
-            return
-        try:
-            title = self.window_title.get().strip()
-            win = self.ahk.find_window(title=title)
-            if win:
-                win.maximize()
-                messagebox.showinfo("Success", f"Window maximized!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to maximize: {str(e)}")
+        self.window_command(lambda win: win.maximize(), "Window maximized!", "Failed to maximize")
 
     def close_window(self):
         """Close window"""
-        if not self.ahk:
-            return
-        try:
-            title = self.window_title.get().strip()
-            if messagebox.askyesno("Confirm", f"Close window '{title}'?"):
-                win = self.ahk.find_window(title=title)
-                if win:
-                    win.close()
-                    messagebox.showinfo("Success", f"Window closed!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to close window: {str(e)}")
+        title = self.window_title.get().strip()
+        if messagebox.askyesno("Confirm", f"Close window '{title}'?"):
+            self.window_command(lambda win: win.close(), "Window closed!", "Failed to close window")
 
     def hide_window(self):
         """Hide window"""
-        if not self.ahk:
-            return
-        try:
-            title = self.window_title.get().strip()
-            win = self.ahk.find_window(title=title)
-            if win:
-                win.hide()
-                messagebox.showinfo("Success", f"Window hidden!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to hide window: {str(e)}")
+        self.window_command(lambda win: win.hide(), "Window hidden!", "Failed to hide window")
 
     def show_window(self):
         """Show window"""
-        if not self.ahk:
-            return
-        try:
-            title = self.window_title.get().strip()
-            win = self.ahk.find_window(title=title)
-            if win:
-                win.show()
-                messagebox.showinfo("Success", f"Window shown!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to show window: {str(e)}")
+        self.window_command(lambda win: win.show(), "Window shown!", "Failed to show window")
 
     def move_resize_window(self):
         """Move and resize window"""
-        if not self.ahk:
-            return
         try:
-            title = self.window_title.get().strip()
             x = int(self.win_x.get())
             y = int(self.win_y.get())
             width = int(self.win_width.get())
             height = int(self.win_height.get())
-
-            win = self.ahk.find_window(title=title)
-            if win:
-                win.move(x, y, width, height)
-                messagebox.showinfo("Success", f"Window moved/resized!")
         except ValueError:
             messagebox.showerror("Error", "Invalid coordinates or dimensions")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to move/resize: {str(e)}")
+            return
+        self.window_command(lambda win: win.move(x, y, width, height), "Window moved/resized!",
+                            "Failed to move/resize")
 
     # ===== Advanced Methods =====
 
     def image_search(self):
-        """Search for image on screen"""
-        messagebox.showinfo("Info", "Image search requires additional setup with computer vision libraries")
+        """Search for image on screen (grab and matching run on the query pool)"""
+        from image_search import MULTI_SCALES
+        try:
+            path = self.image_path.get().strip()
+            if not path:
+                messagebox.showwarning("Input Error", "Please enter an image path")
+                return
+            threshold = float(self.image_threshold.get())
+            region_text = self.image_region.get().strip()
+            region = tuple(int(v) for v in region_text.split(",")) if region_text else None
+            if region and len(region) != 4:
+                raise ValueError("Region must be x,y,w,h")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid search settings: {str(e)}")
+            return
+        scales = MULTI_SCALES if self.image_multiscale.get() else (1.0,)
+        grayscale = not self.image_color.get()
+
+        def search():
+            start = time.perf_counter()
+            matches = self.image_searcher.search(path, region=region, threshold=threshold, scales=scales,
+                                                 grayscale=grayscale, max_results=10)
+            return matches, (time.perf_counter() - start) * 1000
+
+        def show(result):
+            matches, elapsed = result
+            if matches:
+                found = ", ".join(f"({m.x},{m.y}) {m.score:.2f}" for m in matches)
+                self.image_result.configure(text=f"Matches ({len(matches)}, {elapsed:.0f} ms): {found}")
+            else:
+                self.image_result.configure(text=f"Matches: none above {threshold} ({elapsed:.0f} ms)")
+
+        def failed(e):
+            self.image_result.configure(text="Matches: search failed")
+            messagebox.showerror("Error", f"Failed to search image: {str(e)}")
+
+        self.image_result.configure(text="Searching...")
+        self.executor.run_query(search, on_done=show, on_error=failed)
 
     def get_pixel_color(self):
-        """Get pixel color at coordinates"""
+        """Get pixel color at coordinates (the grab runs on the query pool)"""
         try:
             x = int(self.pixel_x.get())
             y = int(self.pixel_y.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid coordinates")
+            return
 
-            screenshot = ImageGrab.grab()
-            pixel = screenshot.getpixel((x, y))
-
+        def show(pixel):
             hex_color = '#{:02x}{:02x}{:02x}'.format(pixel[0], pixel[1], pixel[2])
             self.pixel_result.configure(text=f"Color: RGB{pixel} = {hex_color}")
 
-        except ValueError:
-            messagebox.showerror("Error", "Invalid coordinates")
+        # self.screen_capture is resolved on the worker too, so the first use
+        # doesn't import NumPy and the capture stack on the Tk thread
+        self.executor.run_query(lambda: self.screen_capture.get_pixel(x, y), on_done=show,
+                                on_error=lambda e: messagebox.showerror("Error", f"Failed to get pixel: {str(e)}"))
+
+    def add_screen_watch(self):
+        """Register a wait-for-color / wait-for-change watch"""
+        from screen_watch import (DEFAULT_HASH_BITS, WATCH_CHANGE, WATCH_COLOR, WATCH_HASH, Watch,
+                                  parse_color)
+        try:
+            region = tuple(int(v) for v in self.watch_region.get().split(","))
+            if len(region) != 4:
+                raise ValueError("Region must be x,y,w,h")
+            modes = {"Wait for Color": WATCH_COLOR, "Wait for Change": WATCH_CHANGE,
+                     "Wait for Change (Hash)": WATCH_HASH}
+            mode = modes[self.watch_mode.get()]
+            color = parse_color(self.watch_color.get()) if mode == WATCH_COLOR else None
+            action = self.watch_action.get()
+            value = self.watch_value.get().strip()
+            fraction = float(self.watch_fraction.get())
+            hash_bits = int(self.watch_hash_bits.get()) if mode == WATCH_HASH else DEFAULT_HASH_BITS
+
+            watch = Watch(region, mode, color=color,
+                          tolerance=int(self.watch_tolerance.get()),
+                          fraction=fraction, hash_bits=hash_bits,
+                          once=not self.watch_repeat.get(),
+                          callback=lambda w: self.on_screen_watch(w, action, value))
+            self.screen_watcher.rate_hz = max(0.1, float(self.watch_rate.get()))
+            self.screen_watcher.add(watch)
+            self.update_watch_status()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid watch settings: {str(e)}")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to get pixel: {str(e)}")
+            messagebox.showerror("Error", f"Failed to add watch: {str(e)}")
+
+    def on_screen_watch(self, watch, action, value):
+        """Screen watcher callback, runs on the sampling thread"""
+        if action != "Notify" and self.hotkey_engine:
+            # On the ordered input lane, so a slow action never stalls sampling
+            # and its input can't interleave with other commands
+            self.executor.run_input(self.hotkey_engine.run_action, action, value,
+                                    on_error=lambda e: print(f"Error running watch action: {e}"))
+        self.after(0, self.update_watch_status)
+
+    def clear_screen_watches(self):
+        """Remove all screen watches"""
+        self.screen_watcher.clear()
+        self.update_watch_status()
+
+    def update_watch_status(self):
+        """Refresh the watch list while watches exist"""
+        watches = list(self.screen_watcher.watches)
+        lines = [watch.describe() for watch in watches]
+        if watches:
+            lines.append(f"Last tick: {self.screen_watcher.last_tick_ms:.1f} ms")
+        self.watch_log.replace(lines)
+        if watches:
+            if not self._watch_status_pending:
+                self._watch_status_pending = True
+                self.after(1000, self._refresh_watch_status)
+
+    def _refresh_watch_status(self):
+        self._watch_status_pending = False
+        self.update_watch_status()
+
+    def screenshot_options(self):
+        """Format and quality/level from the capture settings"""
+        fmt = self.screenshot_format.get()
+        value = int(self.screenshot_quality.get())
+        if fmt == "png":
+            return fmt, {"level": max(0, min(9, value))}
+        return fmt, {"quality": max(1, min(100, value))}
 
     def capture_screen(self):
         """Capture screenshot"""
+        from screenshot_pipeline import with_format_extension
         try:
             path = self.screenshot_path.get().strip()
             if not path:
                 path = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-
-            screenshot = ImageGrab.grab()
-            screenshot.save(path)
-            messagebox.showinfo("Success", f"Screenshot saved to {path}")
+            fmt, options = self.screenshot_options()
+            path = with_format_extension(path, fmt)
+
+            # Grab here, encode and write on the pipeline's workers
+            queued = self.screenshots.capture_to(
+                path, fmt=fmt, on_done=lambda job: self.after(0, self.on_screenshot_saved, job),
+                block=False, **options)
+            if queued:
+                self.capture_status.configure(text=f"Saving {path}...")
+            else:
+                self.capture_status.configure(text="Encoder queue full, screenshot dropped")
+        except ValueError:
+            messagebox.showerror("Error", "Invalid quality/level")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to capture: {str(e)}")
 
+    def on_screenshot_saved(self, job):
+        """Report a finished background screenshot"""
+        if job.error:
+            messagebox.showerror("Error", f"Failed to capture: {str(job.error)}")
+        else:
+            self.capture_status.configure(
+                text=f"Saved {job.path} (encode {job.encode_ms:.0f} ms, total {job.latency_ms:.0f} ms)")
+
+    def capture_burst(self):
+        """Capture N frames at a fixed rate"""
+        from screenshot_pipeline import with_format_extension
+        try:
+            path = self.screenshot_path.get().strip() or "screenshot.png"
+            fmt, options = self.screenshot_options()
+            count = int(self.burst_frames.get())
+            fps = float(self.burst_fps.get())
+            base, ext = os.path.splitext(with_format_extension(path, fmt))
+            pattern = base.replace("{", "{{").replace("}", "}}") + "_{:04d}" + ext
+
+            self.screenshots.burst(count, fps, pattern, fmt=fmt,
+                                   on_done=lambda n, achieved: self.after(0, self.on_burst_done, n, achieved),
+                                   **options)
+            self.capture_status.configure(text=f"Capturing {count} frames at {fps:g} fps...")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid burst settings: {str(e)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to start burst: {str(e)}")
+
+    def on_burst_done(self, frames, achieved_fps):
+        """Show burst throughput once grabbing finishes (encoding may still be running)"""
+        stats = self.screenshots.stats()
+        self.capture_status.configure(
+            text=f"Burst: {frames} frames at {achieved_fps:.1f} fps, encode p50 {stats['encode_p50_ms']:.0f} ms "
+                 f"/ p99 {stats['encode_p99_ms']:.0f} ms, {stats['pending']} still encoding")
+
+    def processes_ready(self, redraw):
+        """True if the process index has a snapshot; otherwise `redraw` runs once it does"""
+        if self.process_index.ready:
+            return True
+        self._process_redraws.add(redraw)
+        return False
+
+    def on_process_index_change(self):
+        redraws, self._process_redraws = self._process_redraws, set()
+        for redraw in redraws:
+            redraw()
+
     def check_process(self):
         """Check if process is running"""
         try:
             name = self.process_name.get().strip()
             if not name:
                 return
+            if not self.processes_ready(self.check_process):
+                self.process_output.delete("1.0", "end")
+                self.process_output.insert("1.0", "Loading process list...")
+                return
 
-            found = False
-            for proc in psutil.process_iter(['name']):
-                if proc.info['name'].lower() == name.lower():
-                    found = True
-                    break
-
-            result = f"Process '{name}' is {'RUNNING' if found else 'NOT RUNNING'}"
+            pids = self.process_index.pids(name)
+            result = f"Process '{name}' is {'RUNNING' if pids else 'NOT RUNNING'}"
+            if pids:
+                result += f" (PID {', '.join(str(pid) for pid in pids)})"
             self.process_output.delete("1.0", "end")
             self.process_output.insert("1.0", result)
 
@@ -1071,22 +1896,29 @@ return
     def list_processes(self):
         """List all running processes"""
         try:
+            if not self.processes_ready(self.list_processes):
+                self.process_output.delete("1.0", "end")
+                self.process_output.insert("1.0", "Loading process list...")
+                return
+            rows, self.process_page, page_count, total = self.process_index.page(
+                self.process_page, key=self.process_sort.get().lower(),
+                descending=bool(self.process_descending.get()))
+
+            lines = [f"Running Processes ({total}, updated every {self.process_index.interval:.0f}s):\n",
+                     f"{'PID':>7}  {'CPU %':>6}  {'RSS MB':>8}  Name"]
+            for proc in rows:
+                lines.append(f"{proc.pid:>7}  {proc.cpu:>6.1f}  {proc.rss / 1048576:>8.1f}  {proc.name}")
             self.process_output.delete("1.0", "end")
-            self.process_output.insert("1.0", "Running Processes:\n\n")
-
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name']):
-                try:
-                    processes.append(f"PID {proc.info['pid']}: {proc.info['name']}")
-                except:
-                    pass
-
-            for proc in sorted(processes)[:100]:  # Limit to 100
-                self.process_output.insert("end", proc + "\n")
+            self.process_output.insert("1.0", "\n".join(lines) + "\n")
+            self.process_page_label.configure(text=f"Page {self.process_page + 1}/{page_count}")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to list processes: {str(e)}")
 
+    def change_process_page(self, step):
+        self.process_page += step
+        self.list_processes()
+
     # ===== Script Methods =====
 
     def run_ahk_script(self):
@@ -1099,26 +1931,88 @@ return
                 messagebox.showwarning("Warning", "No script to run")
                 return
 
-            # Save and run script
-            with open("temp_script.ahk", "w") as f:
-                f.write(script)
+            timeout = self.script_timeout.get().strip()
+            timeout = float(timeout) if timeout else None
 
-            result = self.ahk.run_script(script)
-            self.script_output.delete("1.0", "end")
-            self.script_output.insert("1.0", f"Script started at {datetime.now().strftime('%H:%M:%S')}\n")
-            self.script_output.insert("end", "Check AutoHotkey system tray icon for running scripts")
+            # Each run is its own AutoHotkey process; output streams in as it is written
+            run = self.api.start_script(script, timeout=timeout)
+            self.script_log.write(f"[#{run.id}] started at {datetime.now().strftime('%H:%M:%S')} (pid {run.pid})")
+            self.update_script_runs()
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to run script: {str(e)}")
 
     def stop_all_scripts(self):
         """Stop all running AHK scripts"""
-        if messagebox.askyesno("Confirm", "Stop all AutoHotkey scripts?"):
-            try:
-                # This would need platform-specific implementation
-                messagebox.showinfo("Info", "Use AutoHotkey system tray to stop scripts")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to stop scripts: {str(e)}")
+        if not self.api:
+            return
+        running = self.api.scripts.running()
+        if not running:
+            messagebox.showinfo("Info", "No scripts are running")
+            return
+        if messagebox.askyesno("Confirm", f"Stop {len(running)} running script(s)?"):
+            # Terminating waits for each process to exit; keep that off the Tk thread
+            self.run_command(self.api.scripts.stop_all, query=True,
+                             on_done=lambda n: self.update_script_runs(),
+                             error="Failed to stop scripts")
+
+    def stop_selected_script(self):
+        """Stop the script selected in the runs list"""
+        index = self.script_runs_list.selected
+        if not self.api:
+            return
+        if index is None or index >= len(self.script_rows):
+            messagebox.showwarning("Warning", "Select a script run first")
+            return
+        self.run_command(self.api.scripts.stop, self.script_rows[index].id, query=True,
+                         on_done=lambda stopped: self.update_script_runs(),
+                         error="Failed to stop script")
+
+    def clear_finished_scripts(self):
+        if self.api:
+            self.api.scripts.clear_finished()
+            self.update_script_runs()
+
+    def script_row_text(self, index):
+        run = self.script_rows[index]
+        cpu, rss = run.usage()
+        exit_code = "" if run.exit_code is None else f"  exit {run.exit_code}"
+        usage = f"  CPU {cpu:.0f}%  {rss / 1024 ** 2:.1f} MB" if run.running else ""
+        return (f"#{run.id:<4} {run.name}  pid {run.pid}  {run.status}  "
+                f"{run.elapsed:.1f}s{usage}{exit_code}  {run.lines} lines")
+
+    def update_script_runs(self):
+        """Redraw the runs list; repeats once a second while any script is running"""
+        if "Scripts" not in self.built_tabs:
+            return
+        self.script_rows = list(self.running_scripts.values())
+        self.script_runs_list.set_count(len(self.script_rows))
+        if self.api:
+            launch = self.api.scripts.launch_stats()
+            warm, cold = launch["warm"], launch["cold"]
+            self.script_launch_status.configure(
+                text=f"Launch p50: warm {warm['launch_p50']:.1f} ms ({warm['count']} runs), "
+                     f"cold {cold['launch_p50']:.1f} ms ({cold['count']} runs)   "
+                     f"First output p50: warm {warm['first_output_p50']:.1f} ms, "
+                     f"cold {cold['first_output_p50']:.1f} ms")
+        if any(run.running for run in self.script_rows) and not self._script_refresh_scheduled:
+            self._script_refresh_scheduled = True
+            self.after(1000, self._refresh_script_runs)
+
+    def _refresh_script_runs(self):
+        self._script_refresh_scheduled = False
+        self.update_script_runs()
+
+    def on_script_output(self, run, stream, line):
+        """Called on a reader thread; the sink batches lines into the textbox once per frame"""
+        if "Scripts" in self.built_tabs:
+            self.script_log.write(f"[#{run.id}{' err' if stream == 'stderr' else ''}] {line}")
+
+    def on_script_exit(self, run):
+        if "Scripts" in self.built_tabs:
+            self.script_log.write(f"[#{run.id}] {run.status} (exit code {run.exit_code}) "
+                                  f"after {run.elapsed:.1f}s")
+        self.after(0, self.update_script_runs)
 
     def save_script(self):
         """Save script to file"""
@@ -1169,54 +2063,154 @@ return
 
     def start_recording(self):
         """Start recording macro"""
-        messagebox.showinfo("Info", "Macro recording started!\n\nNote: Full implementation requires additional keyboard/mouse listeners")
-        # Would implement with pynput keyboard and mouse listeners
+        from macro_format import MacroWriter
+        try:
+            self.recorder = MacroRecorder(
+                self.recorded_actions,
+                record_mouse=bool(self.record_mouse.get()),
+                record_clicks=bool(self.record_clicks.get()),
+                record_keyboard=bool(self.record_keyboard.get()),
+                min_move_distance=float(self.move_min_distance.get() or 0),
+                min_move_interval_ms=float(self.move_min_interval.get() or 0))
+            if self.record_stream.get():
+                filename = f"macro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ahkm"
+                self.macro_writer = MacroWriter(filename)
+            self.recorder.start()
+            self.after(500, self.update_record_status)
+        except Exception as e:
+            self.is_recording = False
+            self.record_btn.configure(text="Start Recording", fg_color="green")
+            self.record_status.configure(text="Status: Not Recording")
+            messagebox.showerror("Error", f"Failed to start recording: {str(e)}")
 
     def stop_recording(self):
         """Stop recording macro"""
+        if self.recorder:
+            self.recorder.stop()
+        if self.macro_writer:
+            try:
+                self.macro_writer.sync(self.recorded_actions)
+                self.macro_writer.close()
+                messagebox.showinfo("Success", f"Macro streamed to {self.macro_writer.path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to write macro: {str(e)}")
+            self.macro_writer = None
         self.update_recorded_display()
+        self.update_record_status()
+
+    def update_record_status(self):
+        """Show event count and memory use while recording"""
+        buf = self.recorded_actions
+        state = "Recording..." if self.is_recording else "Not Recording"
+        dropped = self.recorder.dropped_moves if self.recorder else 0
+        self.record_status.configure(
+            text=f"Status: {state}  |  {len(buf)} events, {dropped} moves skipped, "
+                 f"{buf.nbytes / 1024:.1f} KB ({buf.bytes_per_minute() / 1024:.1f} KB/min)")
+        if self.is_recording:
+            if self.macro_writer:
+                try:
+                    self.macro_writer.sync(buf)
+                except Exception as e:
+                    # Stop streaming rather than retry the same block every tick;
+                    # the events are still in memory and can be saved normally
+                    self.macro_writer.close()
+                    self.macro_writer = None
+                    messagebox.showerror("Error", f"Stopped streaming the macro to disk: {str(e)}")
+            self.update_recorded_display()
+            self.after(500, self.update_record_status)
 
     def playback_macro(self):
         """Playback recorded macro"""
         if not self.recorded_actions:
             messagebox.showwarning("Warning", "No macro recorded")
             return
+        if not self.ahk:
+            return
+        if self.is_recording:
+            messagebox.showwarning("Warning", "Stop recording before playback")
+            return
+        if self.player and self.player.playing:
+            messagebox.showwarning("Warning", "Playback already running")
+            return
+
+        try:
+            speed = float(self.playback_speed.get().rstrip("x"))
+            self.player = self.api.play_macro(
+                self.recorded_actions, speed=speed, fast=bool(self.playback_fast.get()),
+                on_done=lambda report: self.after(0, self.on_playback_done, report), wait=False)
+            self.record_status.configure(text=f"Status: Playing {len(self.recorded_actions)} events...")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid playback speed: {str(e)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to play macro: {str(e)}")
 
-        messagebox.showinfo("Info", "Macro playback would execute recorded actions")
+    def stop_playback(self):
+        """Cancel a running playback"""
+        if self.player:
+            self.player.cancel()
+
+    def on_playback_done(self, report):
+        """Show playback timing once the player thread finishes"""
+        if report.error:
+            self.record_status.configure(text=f"Status: Playback failed: {report.error}")
+            return
+        stats = report.stats()
+        state = "cancelled" if report.cancelled else "finished"
+        self.record_status.configure(
+            text=f"Status: Playback {state}  |  {stats['events']} events in {report.elapsed_ns / 1e9:.2f}s, "
+                 f"timing error p50 {stats['p50_ms']:.3f} ms / p99 {stats['p99_ms']:.3f} ms / "
+                 f"max {stats['max_ms']:.3f} ms, {stats['within_1ms']:.1%} within 1 ms")
 
     def clear_recording(self):
         """Clear recorded actions"""
         if messagebox.askyesno("Confirm", "Clear all recorded actions?"):
             self.recorded_actions.clear()
-            self.recorded_display.delete("1.0", "end")
+            self.recorded_view.set_buffer(self.recorded_actions)
+            self.update_recorded_display()
 
     def save_macro(self):
         """Save macro to file"""
+        from macro_format import save_binary
         try:
             if not self.recorded_actions:
                 messagebox.showwarning("Warning", "No macro to save")
                 return
 
-            filename = f"macro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            with open(filename, "w") as f:
-                json.dump(self.recorded_actions, f, indent=2)
+            filename = f"macro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ahkm"
+            save_binary(self.recorded_actions, filename)
 
             messagebox.showinfo("Success", f"Macro saved as {filename}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save macro: {str(e)}")
 
+    def export_macro_json(self):
+        """Export macro in the JSON format"""
+        from macro_format import save_json
+        try:
+            if not self.recorded_actions:
+                messagebox.showwarning("Warning", "No macro to save")
+                return
+
+            filename = f"macro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            save_json(self.recorded_actions, filename)
+
+            messagebox.showinfo("Success", f"Macro exported as {filename}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export macro: {str(e)}")
+
     def load_macro(self):
         """Load macro from file"""
+        from macro_format import load_macro_file
         from tkinter import filedialog
         try:
             filename = filedialog.askopenfilename(
                 title="Select Macro File",
-                filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")]
+                filetypes=[("Macro Files", "*.ahkm *.json"), ("Binary Macros", "*.ahkm"),
+                           ("JSON Files", "*.json"), ("All Files", "*.*")]
             )
 
             if filename:
-                with open(filename, "r") as f:
-                    self.recorded_actions = json.load(f)
+                self.recorded_actions = load_macro_file(filename)
 
                 self.update_recorded_display()
                 messagebox.showinfo("Success", "Macro loaded!")
@@ -1225,44 +2219,114 @@ return
             messagebox.showerror("Error", f"Failed to load macro: {str(e)}")
 
     def update_recorded_display(self):
-        """Update recorded actions display"""
-        self.recorded_display.delete("1.0", "end")
-        for i, action in enumerate(self.recorded_actions, 1):
-            self.recorded_display.insert("end", f"{i}. {action}\n")
+        """Show new events; stays at the bottom if it was already there"""
+        if "Macro Recorder" not in self.built_tabs:
+            return
+        if self.recorded_view.buffer is not self.recorded_actions:
+            self.recorded_view.set_buffer(self.recorded_actions)
+        display = self.recorded_display
+        at_end = display.top + display.visible_rows >= display.count
+        display.set_count(self.recorded_view.sync(), follow=at_end)
+
+    def filter_recorded_actions(self, label):
+        """Limit the recorded actions list to one kind of event"""
+        self.recorded_view.set_filter(EVENT_FILTERS[label])
+        self.recorded_display.top = 0
+        self.recorded_display.set_count(len(self.recorded_view))
+
+    def jump_recorded_actions(self):
+        """Scroll the recorded actions list to a time in the recording"""
+        try:
+            seconds = float(self.recorded_jump.get())
+        except ValueError:
+            messagebox.showerror("Error", "Enter a time in seconds")
+            return
+        self.recorded_display.select(self.recorded_view.row_at_time(seconds))
 
     # ===== System Methods =====
 
+    def show_startup_report(self):
+        """Import times and startup phases, like `python -X importtime`"""
+        window = ctk.CTkToplevel(self)
+        window.title("Startup Report")
+        window.geometry("800x600")
+        text = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Consolas", size=12), wrap="none")
+        text.pack(fill="both", expand=True, padx=10, pady=10)
+        text.insert("1.0", startup_profile.report())
+        text.configure(state="disabled")
+
     def refresh_system_info(self):
         """Refresh system information"""
+        import psutil
+        from system_monitor import format_rate
+
         try:
             self.system_info.delete("1.0", "end")
+            monitor = self.system_monitor
+            window = self.system_window.get()
+            stats = monitor.stats(window)
 
             info = []
             info.append("=== System Information ===\n")
-            info.append(f"CPU Usage: {psutil.cpu_percent()}%")
-            info.append(f"Memory Usage: {psutil.virtual_memory().percent}%")
+            info.append(f"{'':<14}{'now':>12}{'min':>12}{'avg':>12}{'max':>12}{'p95':>12}   ({window})")
+            for name, label in (("cpu", "CPU %"), ("memory", "Memory %"), ("disk_read", "Disk Read"),
+                                ("disk_write", "Disk Write"), ("net_recv", "Net Down"), ("net_sent", "Net Up")):
+                latest = monitor.series[name].latest()
+                now = float(latest[0]) if latest is not None else 0.0
+                fmt = (lambda v: f"{v:.1f}") if name in ("cpu", "memory") else format_rate
+                row = [now] + [stats[name][k] for k in ("min", "avg", "max", "p95")]
+                info.append(f"{label:<14}" + "".join(f"{fmt(v):>12}" for v in row))
+
+            cores = monitor.cpu_cores.latest()
+            if cores is not None:
+                info.append("\nPer Core: " + "  ".join(f"{c:.0f}%" for c in cores))
             info.append(f"Disk Usage: {psutil.disk_usage('/').percent}%")
             info.append(f"Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:%S')}")
-            info.append(f"\nRunning Processes: {len(list(psutil.process_iter()))}")
+            if self.processes_ready(self.refresh_system_info):
+                info.append(f"\nRunning Processes: {len(self.process_index)}")
+            else:
+                info.append("\nRunning Processes: loading...")
+            info.append("Top by CPU: " + ", ".join(f"{p.name} ({p.cpu:.0f}%)"
+                                                   for p in monitor.top_processes("cpu")))
+            info.append("Top by Memory: " + ", ".join(f"{p.name} ({p.rss / 1048576:.0f} MB)"
+                                                      for p in monitor.top_processes("rss")))
+            info.append(f"\nMonitor: {monitor.samples} samples at {monitor.rate_hz:.0f} Hz, "
+                        f"overhead {monitor.overhead_percent:.2f}% of a core")
 
             self.system_info.insert("1.0", "\n".join(info))
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to get system info: {str(e)}")
 
+    def update_system_monitor(self):
+        """Redraw the System tab graphs at 2 Hz while the tab is visible"""
+        from system_monitor import STAT_WINDOWS, format_rate
+
+        if self.tabview.get() == "System":
+            monitor = self.system_monitor
+            seconds = STAT_WINDOWS.get(self.system_window.get(), 60)
+            cpu = monitor.history("cpu", seconds)
+            memory = monitor.history("memory", seconds)
+            disk = monitor.history("disk_read", seconds) + monitor.history("disk_write", seconds)
+            net = monitor.history("net_recv", seconds) + monitor.history("net_sent", seconds)
+            for name, values, maximum, text in (
+                    ("cpu", cpu, 100, f"{cpu[-1]:.0f}%" if len(cpu) else ""),
+                    ("memory", memory, 100, f"{memory[-1]:.0f}%" if len(memory) else ""),
+                    ("disk", disk, None, format_rate(disk[-1]) if len(disk) else ""),
+                    ("net", net, None, format_rate(net[-1]) if len(net) else "")):
+                graph, label = self.system_graphs[name]
+                graph.plot(values, maximum)
+                label.configure(text=text)
+        self.after(500, self.update_system_monitor)
+
     def adjust_volume(self, action):
         """Adjust system volume"""
         if not self.ahk:
             return
         try:
-            if action == "up":
-                self.ahk.send("{Volume_Up}")
-            elif action == "down":
-                self.ahk.send("{Volume_Down}")
-            elif action == "mute":
-                self.ahk.send("{Volume_Mute}")
-
-            messagebox.showinfo("Success", f"Volume {action} executed")
+            keys = {"up": "{Volume_Up}", "down": "{Volume_Down}", "mute": "{Volume_Mute}"}
+            self.run_command(self.ahk.send, keys[action], error="Failed to adjust volume",
+                             on_done=lambda _: messagebox.showinfo("Success", f"Volume {action} executed"))
         except Exception as e:
             messagebox.showerror("Error", f"Failed to adjust volume: {str(e)}")
 
@@ -1291,6 +2355,27 @@ return
         if messagebox.askyesno("Confirm", "Are you sure you want to restart?"):
             messagebox.showinfo("Info", "Restart command would be executed here")
 
+    def on_close(self):
+        """Write pending settings and stop background work before the window goes"""
+        self.config_store.close()
+        if self.recorder:
+            self.recorder.stop()
+        if self.macro_writer:
+            # Keep the events recorded since the last 500 ms sync
+            try:
+                self.macro_writer.sync(self.recorded_actions)
+            except Exception as e:
+                print(f"Error streaming macro: {e}")
+            finally:
+                self.macro_writer.close()
+            self.macro_writer = None
+        if "clipboard_watcher" in self.__dict__:
+            self.clipboard_watcher.stop()
+        if self.api:
+            self.api.shutdown()
+        self.executor.shutdown()
+        self.destroy()
+
 
 def main():
     """Main entry point"""
@@ -0,0 +1,188 @@
+"""
+Automation API - headless interface to hotkeys, macros, scripts, input and windows
+Description: The engines behind the GUI, usable from scripts and the command line
+without importing customtkinter, PIL or OpenCV; the GUI methods call into this
+"""
+
+import os
+import threading
+from functools import cached_property
+
+from click_sequence import MOUSE_DELAY_MS, compile_clicks
+from config_store import ConfigStore, read_hotkeys
+from hotkey_engine import HotkeyEngine
+from key_combo import compile_send
+from macro_playback import AHKInputBackend, MacroPlayer
+from script_manager import ScriptManager, ahk_script_command
+from typing_engine import TypingEngine
+from window_registry import WindowRegistry
+
+# Warm AutoHotkey processes kept waiting for hotkey and Scripts tab runs
+SCRIPT_POOL_SIZE = 2
+
+
+def load_hotkeys(path=None):
+    """Hotkey table {hotkey: {action, value}} from `path`, or from the per-user config store
+
+    Returns {} if the file does not exist.
+    """
+    if path is None:
+        return ConfigStore().load()
+    if not os.path.exists(path):
+        return {}
+    return read_hotkeys(path)
+
+
+def save_hotkeys(hotkeys, path=None):
+    """Write the hotkey table atomically to `path` or the per-user config store"""
+    ConfigStore(path).write_now(hotkeys)
+
+
+class Automation:
+    """One AHK connection plus the typing, hotkey, playback and window services
+
+    Pass an existing AHK object (or a stub) to share it; otherwise one is
+    created, using `ahk_path` as the AutoHotkey executable if given.
+    """
+
+    def __init__(self, ahk=None, ahk_path=None, on_typing_progress=None):
+        if ahk is None:
+            from ahk import AHK
+            ahk = AHK(executable_path=ahk_path) if ahk_path else AHK()
+        self.ahk = ahk
+        self.ahk_path = ahk_path
+        self.typing = TypingEngine(ahk, on_progress=on_typing_progress)
+        self.hotkeys = HotkeyEngine(ahk, send_text=self.typing.submit,
+                                    run_script=lambda script: self.start_script(script, name="Hotkey"))
+        self.windows = WindowRegistry(ahk)
+        self.player = None
+
+    # ===== Hotkeys =====
+
+    def register_hotkeys(self, hotkeys):
+        """Make `hotkeys` the active table; returns the (added, removed) key sets"""
+        return self.hotkeys.sync(hotkeys)
+
+    def serve_hotkeys(self, hotkeys, stop=None):
+        """Register `hotkeys` and block until `stop` (a threading.Event) is set"""
+        stop = stop or threading.Event()
+        self.register_hotkeys(hotkeys)
+        try:
+            # Event.wait with a timeout keeps Ctrl+C responsive on Windows
+            while not stop.wait(0.5):
+                pass
+        finally:
+            self.hotkeys.stop()
+
+    # ===== Macros =====
+
+    def play_macro(self, macro, speed=1.0, fast=False, on_done=None, wait=True):
+        """Play a macro file or EventBuffer
+
+        With `wait` the macro plays on this thread and the PlaybackReport is
+        returned; otherwise playback starts in the background and the
+        MacroPlayer is returned.
+        """
+        if isinstance(macro, str):
+            # NumPy comes in with the file reader; hotkey-only runs never pay for it
+            from macro_format import load_macro_file
+            macro = load_macro_file(macro)
+        self.player = MacroPlayer(AHKInputBackend(self.ahk), speed=speed, fast=fast, on_done=on_done)
+        if wait:
+            return self.player.play(macro)
+        self.player.start(macro)
+        return self.player
+
+    def stop_macro(self):
+        if self.player:
+            self.player.cancel()
+
+    # ===== Scripts =====
+
+    def run_script(self, script, blocking=True, timeout=None):
+        """Run AHK script text or a .ahk file; returns its stdout (or a future if not blocking)"""
+        return self.ahk.run_script(script, blocking=blocking, timeout=timeout)
+
+    @cached_property
+    def scripts(self):
+        """ScriptManager for non-blocking runs, each in its own (pre-warmed) AutoHotkey process"""
+        return ScriptManager(ahk_script_command(self.ahk, self.ahk_path), pool_size=SCRIPT_POOL_SIZE)
+
+    def start_script(self, script, name=None, timeout=None):
+        """Launch AHK script text without waiting; returns the ScriptRun"""
+        return self.scripts.start(script, name=name, timeout=timeout)
+
+    # ===== Input =====
+
+    def send_text(self, text, delay_ms=0, mode="auto"):
+        """Queue text on the typing engine; returns the TypingJob
+
+        `mode` is "type", "paste" (through the clipboard, which is restored
+        afterwards) or "auto", which pastes large payloads.
+        """
+        return self.typing.submit(text, delay_ms, mode)
+
+    def send(self, keys):
+        """Send AHK key notation, e.g. '^c' or '{Enter}'"""
+        self.ahk.send(keys)
+
+    def send_combo(self, combo):
+        """Send 'Ctrl+C' style notation, or a sequence like 'Ctrl+K, Ctrl+C' in one call"""
+        self.ahk.send(compile_send(combo))
+
+    def click(self, x=None, y=None, button="left", count=1):
+        self.ahk.click(x, y, button=button, click_count=count)
+
+    def click_sequence(self, steps, mouse_delay=MOUSE_DELAY_MS, timeout=None):
+        """Perform (x, y, button, count, delay_ms) steps as one AHK script run"""
+        return self.run_script(compile_clicks(steps, mouse_delay), timeout=timeout)
+
+    @cached_property
+    def mouse(self):
+        """MouseEngine streaming precomputed paths through the AHK daemon"""
+        from mouse_engine import MouseEngine
+        return MouseEngine(AHKInputBackend(self.ahk), position=lambda: self.ahk.mouse_position)
+
+    def move_mouse(self, x, y, speed=None, style=None):
+        """Move the cursor to (x, y)
+
+        With a path `style` ("linear", "bezier", "human") the move is streamed
+        by the MouseEngine and `speed` is a multiplier; otherwise it is one AHK
+        move at AHK's 0-100 `speed`.
+        """
+        if style is None:
+            self.ahk.mouse_move(x, y, speed=speed)
+            return None
+        return self.mouse.move(x, y, style, speed or 1.0)
+
+    def drag_mouse(self, x1, y1, x2, y2, button="left", style="human", speed=1.0):
+        """Press at (x1, y1), follow a path to (x2, y2) and release; returns the DeliveryReport"""
+        return self.mouse.drag(x1, y1, x2, y2, button, style, speed)
+
+    # ===== Windows =====
+
+    def find_window(self, query):
+        """Front-most WindowInfo matching `query` (see WindowRegistry), or None"""
+        return self.windows.resolve(query)
+
+    def window_action(self, query, action, *args):
+        """Call `action` ('activate', 'minimize', 'move', ...) on the window matching `query`
+
+        Returns the WindowInfo acted on, or None if no window matched.
+        """
+        info = self.windows.resolve(query)
+        if info is None:
+            return None
+        getattr(self.windows.window(info), action)(*args)
+        self.windows.invalidate()
+        return info
+
+    def shutdown(self):
+        """Stop playback, typing, running scripts and the hotkey process"""
+        self.stop_macro()
+        if "mouse" in self.__dict__:
+            self.mouse.cancel()
+        if "scripts" in self.__dict__:
+            self.scripts.shutdown()
+        self.typing.shutdown()
+        self.hotkeys.stop()
@@ -0,0 +1,129 @@
+"""
+Click Sequence - lists of clicks compiled into one AHK script
+Description: Turns (x, y, button, count, delay) steps into a single script that uses
+AHK's native click count and SetMouseDelay, so a whole sequence costs one call
+instead of one daemon round-trip (and one Python sleep) per click
+"""
+
+import time
+from collections import namedtuple
+
+BUTTONS = {"left": "Left", "right": "Right", "middle": "Middle", "x1": "X1", "x2": "X2"}
+# Delay between the down/up events AHK sends (-1 is as fast as possible)
+MOUSE_DELAY_MS = -1
+MAX_COUNT = 100
+
+# x and y of None click wherever the cursor is; delay_ms is the pause after the step
+ClickStep = namedtuple("ClickStep", "x y button count delay_ms", defaults=(None, None, "left", 1, 0))
+
+
+def validate_step(step):
+    """Return `step` as a ClickStep, raising ValueError for anything AHK would reject"""
+    step = ClickStep(*step)
+    if (step.x is None) != (step.y is None):
+        raise ValueError(f"Click needs both x and y, or neither: {step}")
+    if step.button.lower() not in BUTTONS:
+        raise ValueError(f"Unknown mouse button '{step.button}'")
+    if not 0 <= step.count <= MAX_COUNT:
+        raise ValueError(f"Click count must be 0-{MAX_COUNT}, got {step.count}")
+    if step.delay_ms < 0:
+        raise ValueError(f"Delay must not be negative, got {step.delay_ms}")
+    return step
+
+
+def parse_click_list(text):
+    """ClickSteps from lines of "x, y[, button[, count[, delay_ms]]]"
+
+    Blank lines and lines starting with ";" are skipped; "-, -" (or empty
+    x and y) clicks at the current position.
+    """
+    steps = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        parts = [p.strip() for p in line.split(",")]
+        if len(parts) < 2 or len(parts) > 5:
+            raise ValueError(f"Line {number}: expected x, y[, button[, count[, delay_ms]]]")
+        try:
+            x, y = (None if p in ("", "-") else int(p) for p in parts[:2])
+            button = parts[2].lower() if len(parts) > 2 and parts[2] else "left"
+            count = int(parts[3]) if len(parts) > 3 and parts[3] else 1
+            delay = int(parts[4]) if len(parts) > 4 and parts[4] else 0
+            steps.append(validate_step((x, y, button, count, delay)))
+        except ValueError as e:
+            raise ValueError(f"Line {number}: {e}") from None
+    return steps
+
+
+def format_click_list(steps):
+    """Inverse of parse_click_list"""
+    lines = []
+    for x, y, button, count, delay_ms in steps:
+        where = "-, -" if x is None else f"{x}, {y}"
+        lines.append(f"{where}, {button}, {count}, {delay_ms}")
+    return "\n".join(lines)
+
+
+def compile_clicks(steps, mouse_delay=MOUSE_DELAY_MS):
+    """One AHK script that performs every step in order
+
+    Repeated clicks within a step use Click's own count (so a double click is
+    a real double click), and only non-zero delays become Sleep commands.
+    """
+    lines = ["#NoTrayIcon", "CoordMode, Mouse, Screen", f"SetMouseDelay, {int(mouse_delay)}"]
+    for step in steps:
+        x, y, button, count, delay_ms = validate_step(step)
+        where = "" if x is None else f"{int(x)} {int(y)} "
+        lines.append(f"Click, {where}{BUTTONS[button.lower()]} {int(count)}")
+        if delay_ms:
+            lines.append(f"Sleep, {int(delay_ms)}")
+    lines.append("ExitApp")
+    return "\n".join(lines) + "\n"
+
+
+def benchmark(steps=1000, latency=0.0002, legacy_sleep_s=0.1):
+    """Per-click cost of a 1,000-step sequence: one round-trip (+ 100 ms sleep) per click vs one script
+
+    The old loop's round-trips are measured on the stub; its fixed sleep is
+    added rather than slept. The compiled script is also run through the
+    stub interpreter to include a real process launch and a parse of every
+    line.
+    """
+    import subprocess
+    from stub_backend import StubAHK, stub_script_command
+
+    # Every other step is a double click
+    steps = [ClickStep(100 + i % 500, 200 + i % 300, "left", 1 + i % 2, 0) for i in range(steps)]
+    clicks = sum(step.count for step in steps)
+    results = {"steps": len(steps), "clicks": clicks}
+
+    stub = StubAHK(latency=latency)
+    start = time.perf_counter()
+    for x, y, button, count, _ in steps:
+        for _ in range(count):
+            stub.click(x, y, button=button)
+    loop_s = time.perf_counter() - start
+    results["legacy_calls"] = stub.round_trips
+    results["legacy_round_trip_per_click_ms"] = loop_s * 1000 / clicks
+    results["legacy_per_click_ms"] = (loop_s + legacy_sleep_s * clicks) * 1000 / clicks
+
+    stub = StubAHK(latency=latency)
+    start = time.perf_counter()
+    script = compile_clicks(steps)
+    compile_s = time.perf_counter() - start
+    stub.run_script(script)
+    batch_s = time.perf_counter() - start
+    results["batch_calls"] = stub.round_trips
+    results["compile_ms"] = compile_s * 1000
+    results["batch_per_click_ms"] = batch_s * 1000 / clicks
+
+    start = time.perf_counter()
+    subprocess.run(stub_script_command(), input=script, text=True, check=True)
+    results["batch_with_process_per_click_ms"] = (time.perf_counter() - start + compile_s) * 1000 / clicks
+    results["script_bytes"] = len(script)
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,324 @@
+"""
+Clipboard History - background clipboard watcher with a deduplicated, bounded store
+Description: Polls the clipboard's change counter (GetClipboardSequenceNumber on
+Windows) and only reads and hashes the contents when it moves; entries are keyed
+by content hash, evicted least-recently-used past a byte budget, and large ones
+are kept on disk with only a preview in memory
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+BUDGET_BYTES = 32 * 1024 * 1024
+SPILL_BYTES = 64 * 1024
+PREVIEW_CHARS = 4096
+POLL_INTERVAL_S = 0.5
+
+
+def clipboard_sequence():
+    """Windows' clipboard change counter as a callable, or None where there is none"""
+    if os.name != "nt":
+        return None
+    import ctypes
+    return ctypes.windll.user32.GetClipboardSequenceNumber
+
+
+class ClipEntry:
+    """One distinct clipboard text; large texts live in `path` instead of `text`"""
+
+    __slots__ = ("digest", "size", "preview", "search_text", "text", "path",
+                 "first_seen", "last_used", "copies")
+
+    def __init__(self, digest, text, size):
+        self.digest = digest
+        self.size = size
+        self.preview = text[:PREVIEW_CHARS]
+        self.text = text
+        self.path = None
+        # Lower-cased once so searches are a plain `in` per entry
+        self.search_text = (text if size <= SPILL_BYTES else self.preview).lower()
+        self.first_seen = self.last_used = time.time()
+        self.copies = 1
+
+    @property
+    def spilled(self):
+        return self.path is not None
+
+    def title(self, width=80):
+        """First line, shortened for list rows"""
+        line = self.preview.strip().split("\n", 1)[0]
+        return line if len(line) <= width else line[:width - 3] + "..."
+
+
+class ClipboardHistory:
+    """Content-addressed clipboard entries, most recently used last
+
+    Copying the same text again moves its entry to the front instead of
+    storing it twice. Entries over `spill_bytes` are written to
+    `spill_dir/<hash>.txt`; when the total size exceeds `budget_bytes` the
+    least recently used entries (and their files) are dropped. Searches match
+    the full text of in-memory entries and the first PREVIEW_CHARS of
+    spilled ones.
+
+    Copied text can include passwords, so without an explicit `spill_dir`
+    files go to a private (0700) directory made for this process on first
+    spill, and close() deletes it.
+    """
+
+    def __init__(self, budget_bytes=BUDGET_BYTES, spill_bytes=SPILL_BYTES, spill_dir=None):
+        self.budget_bytes = budget_bytes
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.memory_bytes = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, text, digest=None):
+        """Record a copied text; returns its entry (existing or new)"""
+        data = text.encode("utf-8")
+        digest = digest or hashlib.sha1(data).hexdigest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry.copies += 1
+                entry.last_used = time.time()
+                self._entries.move_to_end(digest)
+                return entry
+            entry = ClipEntry(digest, text, len(data))
+            if entry.size > self.spill_bytes:
+                if self.spill_dir is None:
+                    # mkdtemp creates the directory readable by this user only
+                    self.spill_dir = tempfile.mkdtemp(prefix="ahk_clipboard_")
+                os.makedirs(self.spill_dir, exist_ok=True)
+                entry.path = os.path.join(self.spill_dir, f"{digest}.txt")
+                with open(entry.path, "wb") as f:
+                    f.write(data)
+                entry.text = None
+            else:
+                self.memory_bytes += entry.size
+            self._entries[digest] = entry
+            self.total_bytes += entry.size
+            self._evict()
+            return entry
+
+    def _evict(self):
+        # Keep at least the newest entry even if it alone is over budget
+        while self.total_bytes > self.budget_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._forget(entry)
+            self.evicted += 1
+
+    def _forget(self, entry):
+        self.total_bytes -= entry.size
+        if entry.spilled:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        else:
+            self.memory_bytes -= entry.size
+
+    def text(self, entry):
+        """Full text of an entry, reading it back from disk if it was spilled"""
+        if not entry.spilled:
+            return entry.text
+        with open(entry.path, "rb") as f:
+            return f.read().decode("utf-8")
+
+    def touch(self, digest):
+        """Mark an entry as just used (e.g. pasted from the history)"""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry.last_used = time.time()
+                self._entries.move_to_end(digest)
+            return entry
+
+    def remove(self, digest):
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            if entry is not None:
+                self._forget(entry)
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._forget(entry)
+            self._entries.clear()
+
+    def close(self):
+        """Drop every entry and delete the spill files (and the private directory)"""
+        self.clear()
+        with self._lock:
+            if self._owns_spill_dir and self.spill_dir:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
+
+    def entries(self):
+        """All entries, most recently used first"""
+        with self._lock:
+            return list(reversed(self._entries.values()))
+
+    def search(self, query, limit=None):
+        """Entries whose text contains `query` (case-insensitive), most recent first"""
+        needle = query.lower()
+        matches = []
+        for entry in self.entries():
+            if needle in entry.search_text:
+                matches.append(entry)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+
+class ClipboardWatcher:
+    """Background poller that feeds clipboard changes into a ClipboardHistory
+
+    With a change counter (`sequence`, Windows' GetClipboardSequenceNumber)
+    an unchanged clipboard costs one integer read per poll; without one the
+    text is read and hashed, and only a new hash is stored.
+    """
+
+    def __init__(self, history, paste=None, sequence=None, interval=POLL_INTERVAL_S, on_change=None):
+        if paste is None:
+            import pyperclip
+            paste = pyperclip.paste
+        self.history = history
+        self.paste = paste
+        self.sequence = sequence if sequence is not None else clipboard_sequence()
+        self.interval = interval
+        self.on_change = on_change
+        self.polls = 0
+        self.reads = 0
+        self.changes = 0
+        self.errors = 0
+        self.poll_cpu_s = 0.0
+        self.started_at = None
+        self._last_sequence = None
+        self._last_digest = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="ClipboardWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop polling and close the history, so no copied text is left on disk"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+        self.history.close()
+
+    def poll(self):
+        """Check the clipboard once; returns the new entry if it changed"""
+        self.polls += 1
+        if self.sequence is not None:
+            number = self.sequence()
+            if number == self._last_sequence:
+                return None
+            self._last_sequence = number
+        text = self.paste()
+        self.reads += 1
+        if not text:
+            return None
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        if digest == self._last_digest:
+            return None
+        self._last_digest = digest
+        self.changes += 1
+        entry = self.history.add(text, digest)
+        if self.on_change:
+            self.on_change(entry)
+        return entry
+
+    @property
+    def overhead_percent(self):
+        """CPU time spent polling as a percentage of one core since start()"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        return self.poll_cpu_s / elapsed * 100 if elapsed > 0 else 0.0
+
+    def _run(self):
+        while not self._stop.is_set():
+            cpu_start = time.thread_time()
+            try:
+                self.poll()
+            except Exception as e:
+                # The clipboard is briefly locked while another app writes it
+                self.errors += 1
+                if self.errors <= 3:
+                    print(f"Error reading clipboard: {e}")
+            self.poll_cpu_s += time.thread_time() - cpu_start
+            self._stop.wait(self.interval)
+
+
+def benchmark(entries=10_000, searches=200, polls=2000, clip_bytes=1024 * 1024):
+    """Per-poll cost with and without a change counter, and search latency at 10k entries"""
+    import random
+    from stub_backend import StubClipboard
+
+    rng = random.Random(0)
+    words = ["invoice", "customer", "order", "ticket", "address", "phone", "status", "total",
+             "shipping", "refund", "account", "password", "meeting", "report", "draft"]
+    results = {"entries": entries}
+
+    # An unchanged 1 MB clipboard: re-read and hash every poll vs the counter
+    clipboard = StubClipboard("x" * clip_bytes)
+    spill_dir = tempfile.mkdtemp()
+    try:
+        for name, sequence in (("hash_poll_us", None), ("sequence_poll_us", clipboard.sequence)):
+            watcher = ClipboardWatcher(ClipboardHistory(spill_dir=spill_dir), paste=clipboard.paste)
+            watcher.sequence = sequence
+            start = time.perf_counter()
+            for _ in range(polls):
+                watcher.poll()
+            results[name] = (time.perf_counter() - start) * 1e6 / polls
+            results[name.replace("_us", "_reads")] = watcher.reads
+
+        history = ClipboardHistory(spill_dir=spill_dir)
+        for i in range(entries):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 40))) + f" #{i}"
+            history.add(text)
+            if i % 10 == 0:
+                history.add(text)  # repeated copies are deduplicated
+        history.add("y" * (SPILL_BYTES * 4))
+        results["stored"] = len(history)
+        results["memory_kb"] = history.memory_bytes // 1024
+
+        times = []
+        for _ in range(searches):
+            query = rng.choice(words) + " " + rng.choice(words)
+            start = time.perf_counter()
+            history.search(query)
+            times.append((time.perf_counter() - start) * 1000)
+        times.sort()
+        results["search_p50_ms"] = times[len(times) // 2]
+        results["search_p99_ms"] = times[int(len(times) * 0.99)]
+        return results
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print(benchmark())
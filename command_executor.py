@@ -0,0 +1,164 @@
+"""
+Command Executor - keeps AHK calls off the Tk main thread
+Description: Runs input-injection commands in submission order on one worker and
+read-only queries on a small pool, returning futures whose results are handed
+back to the GUI thread through a dispatch function (normally Tk's after())
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_QUERY_WORKERS = 4
+LAG_INTERVAL_MS = 50
+LAG_SAMPLES = 600
+
+
+def _call_now(fn, *args):
+    fn(*args)
+
+
+class CommandExecutor:
+    """One ordered input lane plus a pool for queries, with queued/in-flight counts
+
+    Input commands (clicks, sends, window changes) must not overtake each
+    other, so they share a single worker. Queries only read state and may run
+    concurrently. Callbacks are passed to `dispatch(fn, *args)`, which in the
+    GUI is `lambda fn, *a: self.after(0, fn, *a)` so they run on the Tk thread.
+    """
+
+    def __init__(self, dispatch=_call_now, query_workers=DEFAULT_QUERY_WORKERS):
+        self.dispatch = dispatch
+        self._input = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AHKInput")
+        self._query = ThreadPoolExecutor(max_workers=query_workers, thread_name_prefix="AHKQuery")
+        self._lock = threading.Lock()
+        self.queued = {"input": 0, "query": 0}
+        self.running = {"input": 0, "query": 0}
+        self.completed = 0
+        self.failed = 0
+
+    def run_input(self, fn, *args, on_done=None, on_error=None):
+        """Queue an input-injection command behind all earlier ones"""
+        return self._submit("input", self._input, fn, args, on_done, on_error)
+
+    def run_query(self, fn, *args, on_done=None, on_error=None):
+        """Run a read-only call on the query pool"""
+        return self._submit("query", self._query, fn, args, on_done, on_error)
+
+    def _submit(self, lane, pool, fn, args, on_done, on_error):
+        with self._lock:
+            self.queued[lane] += 1
+
+        def run():
+            with self._lock:
+                self.queued[lane] -= 1
+                self.running[lane] += 1
+            try:
+                result = fn(*args)
+            except Exception as e:
+                with self._lock:
+                    self.running[lane] -= 1
+                    self.failed += 1
+                if on_error:
+                    self.dispatch(on_error, e)
+                else:
+                    print(f"Error in {lane} command {getattr(fn, '__name__', fn)}: {e}")
+                raise
+            with self._lock:
+                self.running[lane] -= 1
+                self.completed += 1
+            if on_done:
+                self.dispatch(on_done, result)
+            return result
+
+        return pool.submit(run)
+
+    def pending(self):
+        """Commands queued or running across both lanes"""
+        with self._lock:
+            return sum(self.queued.values()) + sum(self.running.values())
+
+    def stats(self):
+        with self._lock:
+            return {"input_queued": self.queued["input"], "input_running": self.running["input"],
+                    "query_queued": self.queued["query"], "query_running": self.running["query"],
+                    "completed": self.completed, "failed": self.failed}
+
+    def shutdown(self, wait=False):
+        self._input.shutdown(wait=wait, cancel_futures=True)
+        self._query.shutdown(wait=wait, cancel_futures=True)
+
+
+class LagMonitor:
+    """Measures event-loop responsiveness: how late a periodic after() callback runs
+
+    `schedule(ms, fn)` is the loop's timer function (Tk's after). A callback
+    that fires 20 ms late means the loop was blocked for about that long.
+    """
+
+    def __init__(self, schedule, interval_ms=LAG_INTERVAL_MS, samples=LAG_SAMPLES):
+        self.schedule = schedule
+        self.interval_ms = interval_ms
+        self.lag_ms = deque(maxlen=samples)
+        self._expected = None
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._arm()
+
+    def stop(self):
+        self._running = False
+
+    def _arm(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self.schedule(self.interval_ms, self._tick)
+
+    def _tick(self):
+        self.lag_ms.append(max(0.0, (time.perf_counter() - self._expected) * 1000))
+        if self._running:
+            self._arm()
+
+    def stats(self):
+        """p50/p99/max lag in ms over the recent samples"""
+        values = sorted(self.lag_ms)
+        if not values:
+            return {"p50": 0.0, "p99": 0.0, "max": 0.0}
+        return {"p50": values[len(values) // 2],
+                "p99": values[min(len(values) - 1, int(len(values) * 0.99))],
+                "max": values[-1]}
+
+
+def benchmark(clicks=10, seconds=4.0):
+    """Event-loop lag while a double-click loop runs inline vs through the executor"""
+    from stub_backend import StubAHK, StubEventLoop
+
+    def double_clicks(ahk):
+        for _ in range(clicks):
+            for _ in range(2):
+                ahk.click(button="left")
+                time.sleep(0.1)
+
+    results = {}
+    for mode in ("inline", "executor"):
+        loop = StubEventLoop()
+        ahk = StubAHK(latency=0.005)
+        lag = LagMonitor(loop.after, interval_ms=10)
+        lag.start()
+        executor = CommandExecutor(dispatch=lambda fn, *a: loop.after(0, fn, *a))
+        if mode == "inline":
+            loop.after(100, double_clicks, ahk)
+        else:
+            loop.after(100, lambda: executor.run_input(double_clicks, ahk))
+        loop.run(seconds)
+        executor.shutdown(wait=True)
+        results[mode] = lag.stats()
+    return results
+
+
+if __name__ == "__main__":
+    for mode, s in benchmark().items():
+        print(f"{mode:<9} lag p50 {s['p50']:7.2f} ms  p99 {s['p99']:8.2f} ms  max {s['max']:8.2f} ms")
@@ -0,0 +1,263 @@
+"""
+Config Store - crash-safe, debounced persistence for the hotkey table
+Description: Keeps hotkeys in a per-user config file written atomically (temp file,
+fsync, rename) from a background thread, coalescing bursts of changes into one
+write; bulk imports and exports of large profiles happen in a single transaction
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+APP_DIR_NAME = "PythonAHKGUI"
+HOTKEYS_NAME = "hotkeys.json"
+LEGACY_HOTKEYS_FILE = "hotkeys.json"
+DEBOUNCE_S = 0.5
+MAX_DELAY_S = 5.0
+
+
+def default_config_dir():
+    """%APPDATA%\\PythonAHKGUI on Windows, $XDG_CONFIG_HOME/PythonAHKGUI (or ~/.config) elsewhere"""
+    base = os.environ.get("APPDATA") if os.name == "nt" else os.environ.get("XDG_CONFIG_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, APP_DIR_NAME)
+
+
+def default_hotkeys_path():
+    return os.path.join(default_config_dir(), HOTKEYS_NAME)
+
+
+def atomic_write(path, data):
+    """Replace `path` with `data` (bytes) so readers see the old or new file, never a partial one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    if os.name != "nt":
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def encode_hotkeys(hotkeys, pretty=False):
+    if pretty:
+        return json.dumps(hotkeys, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(hotkeys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def validate_hotkeys(hotkeys):
+    """Raise ValueError unless `hotkeys` is a {hotkey: {action, value}} table"""
+    if not isinstance(hotkeys, dict):
+        raise ValueError("Hotkey file must contain a JSON object")
+    for hotkey, data in hotkeys.items():
+        if not isinstance(data, dict) or "action" not in data or "value" not in data:
+            raise ValueError(f"Hotkey '{hotkey}' needs an action and a value")
+    return hotkeys
+
+
+def read_hotkeys(path):
+    """Hotkey table from a JSON file"""
+    with open(path, "rb") as f:
+        return validate_hotkeys(json.loads(f.read()))
+
+
+class ConfigStore:
+    """The hotkey table on disk; `save` returns at once and the write happens later
+
+    Saves within `debounce` seconds of each other are coalesced into one
+    write of the latest table, but a continuous stream of changes is still
+    written at least every `max_delay` seconds. Inside `transaction()` saves
+    are held back until the block ends.
+    """
+
+    def __init__(self, path=None, debounce=DEBOUNCE_S, max_delay=MAX_DELAY_S, legacy_path=LEGACY_HOTKEYS_FILE):
+        self.path = path or default_hotkeys_path()
+        self.legacy_path = legacy_path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._pending = None
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self._depth = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        # Held across take-pending-and-write so an older table never lands after a newer one
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self.writes = 0
+        self.last_write_ms = 0.0
+        self.last_error = None
+
+    def load(self):
+        """The saved table; on first run the old ./hotkeys.json is adopted if present"""
+        if os.path.exists(self.path):
+            return read_hotkeys(self.path)
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            hotkeys = read_hotkeys(self.legacy_path)
+            self.write_now(hotkeys)
+            return hotkeys
+        return {}
+
+    def save(self, hotkeys):
+        """Queue `hotkeys` for writing; returns immediately
+
+        The table is copied now, the per-hotkey dicts are not: callers replace
+        bindings rather than mutating them.
+        """
+        snapshot = dict(hotkeys)
+        with self._cond:
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_change = now
+            self._pending = snapshot
+            self._last_change = now
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, daemon=True, name="ConfigStore")
+                self._thread.start()
+            self._cond.notify()
+
+    @contextmanager
+    def transaction(self):
+        """Hold writes until the block exits, then write the last saved table once"""
+        with self._cond:
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._cond:
+                self._depth -= 1
+                self._last_change = 0.0
+                self._cond.notify()
+
+    def _due_in(self):
+        """Seconds until the pending table should be written (<= 0 means now)"""
+        if self._depth:
+            return None
+        return min(self._last_change + self.debounce, self._first_change + self.max_delay) - time.monotonic()
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._pending is not None:
+                        due = self._due_in()
+                        if due is not None and due <= 0:
+                            break
+                    else:
+                        due = None
+                    self._cond.wait(due)
+                if self._closed and self._pending is None:
+                    return
+            self.flush()
+
+    def _write(self, hotkeys):
+        start = time.perf_counter()
+        try:
+            atomic_write(self.path, encode_hotkeys(hotkeys))
+            self.last_error = None
+        except OSError as e:
+            self.last_error = e
+            print(f"Error saving hotkeys: {e}")
+            return
+        self.writes += 1
+        self.last_write_ms = (time.perf_counter() - start) * 1000
+
+    def write_now(self, hotkeys):
+        """Write synchronously, dropping any pending debounced save"""
+        with self._write_lock:
+            with self._cond:
+                self._pending = None
+            self._write(hotkeys)
+
+    def flush(self):
+        """Write any pending save now (e.g. before exit)"""
+        with self._write_lock:
+            with self._cond:
+                hotkeys, self._pending = self._pending, None
+            if hotkeys is not None:
+                self._write(hotkeys)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    # ===== Bulk import / export =====
+
+    def import_file(self, path, into=None):
+        """Merge a profile file into `into` (or start empty) and save once; returns the new table"""
+        imported = read_hotkeys(path)
+        hotkeys = dict(into or {})
+        with self.transaction():
+            hotkeys.update(imported)
+            self.save(hotkeys)
+        return hotkeys
+
+    def export_file(self, hotkeys, path):
+        """Write a human-readable copy of `hotkeys` to `path`"""
+        atomic_write(path, encode_hotkeys(hotkeys, pretty=True))
+
+
+def benchmark(bindings=10_000, edits=200):
+    """Load time of a 10k-binding profile (indented vs compact) and writes for a burst of edits"""
+    import shutil
+
+    hotkeys = {f"Ctrl+Alt+F{i % 24 + 1}+{i}": {"action": "Send Text", "value": f"text {i}"}
+               for i in range(bindings)}
+    directory = tempfile.mkdtemp()
+    try:
+        results = {"bindings": bindings}
+        legacy = os.path.join(directory, "legacy.json")
+        with open(legacy, "w") as f:
+            json.dump(hotkeys, f, indent=2)
+        store = ConfigStore(os.path.join(directory, HOTKEYS_NAME), legacy_path=None)
+        store.write_now(hotkeys)
+        for name, path, reader in (("legacy_indented", legacy, lambda p: json.load(open(p))),
+                                   ("store_compact", store.path, read_hotkeys)):
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                reader(path)
+                times.append(time.perf_counter() - start)
+            results[f"{name}_load_ms"] = sorted(times)[2] * 1000
+            results[f"{name}_bytes"] = os.path.getsize(path)
+
+        # Old behaviour: every edit rewrote the whole file synchronously
+        start = time.perf_counter()
+        for i in range(edits):
+            hotkeys[f"Edit{i}"] = {"action": "Send Text", "value": "x"}
+            with open(legacy, "w") as f:
+                json.dump(hotkeys, f, indent=2)
+        results["sync_edits_s"] = time.perf_counter() - start
+
+        store.writes = 0
+        start = time.perf_counter()
+        for i in range(edits):
+            hotkeys[f"Edit{i}"] = {"action": "Send Text", "value": "y"}
+            store.save(hotkeys)
+        results["debounced_edits_caller_s"] = time.perf_counter() - start
+        store.close()
+        results["debounced_edits_writes"] = store.writes
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print(benchmark())
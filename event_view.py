@@ -0,0 +1,153 @@
+"""
+Event View - filtered, windowed view over a recorded EventBuffer
+Description: Maps list rows to event indexes (all events, or only some event types)
+and formats rows on demand, so the recorder's list only ever touches the events
+on screen; new events are picked up incrementally while recording
+"""
+
+import time
+from array import array
+from bisect import bisect_left
+
+from macro_recorder import (EV_DOWN, EV_HSCROLL, EV_KEY_DOWN, EV_KEY_UP, EV_MOVE, EV_SCROLL,
+                            EV_UP, EVENT_NAMES, EventBuffer)
+
+# Filter label -> event codes shown (None shows everything)
+EVENT_FILTERS = {
+    "All events": None,
+    "No mouse moves": frozenset(set(EVENT_NAMES) - {EV_MOVE}),
+    "Mouse moves": frozenset({EV_MOVE}),
+    "Clicks": frozenset({EV_DOWN, EV_UP}),
+    "Scrolls": frozenset({EV_SCROLL, EV_HSCROLL}),
+    "Keys": frozenset({EV_KEY_DOWN, EV_KEY_UP}),
+}
+
+
+class EventView:
+    """Rows of an EventBuffer, optionally limited to a set of event codes
+
+    Unfiltered, row i is event i and nothing is stored. Filtered, the matching
+    event indexes are kept in an int64 array that `sync` extends with only the
+    events recorded since the previous call.
+    """
+
+    def __init__(self, buffer=None, codes=None):
+        self.buffer = buffer if buffer is not None else EventBuffer()
+        self.codes = None
+        self._rows = array("q")
+        self._synced = 0
+        self.set_filter(codes)
+
+    def __len__(self):
+        return self._synced if self.codes is None else len(self._rows)
+
+    def set_buffer(self, buffer):
+        """Show a different buffer (after loading or clearing a macro)"""
+        self.buffer = buffer
+        self._rebuild()
+
+    def set_filter(self, codes):
+        """Show only events whose code is in `codes` (None for all)"""
+        self.codes = frozenset(codes) if codes is not None else None
+        self._rebuild()
+
+    def _rebuild(self):
+        self._rows = array("q")
+        self._synced = 0
+        self.sync()
+
+    def sync(self):
+        """Pick up events appended since the last call; returns the row count"""
+        count = len(self.buffer)
+        if count < self._synced:
+            # The buffer was cleared or replaced in place
+            self._rebuild()
+            return len(self)
+        if count > self._synced and self.codes is not None:
+            import numpy as np
+            codes = np.frombuffer(self.buffer.columns(self._synced, count)["code"], dtype=np.uint8)
+            matches = np.flatnonzero(np.isin(codes, list(self.codes))) + self._synced
+            self._rows.frombytes(matches.astype(np.int64).tobytes())
+        self._synced = count
+        return len(self)
+
+    def event_index(self, row):
+        return row if self.codes is None else self._rows[row]
+
+    def row_at_time(self, seconds):
+        """First row at or after `seconds` into the recording (clamped to the last row)"""
+        if not len(self):
+            return 0
+        target = self.buffer.t[0] + int(seconds * 1e9)
+        index = bisect_left(self.buffer.t, target, 0, self._synced)
+        if self.codes is not None:
+            index = bisect_left(self._rows, index)
+        return min(index, len(self) - 1)
+
+    def row_text(self, row):
+        """One display line: number, time, type and the event's fields"""
+        index = self.event_index(row)
+        event = self.buffer.event(index)
+        start = self.buffer.t[0]
+        fields = "  ".join(f"{k}={v}" for k, v in event.items() if k not in ("type", "t"))
+        return f"{index + 1:>8}. {(self.buffer.t[index] - start) / 1e9:10.3f}s  {event['type']:<10} {fields}"
+
+
+def benchmark(events=1_000_000, page=40, scrolls=200):
+    """Cost of formatting every event (old full redraw) vs one page per scroll at 1M events"""
+    import random
+
+    rng = random.Random(0)
+    buf = EventBuffer(events)
+    key = buf.key_id("a")
+    for i in range(events):
+        roll = rng.random()
+        t = i * 2_000_000
+        if roll < 0.9:
+            buf.append(t, EV_MOVE, i % 1920, i % 1080)
+        elif roll < 0.95:
+            buf.append(t, EV_DOWN if i % 2 else EV_UP, i % 1920, i % 1080, 0)
+        else:
+            buf.append(t, EV_KEY_DOWN if i % 2 else EV_KEY_UP, data=key)
+
+    start = time.perf_counter()
+    lines = [f"{i}. {action}" for i, action in enumerate(buf, 1)]
+    full_s = time.perf_counter() - start
+    del lines
+
+    view = EventView(buf)
+    worst_ms = 0.0
+    for _ in range(scrolls):
+        top = rng.randrange(len(view) - page)
+        start = time.perf_counter()
+        for row in range(top, top + page):
+            view.row_text(row)
+        worst_ms = max(worst_ms, (time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    view.set_filter(EVENT_FILTERS["Keys"])
+    # The first filter also pays for importing NumPy
+    first_filter_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    view.set_filter(EVENT_FILTERS["Clicks"])
+    view.set_filter(EVENT_FILTERS["Keys"])
+    filter_ms = (time.perf_counter() - start) * 1000 / 2
+    filtered_rows = len(view)
+
+    start = time.perf_counter()
+    row = view.row_at_time(buf.duration / 2)
+    jump_ms = (time.perf_counter() - start) * 1000
+
+    for i in range(500):
+        buf.append((events + i) * 2_000_000, EV_KEY_DOWN, data=key)
+    start = time.perf_counter()
+    view.sync()
+    sync_ms = (time.perf_counter() - start) * 1000
+
+    return {"events": events, "full_format_s": full_s, "page_worst_ms": worst_ms,
+            "first_filter_ms": first_filter_ms, "filter_ms": filter_ms, "filtered_rows": filtered_rows,
+            "jump_to_time_ms": jump_ms, "jump_row": row, "sync_500_new_ms": sync_ms}
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,247 @@
+"""
+Hotkey Engine - registers the GUI hotkey table with AHK and dispatches triggers
+Description: All bindings run in AHK's single resident hotkey process; triggers are
+resolved through a precomputed action table and the Python-side dispatch overhead is
+recorded (the time AHK takes to notice a key press happens before Python sees it and
+is not included)
+"""
+
+import threading
+import time
+from collections import deque
+
+from key_combo import normalize_hotkey
+
+DISPATCH_SAMPLES = 2048
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sequence of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class HotkeyEngine:
+    """Keeps AHK's hotkey process in sync with a {hotkey: {action, value}} table"""
+
+    def __init__(self, ahk, send_text=None, run_script=None):
+        self.ahk = ahk
+        self.send_text = send_text
+        self.run_script = run_script
+        self.handlers = {
+            "Send Text": self._action_send_text,
+            "Run Script": self._action_run_script,
+            "Mouse Click": self._action_mouse_click,
+            "Open Program": self._action_open_program,
+            "Custom AHK": self._action_run_script,
+        }
+        # normalized hotkey -> (handler, value), the only lookup done on trigger
+        self._table = {}
+        self._registered = set()
+        self._running = False
+        self._lock = threading.Lock()
+        self._dispatch_ns = deque(maxlen=DISPATCH_SAMPLES)
+        self._handler_ns = deque(maxlen=DISPATCH_SAMPLES)
+        self.errors = deque(maxlen=100)
+        # hotkey -> reason, for bindings the last compile left out
+        self.invalid = {}
+        self.restarts = 0
+
+    def validate(self, hotkey, data):
+        """(normalized hotkey, handler) for one binding; ValueError if it can't be registered"""
+        handler = self.handlers.get(data.get("action"))
+        if handler is None:
+            raise ValueError(f"Unknown action '{data.get('action')}' for hotkey '{hotkey}'")
+        return normalize_hotkey(hotkey), handler
+
+    def compile(self, hotkeys):
+        """Build the normalized action table for a hotkey dict
+
+        A binding that doesn't parse is left out and recorded in `invalid`
+        rather than failing the whole table, so one bad entry in a saved
+        profile doesn't keep every other hotkey from registering.
+        """
+        table = {}
+        sources = {}
+        invalid = {}
+        for hotkey, data in hotkeys.items():
+            try:
+                keyname, handler = self.validate(hotkey, data)
+                if keyname in table:
+                    # "Ctrl+A" and "^a" are the same AHK hotkey; keep the first
+                    raise ValueError(f"Same hotkey as '{sources[keyname]}'")
+            except ValueError as e:
+                invalid[hotkey] = str(e)
+                print(f"Skipping hotkey '{hotkey}': {e}")
+                continue
+            table[keyname] = (handler, data.get("value", ""))
+            sources[keyname] = hotkey
+        self.invalid = invalid
+        return table
+
+    def sync(self, hotkeys):
+        """Apply a new hotkey table, touching AHK only for added/removed keys"""
+        table = self.compile(hotkeys)
+        with self._lock:
+            added = table.keys() - self._registered
+            removed = self._registered - table.keys()
+            # Swapping the table is enough for bindings whose action/value changed
+            self._table = table
+            if not added and not removed:
+                return added, removed
+
+            # Every add/remove restarts AHK's hotkey process while it runs,
+            # so stop it once, apply the whole diff, then start it once
+            if self._running:
+                self.ahk.stop_hotkeys()
+                self._running = False
+            registered = set(self._registered)
+            try:
+                for keyname in removed:
+                    self.ahk.remove_hotkey(keyname)
+                    registered.discard(keyname)
+                for keyname in added:
+                    self.ahk.add_hotkey(keyname, self._make_callback(keyname),
+                                        ex_handler=self._on_error)
+                    registered.add(keyname)
+            finally:
+                # Even if the diff failed partway, what did get applied is
+                # restarted so the hotkeys that worked before keep working
+                self._registered = registered
+                if registered:
+                    self.ahk.start_hotkeys()
+                    self.restarts += 1
+                    self._running = True
+        return added, removed
+
+    def stop(self):
+        """Stop the AHK hotkey process"""
+        with self._lock:
+            if self._running:
+                self.ahk.stop_hotkeys()
+                self._running = False
+
+    def trigger(self, keyname, started_ns=None):
+        """Run the action bound to a normalized hotkey"""
+        if started_ns is None:
+            started_ns = time.perf_counter_ns()
+        entry = self._table.get(keyname)
+        if entry is None:
+            return
+        handler, value = entry
+        self._dispatch_ns.append(time.perf_counter_ns() - started_ns)
+        try:
+            handler(value)
+        finally:
+            self._handler_ns.append(time.perf_counter_ns() - started_ns)
+
+    def run_action(self, action, value):
+        """Run a hotkey action directly, e.g. from a screen watch"""
+        handler = self.handlers.get(action)
+        if handler is None:
+            raise ValueError(f"Unknown action '{action}'")
+        handler(value)
+
+    def dispatch_stats(self):
+        """p50/p99 ms from the Python callback starting to the action starting
+        (dispatch overhead) and to the action returning (handler time)
+
+        The clock starts when the ahk library calls back into Python, so the
+        time between the key press and that callback is not measured.
+        """
+        dispatch = list(self._dispatch_ns)
+        handler = list(self._handler_ns)
+        return {
+            "count": len(handler),
+            "dispatch_overhead_p50_ms": percentile(dispatch, 50) / 1e6,
+            "dispatch_overhead_p99_ms": percentile(dispatch, 99) / 1e6,
+            "handler_p50_ms": percentile(handler, 50) / 1e6,
+            "handler_p99_ms": percentile(handler, 99) / 1e6,
+        }
+
+    def _make_callback(self, keyname):
+        def callback():
+            self.trigger(keyname, time.perf_counter_ns())
+        return callback
+
+    def _on_error(self, keyname, exc):
+        self.errors.append((keyname, exc))
+        print(f"Error in hotkey '{keyname}': {exc}")
+
+    # ===== Actions =====
+
+    def _action_send_text(self, value):
+        if self.send_text:
+            self.send_text(value)
+        else:
+            self.ahk.send(value, raw=True)
+
+    def _action_run_script(self, value):
+        if self.run_script:
+            self.run_script(value)
+        else:
+            self.ahk.run_script(value, blocking=False)
+
+    def _action_mouse_click(self, value):
+        # "left", "right", "middle" or "x,y[,button]"
+        parts = [p.strip() for p in value.split(",") if p.strip()]
+        if len(parts) >= 2:
+            button = parts[2] if len(parts) > 2 else "left"
+            self.ahk.click(int(parts[0]), int(parts[1]), button=button)
+        else:
+            self.ahk.click(button=parts[0] if parts else "left")
+
+    def _action_open_program(self, value):
+        self._action_run_script(f"Run, {value}")
+
+
+def benchmark(bindings=500, triggers=20000):
+    """Measure sync cost and Python dispatch overhead with many bindings on a stub backend"""
+    import random
+    from itertools import combinations
+    from stub_backend import StubAHK
+
+    stub = StubAHK(latency=0)
+    engine = HotkeyEngine(stub, send_text=lambda value: None)
+    keys = list("abcdefghijklmnopqrstuvwxyz0123456789") + [f"F{i}" for i in range(1, 25)]
+    mods = ["+".join(c) for n in range(1, 5) for c in combinations(["Ctrl", "Alt", "Shift", "Win"], n)]
+    combos = [f"{m}+{k}" for m in mods for k in keys]
+    hotkeys = {combo: {"action": "Send Text", "value": combo} for combo in combos[:bindings]}
+
+    start = time.perf_counter()
+    engine.sync(hotkeys)
+    full_sync = time.perf_counter() - start
+    full_calls = stub.round_trips
+
+    stub.reset()
+    hotkeys["Ctrl+Alt+Shift+Win+Space"] = {"action": "Send Text", "value": "new"}
+    start = time.perf_counter()
+    engine.sync(hotkeys)
+    diff_sync = time.perf_counter() - start
+
+    names = list(stub.hotkey_callbacks)
+    for _ in range(triggers):
+        stub.trigger_hotkey(random.choice(names))
+
+    stats = engine.dispatch_stats()
+    stats.update({
+        "bindings": len(hotkeys),
+        "full_sync_seconds": full_sync,
+        "full_sync_calls": full_calls,
+        "diff_sync_seconds": diff_sync,
+        "diff_sync_calls": stub.round_trips,
+    })
+    return stats
+
+
+if __name__ == "__main__":
+    r = benchmark()
+    print(f"{r['bindings']} bindings: full sync {r['full_sync_calls']} calls "
+          f"{r['full_sync_seconds'] * 1000:.2f} ms, one-key diff {r['diff_sync_calls']} calls "
+          f"{r['diff_sync_seconds'] * 1000:.2f} ms")
+    print(f"{r['count']} triggers: dispatch overhead p50 {r['dispatch_overhead_p50_ms']:.4f} ms "
+          f"p99 {r['dispatch_overhead_p99_ms']:.4f} ms, handler p50 {r['handler_p50_ms']:.4f} ms "
+          f"p99 {r['handler_p99_ms']:.4f} ms")
@@ -0,0 +1,200 @@
+"""
+Key Combo - one grammar for key combos and hotkeys, compiled once per string
+Description: Parses "Ctrl+Shift+A", "^+a", "Ctrl+K, Ctrl+C" and "~*F1" style notation,
+validates every key name up front and compiles it to an AHK Send string or hotkey
+name; compiled results are kept in an LRU cache keyed by the input string
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+MODIFIERS = {"ctrl": "^", "control": "^", "alt": "!", "shift": "+", "win": "#"}
+MODIFIER_ORDER = "^!+#"
+# AHK hotkey prefixes that are not modifiers but must be kept (wildcard, pass-through, hook)
+PREFIXES = "*~$"
+CACHE_SIZE = 1024
+
+# Canonical AHK key names; lookups are case-insensitive and accept the aliases below
+_NAMED_KEYS = (
+    ["Enter", "Tab", "Escape", "Space", "Backspace", "Delete", "Insert", "Home", "End",
+     "PgUp", "PgDn", "Up", "Down", "Left", "Right", "CapsLock", "ScrollLock", "NumLock",
+     "PrintScreen", "Pause", "Break", "AppsKey", "Sleep", "Help", "CtrlBreak",
+     "Ctrl", "LCtrl", "RCtrl", "Alt", "LAlt", "RAlt", "Shift", "LShift", "RShift",
+     "LWin", "RWin", "LButton", "RButton", "MButton", "XButton1", "XButton2",
+     "WheelUp", "WheelDown", "WheelLeft", "WheelRight",
+     "NumpadDot", "NumpadDel", "NumpadIns", "NumpadClear", "NumpadUp", "NumpadDown",
+     "NumpadLeft", "NumpadRight", "NumpadHome", "NumpadEnd", "NumpadPgUp", "NumpadPgDn",
+     "NumpadDiv", "NumpadMult", "NumpadAdd", "NumpadSub", "NumpadEnter",
+     "Browser_Back", "Browser_Forward", "Browser_Refresh", "Browser_Stop", "Browser_Search",
+     "Browser_Favorites", "Browser_Home", "Volume_Mute", "Volume_Down", "Volume_Up",
+     "Media_Next", "Media_Prev", "Media_Stop", "Media_Play_Pause",
+     "Launch_Mail", "Launch_Media", "Launch_App1", "Launch_App2"]
+    + [f"F{i}" for i in range(1, 25)]
+    + [f"Numpad{i}" for i in range(10)]
+)
+KEY_NAMES = {name.lower(): name for name in _NAMED_KEYS}
+KEY_NAMES.update({
+    "esc": "Escape", "return": "Enter", "bs": "Backspace", "del": "Delete", "ins": "Insert",
+    "pageup": "PgUp", "pagedown": "PgDn", "control": "Ctrl", "win": "LWin", "apps": "AppsKey",
+    "menu": "AppsKey", "prtsc": "PrintScreen", "capital": "CapsLock",
+})
+_VK_SC = re.compile(r"(?:vk(?P<vk>[0-9a-f]{1,2}))?(?:sc(?P<sc>[0-9a-f]{1,3}))?", re.IGNORECASE)
+
+# Characters that mean something to Send and must be braced to be sent literally
+_SEND_SPECIAL = set("^!+#{}")
+
+# One combo: optional hotkey prefix, "Ctrl+"-style modifier words and/or "^!+#"
+# symbols, then the key (a {Name}, a word, or any single character such as "+" or ",")
+_COMBO = re.compile(
+    r"\s*(?P<prefix>[*~$]*)"
+    r"(?P<words>(?:(?:ctrl|control|alt|shift|win)\s*\+\s*)*)"
+    r"(?P<symbols>[\^!+#]*)"
+    r"(?P<key>\{[^}]+\}|\w+|\S)\s*",
+    re.IGNORECASE,
+)
+_SEPARATOR = re.compile(r",\s*")
+# AHK custom combination hotkey: "XButton1 & WheelUp", optionally with "~"/"*"/"$"
+_CUSTOM = re.compile(r"(?P<prefix>[*~$]*)(?P<first>\S+)\s+&\s+(?P<second>\S+)")
+
+# key is AHK's canonical spelling; name is the key as it was written
+Combo = namedtuple("Combo", "prefix mods key name")
+
+
+def canonical_key(name):
+    """AHK's spelling of a key name or single character; ValueError if unknown"""
+    if len(name) == 1:
+        return name
+    canonical = KEY_NAMES.get(name.lower())
+    if canonical:
+        return canonical
+    match = _VK_SC.fullmatch(name)
+    if match and (match["vk"] or match["sc"]):
+        return "".join(f"{prefix}{match[prefix].upper()}" for prefix in ("vk", "sc") if match[prefix])
+    raise ValueError(f"Unknown key '{name}'")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_combo(text):
+    """Parse a combo or a comma-separated sequence of combos into a tuple of Combo"""
+    text = text.strip()
+    if not text:
+        raise ValueError("Empty key combo")
+    combos = []
+    pos = 0
+    while True:
+        match = _COMBO.match(text, pos)
+        if match is None:
+            raise ValueError(f"Can't parse key combo '{text}' at position {pos + 1}")
+        words = [w.strip().lower() for w in match["words"].split("+") if w.strip()]
+        mods = {MODIFIERS[w] for w in words} | set(match["symbols"])
+        name = match["key"]
+        if name.startswith("{"):
+            name = name[1:-1].strip()
+        try:
+            key = canonical_key(name)
+        except ValueError as e:
+            raise ValueError(f"{e} in key combo '{text}'") from None
+        combos.append(Combo(match["prefix"], "".join(m for m in MODIFIER_ORDER if m in mods), key, name))
+        pos = match.end()
+        if pos == len(text):
+            return tuple(combos)
+        separator = _SEPARATOR.match(text, pos)
+        if separator is None:
+            raise ValueError(f"Expected ',' between combos in '{text}' at position {pos + 1}")
+        pos = separator.end()
+        if pos == len(text):
+            # "Ctrl+K," - the comma key itself is written "Ctrl+," or "{,}"
+            raise ValueError(f"Key combo '{text}' ends with a separator")
+
+
+def _send_key(key, mods):
+    if len(key) == 1:
+        if key in _SEND_SPECIAL:
+            return f"{{{key}}}"
+        # An upper-case letter after a modifier would also press Shift
+        return key.lower() if mods else key
+    return f"{{{key}}}"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def compile_send(text):
+    """AHK Send string for a combo or sequence, e.g. "Ctrl+K, Ctrl+C" -> "^k^c"
+
+    A whole sequence compiles to one string, so it is sent in a single call.
+    """
+    parts = []
+    for combo in parse_combo(text):
+        if combo.prefix:
+            raise ValueError(f"Hotkey prefix '{combo.prefix}' can't be sent in '{text}'")
+        parts.append(combo.mods + _send_key(combo.key, combo.mods))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_hotkey(hotkey):
+    """Convert 'Ctrl+Shift+A', '^+a' or 'XButton1 & WheelUp' style notation to canonical AHK notation
+
+    Key names are validated but keep the alias they were written with
+    ("Ctrl+Esc" -> "^esc"), so saved bindings register under the same
+    names they always have.
+    """
+    custom = _CUSTOM.fullmatch(hotkey.strip())
+    if custom:
+        for name in (custom["first"], custom["second"]):
+            try:
+                canonical_key(name)
+            except ValueError as e:
+                raise ValueError(f"{e} in hotkey '{hotkey.strip()}'") from None
+        return f"{custom['prefix']}{custom['first'].lower()} & {custom['second'].lower()}"
+    combos = parse_combo(hotkey)
+    if len(combos) > 1:
+        raise ValueError(f"Hotkey '{hotkey.strip()}' must be a single combo")
+    combo = combos[0]
+    return f"{combo.prefix}{combo.mods}{combo.name.lower()}"
+
+
+def cache_info():
+    """Hit/miss counts of the parse and compile caches"""
+    return {"parse": parse_combo.cache_info(), "send": compile_send.cache_info(),
+            "hotkey": normalize_hotkey.cache_info()}
+
+
+def benchmark(calls=100_000):
+    """Old chained str.replace vs the cached compiler, and correctness of both"""
+    import time
+
+    def legacy(combo):
+        return combo.replace("Ctrl", "^").replace("Alt", "!").replace("Shift", "+").replace("Win", "#")
+
+    combos = ["Ctrl+C", "Ctrl+Shift+Esc", "Alt+Tab", "Win+R", "Ctrl+K, Ctrl+C", "Ctrl+Alt+Del", "^+s"]
+    expected = ["^c", "^+{Escape}", "!{Tab}", "#r", "^k^c", "^!{Delete}", "^+s"]
+    results = {
+        "legacy_correct": sum(legacy(c) == e for c, e in zip(combos, expected)),
+        "compiled_correct": sum(compile_send(c) == e for c, e in zip(combos, expected)),
+        "combos": len(combos),
+        "legacy_example": legacy("Ctrl+C"),
+    }
+
+    start = time.perf_counter()
+    for i in range(calls):
+        legacy(combos[i % len(combos)])
+    results["legacy_ns"] = (time.perf_counter() - start) * 1e9 / calls
+
+    compile_send.cache_clear()
+    parse_combo.cache_clear()
+    start = time.perf_counter()
+    for combo in combos:
+        compile_send.__wrapped__(combo)
+    results["uncached_parse_ns"] = (time.perf_counter() - start) * 1e9 / len(combos)
+
+    start = time.perf_counter()
+    for i in range(calls):
+        compile_send(combos[i % len(combos)])
+    results["cached_ns"] = (time.perf_counter() - start) * 1e9 / calls
+    results["cache"] = compile_send.cache_info()._asdict()
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,203 @@
+"""
+Log Sink - bounded, batched writer for the GUI's status and log textboxes
+Description: Buffers messages from any thread, applies them to a Tk text widget in
+one insert per frame, keeps only the newest lines (ring buffer) and can mirror
+everything to a size-rotated file
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+MAX_LINES = 1000
+FRAME_MS = 16
+FILE_MAX_BYTES = 1024 * 1024
+FILE_BACKUPS = 3
+
+
+class RotatingFile:
+    """Append-only text file rotated to path.1 .. path.N once it exceeds max_bytes"""
+
+    def __init__(self, path, max_bytes=FILE_MAX_BYTES, backups=FILE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = None
+
+    def write(self, text):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(text)
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LogSink:
+    """Line-capped view of a message stream in a text widget
+
+    `write` may be called from any thread; messages are applied on the next
+    frame via `schedule` (Tk's after) as a single insert, and the widget is
+    trimmed to the newest `max_lines` with a single delete. `replace` swaps the
+    whole content (for list-style displays) and is coalesced the same way.
+    """
+
+    def __init__(self, widget, schedule, max_lines=MAX_LINES, timestamps=False,
+                 follow=True, path=None, max_bytes=FILE_MAX_BYTES, backups=FILE_BACKUPS):
+        self.widget = widget
+        self.schedule = schedule
+        self.max_lines = max_lines
+        self.timestamps = timestamps
+        self.follow = follow
+        self.file = RotatingFile(path, max_bytes, backups) if path else None
+        # The newest max_lines lines, which is exactly what the widget shows
+        self.ring = deque(maxlen=max_lines)
+        self._pending = deque()
+        self._rebuild = False
+        self._scheduled = False
+        self._widget_lines = 0
+        self._lock = threading.Lock()
+        self.written = 0
+        self.flushes = 0
+
+    def write(self, message):
+        """Queue one message (may contain newlines); safe from any thread"""
+        if self.timestamps:
+            message = f"[{datetime.now().strftime('%H:%M:%S')}] {message}"
+        with self._lock:
+            self._pending.append(message)
+            self.written += 1
+            self._schedule_flush()
+
+    def replace(self, lines):
+        """Show exactly `lines` (the newest max_lines of them) on the next frame"""
+        with self._lock:
+            self._pending.clear()
+            self.ring.clear()
+            self.ring.extend(lines)
+            self._rebuild = True
+            self._schedule_flush()
+
+    def clear(self):
+        self.replace(())
+
+    def _schedule_flush(self):
+        if not self._scheduled:
+            self._scheduled = True
+            self.schedule(FRAME_MS, self.flush)
+
+    def flush(self):
+        """Apply queued messages to the widget; runs on the Tk thread"""
+        with self._lock:
+            self._scheduled = False
+            pending = list(self._pending)
+            self._pending.clear()
+            rebuild = self._rebuild
+            self._rebuild = False
+            lines = [line for message in pending for line in message.rstrip("\n").split("\n")]
+            if len(lines) >= self.max_lines:
+                rebuild = True
+            self.ring.extend(lines)
+            snapshot = list(self.ring) if rebuild else None
+        if not pending and not rebuild:
+            return
+        self.flushes += 1
+
+        if self.file and lines:
+            self.file.write("\n".join(lines) + "\n")
+        if rebuild:
+            self.widget.delete("1.0", "end")
+            if snapshot:
+                self.widget.insert("end", "\n".join(snapshot) + "\n")
+            self._widget_lines = len(snapshot)
+        else:
+            self.widget.insert("end", "\n".join(lines) + "\n")
+            self._widget_lines += len(lines)
+            excess = self._widget_lines - self.max_lines
+            if excess > 0:
+                self.widget.delete("1.0", f"{excess + 1}.0")
+                self._widget_lines -= excess
+        if self.follow:
+            self.widget.see("end")
+
+    @property
+    def lines(self):
+        with self._lock:
+            return list(self.ring)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+def benchmark(lines=100_000, max_lines=MAX_LINES):
+    """100k log lines: one insert + see per message (old) vs batched, capped sink (new)
+
+    Uses a real Tk text widget when a display is available, otherwise the
+    stub widget, which still counts widget calls and retained lines.
+    """
+    from stub_backend import StubEventLoop, StubTextWidget
+
+    def make_widget():
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+            root.withdraw()
+            return tk.Text(root), root.update
+        except Exception:
+            return StubTextWidget(), lambda: None
+
+    results = {}
+    widget, update = make_widget()
+    start = time.perf_counter()
+    for i in range(lines):
+        widget.insert("end", f"[12:00:00] Moved mouse to X={i}, Y={i}\n")
+        widget.see("end")
+        if i % 100 == 0:
+            update()
+    results["unbounded"] = {"seconds": time.perf_counter() - start,
+                            "widget_calls": getattr(widget, "calls", lines * 2),
+                            "retained_lines": int(widget.index("end-1c").split(".")[0]) - 1}
+
+    widget, update = make_widget()
+    loop = StubEventLoop()
+    sink = LogSink(widget, loop.after, max_lines=max_lines)
+    start = time.perf_counter()
+    # 100 messages per frame, as from a burst of mouse commands or script output
+    for i in range(lines):
+        sink.write(f"[12:00:00] Moved mouse to X={i}, Y={i}")
+        if i % 100 == 99:
+            sink.flush()
+            update()
+    sink.flush()
+    results["sink"] = {"seconds": time.perf_counter() - start,
+                       "widget_calls": getattr(widget, "calls", sink.flushes * 3),
+                       "retained_lines": int(widget.index("end-1c").split(".")[0]) - 1}
+    return results
+
+
+if __name__ == "__main__":
+    for name, r in benchmark().items():
+        print(f"{name:<10} {r['seconds'] * 1000:8.1f} ms  {r['widget_calls']:>7} widget calls  "
+              f"{r['retained_lines']:>7} lines retained")
@@ -0,0 +1,265 @@
+"""
+Macro Format - compact binary macro files (.ahkm)
+Description: Versioned header followed by self-contained blocks of fixed-width,
+delta-encoded event records, each optionally zlib/lzma compressed, so macros can
+be written while recording and read back block by block
+
+Layout (little endian):
+    header  "AHKM", version u8, compression u8, reserved u16
+    block   kind u8, count u32, raw_len u32, stored_len u32,
+            base_t i64 (us), base_x i32, base_y i32, payload
+    EVENTS payload: `count` records of dt u32 (us), code u8, dx i16, dy i16, data i32;
+                    a gap or jump too big for a record starts a new block
+    KEYS payload:   UTF-8 key names (continuing the key table), NUL separated
+"""
+
+import json
+import lzma
+import struct
+import zlib
+
+import numpy as np
+
+from macro_recorder import EventBuffer
+
+MAGIC = b"AHKM"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+BLOCK_HEADER = struct.Struct("<BIIIqii")
+
+BLOCK_EVENTS = 1
+BLOCK_KEYS = 2
+
+COMPRESS_NONE = 0
+COMPRESS_ZLIB = 1
+COMPRESS_LZMA = 2
+COMPRESSION_NAMES = {"none": COMPRESS_NONE, "zlib": COMPRESS_ZLIB, "lzma": COMPRESS_LZMA}
+
+RECORD = np.dtype([("dt", "<u4"), ("code", "u1"), ("dx", "<i2"), ("dy", "<i2"), ("data", "<i4")])
+DEFAULT_BLOCK_EVENTS = 65536
+# array typecodes used by EventBuffer columns -> matching NumPy dtypes
+COLUMN_DTYPES = {"q": np.int64, "B": np.uint8, "i": np.int32}
+
+
+def _compress(payload, compression):
+    if compression == COMPRESS_ZLIB:
+        return zlib.compress(payload, 6)
+    if compression == COMPRESS_LZMA:
+        return lzma.compress(payload, preset=1)
+    return payload
+
+
+def _decompress(payload, compression):
+    if compression == COMPRESS_ZLIB:
+        return zlib.decompress(payload)
+    if compression == COMPRESS_LZMA:
+        return lzma.decompress(payload)
+    return payload
+
+
+def is_binary_macro(path):
+    """True if `path` starts with the binary macro magic"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class MacroWriter:
+    """Appends an EventBuffer to a binary macro file in blocks
+
+    Call `sync(buffer)` as often as you like while recording; each call writes
+    only the events (and key names) added since the previous one.
+    """
+
+    def __init__(self, path, compression="zlib", block_events=DEFAULT_BLOCK_EVENTS):
+        if compression not in COMPRESSION_NAMES:
+            raise ValueError(f"Unknown compression '{compression}'")
+        self.path = path
+        self.compression = COMPRESSION_NAMES[compression]
+        self.block_events = block_events
+        self.written = 0
+        self._keys_written = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.compression, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sync(self, buffer):
+        """Write everything appended to `buffer` since the last sync"""
+        if len(buffer.key_names) > self._keys_written:
+            names = buffer.key_names[self._keys_written:]
+            self._write_block(BLOCK_KEYS, len(names), "\0".join(names).encode("utf-8"))
+            self._keys_written += len(names)
+
+        end = len(buffer)
+        while self.written < end:
+            stop = min(end, self.written + self.block_events)
+            self._write_events(buffer, self.written, stop)
+            self.written = stop
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def _write_events(self, buffer, start, stop):
+        cols = buffer.columns(start, stop)
+        # An event stamped before the one ahead of it is written at that event's
+        # time (a zero delta) rather than rejecting the whole recording
+        t_us = np.maximum.accumulate(np.frombuffer(cols["t"], dtype=np.int64) // 1000)
+        x = np.frombuffer(cols["x"], dtype=np.int32)
+        y = np.frombuffer(cols["y"], dtype=np.int32)
+        dt = np.diff(t_us, prepend=t_us[0])
+        dx = np.diff(x, prepend=x[0])
+        dy = np.diff(y, prepend=y[0])
+        code = np.frombuffer(cols["code"], dtype=np.uint8)
+        data = np.frombuffer(cols["data"], dtype=np.int32)
+
+        # A gap of 71+ minutes (an idle recording) or a jump past i16 can't be a
+        # delta; the event starts a new block whose header holds it absolutely
+        too_big = (dt > 0xFFFFFFFF) | (dx < -32768) | (dx > 32767) | (dy < -32768) | (dy > 32767)
+        bounds = [0, *np.flatnonzero(too_big).tolist(), len(t_us)]
+        for a, b in zip(bounds, bounds[1:]):
+            if a == b:
+                continue
+            records = np.empty(b - a, dtype=RECORD)
+            records["dt"] = dt[a:b]
+            records["code"] = code[a:b]
+            records["dx"] = dx[a:b]
+            records["dy"] = dy[a:b]
+            records["data"] = data[a:b]
+            # Each block's first event sits exactly at the block's base
+            records[0]["dt"] = records[0]["dx"] = records[0]["dy"] = 0
+            self._write_block(BLOCK_EVENTS, len(records), records.tobytes(),
+                              int(t_us[a]), int(x[a]), int(y[a]))
+
+    def _write_block(self, kind, count, payload, base_t=0, base_x=0, base_y=0):
+        stored = _compress(payload, self.compression)
+        self._file.write(BLOCK_HEADER.pack(kind, count, len(payload), len(stored),
+                                           base_t, base_x, base_y))
+        self._file.write(stored)
+
+
+def iter_blocks(path):
+    """Yield (kind, count, payload, base_t, base_x, base_y) for each block, one at a time"""
+    with open(path, "rb") as f:
+        magic, version, compression, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary macro file")
+        if version > VERSION:
+            raise ValueError(f"Macro file version {version} is newer than supported ({VERSION})")
+        while True:
+            head = f.read(BLOCK_HEADER.size)
+            if not head:
+                break
+            if len(head) < BLOCK_HEADER.size:
+                # A recording that was cut off mid-write; keep what is complete
+                break
+            kind, count, raw_len, stored_len, base_t, base_x, base_y = BLOCK_HEADER.unpack(head)
+            stored = f.read(stored_len)
+            if len(stored) < stored_len:
+                break
+            payload = _decompress(stored, compression)
+            if len(payload) != raw_len:
+                raise ValueError("Corrupt macro block")
+            yield kind, count, payload, base_t, base_x, base_y
+
+
+def iter_event_chunks(path):
+    """Yield (key_names, records) per block, decoding to absolute t (ns), x and y"""
+    key_names = []
+    for kind, count, payload, base_t, base_x, base_y in iter_blocks(path):
+        if kind == BLOCK_KEYS:
+            key_names.extend(payload.decode("utf-8").split("\0"))
+            continue
+        if kind != BLOCK_EVENTS:
+            continue
+        records = np.frombuffer(payload, dtype=RECORD, count=count)
+        chunk = {
+            "t": (base_t + np.cumsum(records["dt"], dtype=np.int64)) * 1000,
+            "code": records["code"],
+            "x": base_x + np.cumsum(records["dx"], dtype=np.int32),
+            "y": base_y + np.cumsum(records["dy"], dtype=np.int32),
+            "data": records["data"],
+        }
+        yield key_names, chunk
+
+
+def load_binary(path):
+    """Read a binary macro file into an EventBuffer"""
+    chunks = {name: [] for name, _ in EventBuffer.COLUMNS}
+    key_names = []
+    for key_names, chunk in iter_event_chunks(path):
+        for name, typecode in EventBuffer.COLUMNS:
+            chunks[name].append(chunk[name].astype(COLUMN_DTYPES[typecode], copy=False))
+    columns = {name: np.concatenate(parts).tobytes() if parts else b""
+               for name, parts in chunks.items()}
+    return EventBuffer.from_columns(columns, key_names)
+
+
+def save_binary(buffer, path, compression="zlib"):
+    """Write a whole EventBuffer to a binary macro file"""
+    with MacroWriter(path, compression) as writer:
+        writer.sync(buffer)
+
+
+def load_macro_file(path):
+    """Load a macro from either the binary or the legacy JSON format"""
+    if is_binary_macro(path):
+        return load_binary(path)
+    with open(path, "r") as f:
+        return EventBuffer.from_dicts(json.load(f))
+
+
+def save_json(buffer, path):
+    """Export a macro in the legacy JSON format"""
+    with open(path, "w") as f:
+        json.dump(buffer.to_dicts(), f, indent=2)
+
+
+def benchmark(events=1_000_000, directory=None):
+    """File size and load time of a 1M-event macro: JSON vs binary"""
+    import os
+    import tempfile
+    import time
+    from macro_recorder import EV_MOVE
+
+    rng = np.random.default_rng(0)
+    buffer = EventBuffer.from_columns({
+        "t": rng.integers(800_000, 1_200_000, events).cumsum().astype(np.int64).tobytes(),
+        "code": np.full(events, EV_MOVE, dtype=np.uint8).tobytes(),
+        "x": np.clip(960 + rng.integers(-3, 4, events).cumsum(), 0, 3839).astype(np.int32).tobytes(),
+        "y": np.clip(540 + rng.integers(-3, 4, events).cumsum(), 0, 2159).astype(np.int32).tobytes(),
+        "data": bytes(4 * events),
+    })
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        path = os.path.join(tmp, "macro.json")
+        start = time.perf_counter()
+        save_json(buffer, path)
+        save_time = time.perf_counter() - start
+        start = time.perf_counter()
+        load_macro_file(path)
+        results.append(("json (indent=2)", os.path.getsize(path), save_time,
+                        time.perf_counter() - start))
+
+        for compression in ("none", "zlib", "lzma"):
+            path = os.path.join(tmp, f"macro_{compression}.ahkm")
+            start = time.perf_counter()
+            save_binary(buffer, path, compression)
+            save_time = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded = load_macro_file(path)
+            load_time = time.perf_counter() - start
+            assert len(loaded) == events and loaded.x == buffer.x
+            results.append((f"binary {compression}", os.path.getsize(path), save_time, load_time))
+    return results
+
+
+if __name__ == "__main__":
+    for name, size, save_time, load_time in benchmark():
+        print(f"{name:<16} {size / 1e6:8.2f} MB  save {save_time:6.3f}s  load {load_time:6.3f}s")
@@ -0,0 +1,262 @@
+"""
+Macro Playback - replays recorded macros on a dedicated thread
+Description: Schedules every event against one monotonic start time
+(time.perf_counter_ns) with a hybrid sleep/spin wait, so timing errors never
+accumulate, and records how late each event was dispatched
+"""
+
+import threading
+import time
+from array import array
+from functools import lru_cache
+
+from key_combo import canonical_key
+from macro_recorder import (EV_DOWN, EV_HSCROLL, EV_KEY_DOWN, EV_KEY_UP, EV_MOVE,
+                            EV_SCROLL, EV_UP, BUTTONS)
+
+MIN_SPEED = 0.5
+MAX_SPEED = 10.0
+# Below this much remaining wait we spin instead of sleeping (sleep overshoots by ~0.1-1 ms)
+SPIN_THRESHOLD_NS = 2_000_000
+
+# pynput key names that don't map onto AHK names by simple title-casing
+AHK_KEY_NAMES = {
+    "alt_l": "LAlt", "alt_r": "RAlt", "alt_gr": "RAlt",
+    "ctrl_l": "LCtrl", "ctrl_r": "RCtrl",
+    "shift_l": "LShift", "shift_r": "RShift",
+    "cmd": "LWin", "cmd_l": "LWin", "cmd_r": "RWin",
+    "esc": "Escape", "page_up": "PgUp", "page_down": "PgDn",
+    "print_screen": "PrintScreen", "menu": "AppsKey",
+    "media_play_pause": "Media_Play_Pause", "media_next": "Media_Next",
+    "media_previous": "Media_Prev", "media_volume_up": "Volume_Up",
+    "media_volume_down": "Volume_Down", "media_volume_mute": "Volume_Mute",
+}
+
+
+@lru_cache(maxsize=None)
+def ahk_key_name(name):
+    """Translate a recorded (pynput) key name to an AHK key name"""
+    if len(name) == 1:
+        return name
+    if name in AHK_KEY_NAMES:
+        return AHK_KEY_NAMES[name]
+    if name.startswith("vk"):
+        return f"vk{int(name[2:]):02X}"
+    joined = "".join(part.capitalize() for part in name.split("_"))
+    try:
+        return canonical_key(joined)
+    except ValueError:
+        return joined
+
+
+class AHKInputBackend:
+    """Injects played-back events through the AHK daemon"""
+
+    def __init__(self, ahk):
+        self.ahk = ahk
+
+    def move(self, x, y):
+        self.ahk.mouse_move(x, y, speed=0)
+
+    def button(self, x, y, button, down):
+        self.ahk.click(x, y, button=button, direction="D" if down else "U")
+
+    def scroll(self, x, y, amount, horizontal=False):
+        if horizontal:
+            wheel = "WR" if amount > 0 else "WL"
+        else:
+            wheel = "WU" if amount > 0 else "WD"
+        self.ahk.click(x, y, button=wheel, click_count=abs(amount))
+
+    def key(self, name, down):
+        if down:
+            self.ahk.key_down(ahk_key_name(name))
+        else:
+            self.ahk.key_up(ahk_key_name(name))
+
+
+def wait_until(target_ns, spin_threshold_ns=SPIN_THRESHOLD_NS, cancelled=None):
+    """Sleep most of the way to `target_ns`, then spin for the last stretch"""
+    while True:
+        remaining = target_ns - time.perf_counter_ns()
+        if remaining <= 0:
+            return
+        if cancelled is not None and cancelled.is_set():
+            return
+        if remaining > spin_threshold_ns:
+            # Wake up early (in slices, to stay cancellable) and spin the remainder
+            time.sleep(min(remaining - spin_threshold_ns, 50_000_000) / 1e9)
+
+
+class PlaybackReport:
+    """Per-event dispatch error (actual minus scheduled, in ns) for one playback"""
+
+    def __init__(self):
+        self.errors_ns = array("q")
+        self.events = 0
+        self.skipped_moves = 0
+        self.elapsed_ns = 0
+        self.cancelled = False
+        self.error = None
+
+    def stats(self):
+        """Timing error summary in milliseconds"""
+        errors = sorted(abs(e) for e in self.errors_ns)
+        if not errors:
+            return {"events": self.events, "mean_ms": 0.0, "p50_ms": 0.0,
+                    "p99_ms": 0.0, "max_ms": 0.0, "within_1ms": 1.0}
+        n = len(errors)
+        return {
+            "events": self.events,
+            "mean_ms": sum(errors) / n / 1e6,
+            "p50_ms": errors[n // 2] / 1e6,
+            "p99_ms": errors[min(n - 1, int(n * 0.99))] / 1e6,
+            "max_ms": errors[-1] / 1e6,
+            "within_1ms": sum(1 for e in errors if e <= 1_000_000) / n,
+        }
+
+
+class MacroPlayer:
+    """Replays an EventBuffer through an input backend on its own thread"""
+
+    def __init__(self, backend, speed=1.0, fast=False, on_done=None,
+                 spin_threshold_ns=SPIN_THRESHOLD_NS):
+        if not fast and not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"Playback speed must be between {MIN_SPEED}x and {MAX_SPEED}x")
+        self.backend = backend
+        self.speed = speed
+        self.fast = fast
+        self.on_done = on_done
+        self.spin_threshold_ns = spin_threshold_ns
+        self.report = None
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    @property
+    def playing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, buffer):
+        """Start playing `buffer` in the background"""
+        if self.playing:
+            raise RuntimeError("Playback already running")
+        self._cancelled.clear()
+        self.report = PlaybackReport()
+        self._thread = threading.Thread(target=self._run, args=(buffer, self.report),
+                                        name="MacroPlayer", daemon=True)
+        self._thread.start()
+
+    def play(self, buffer):
+        """Play `buffer` on the calling thread and return the report"""
+        self._cancelled.clear()
+        self.report = PlaybackReport()
+        self._run(buffer, self.report)
+        return self.report
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self, buffer, report):
+        try:
+            if self.fast:
+                self._play_fast(buffer, report)
+            else:
+                self._play_timed(buffer, report)
+        except Exception as e:
+            report.error = e
+        report.cancelled = self._cancelled.is_set()
+        if self.on_done:
+            self.on_done(report)
+
+    def _play_timed(self, buffer, report):
+        count = len(buffer)
+        if not count:
+            return
+        t, code, xs, ys, data = buffer.t, buffer.code, buffer.x, buffer.y, buffer.data
+        t0 = t[0]
+        scale = 1.0 / self.speed
+        cancelled = self._cancelled
+        errors = report.errors_ns
+        start = time.perf_counter_ns()
+        for i in range(count):
+            # Each target is relative to the same start, so lateness never carries over
+            target = start + int((t[i] - t0) * scale)
+            wait_until(target, self.spin_threshold_ns, cancelled)
+            if cancelled.is_set():
+                break
+            errors.append(time.perf_counter_ns() - target)
+            self._dispatch(buffer, code[i], xs[i], ys[i], data[i])
+            report.events += 1
+        report.elapsed_ns = time.perf_counter_ns() - start
+
+    def _play_fast(self, buffer, report):
+        count = len(buffer)
+        code, xs, ys, data = buffer.code, buffer.x, buffer.y, buffer.data
+        start = time.perf_counter_ns()
+        for i in range(count):
+            if self._cancelled.is_set():
+                break
+            # Only the last move of a run of moves matters when not keeping time
+            if code[i] == EV_MOVE and i + 1 < count and code[i + 1] == EV_MOVE:
+                report.skipped_moves += 1
+                continue
+            self._dispatch(buffer, code[i], xs[i], ys[i], data[i])
+            report.events += 1
+        report.elapsed_ns = time.perf_counter_ns() - start
+
+    def _dispatch(self, buffer, code, x, y, data):
+        backend = self.backend
+        if code == EV_MOVE:
+            backend.move(x, y)
+        elif code == EV_DOWN or code == EV_UP:
+            backend.button(x, y, BUTTONS[data], code == EV_DOWN)
+        elif code == EV_SCROLL or code == EV_HSCROLL:
+            backend.scroll(x, y, data, code == EV_HSCROLL)
+        elif code == EV_KEY_DOWN or code == EV_KEY_UP:
+            backend.key(buffer.key_names[data], code == EV_KEY_DOWN)
+
+
+def _burn_cpu():
+    while True:
+        sum(range(1000))
+
+
+def benchmark(events=2000, interval_ms=2.0, load_processes=None):
+    """Play a synthetic macro into a stub backend while other processes burn CPU"""
+    import os
+    from macro_recorder import EventBuffer
+    from stub_backend import StubInputBackend
+
+    buffer = EventBuffer()
+    step = int(interval_ms * 1e6)
+    for i in range(events):
+        buffer.append(i * step, EV_MOVE, i % 1920, i % 1080)
+
+    import multiprocessing
+    if load_processes is None:
+        # Load every core but one, leaving the scheduler somewhere to run playback
+        load_processes = max(0, (os.cpu_count() or 1) - 1)
+    loaders = [multiprocessing.Process(target=_burn_cpu, daemon=True) for _ in range(load_processes)]
+    for proc in loaders:
+        proc.start()
+    try:
+        results = {}
+        for speed in (1.0, 2.0):
+            report = MacroPlayer(StubInputBackend(), speed=speed).play(buffer)
+            results[f"{speed}x"] = report.stats()
+        fast = MacroPlayer(StubInputBackend(), fast=True).play(buffer)
+        results["fast"] = {"events": fast.events, "skipped_moves": fast.skipped_moves,
+                           "elapsed_ms": fast.elapsed_ns / 1e6}
+    finally:
+        for proc in loaders:
+            proc.terminate()
+    return results
+
+
+if __name__ == "__main__":
+    for mode, stats in benchmark().items():
+        print(mode, {k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items()})
@@ -0,0 +1,363 @@
+"""
+Macro Recorder - pynput based input recorder for the Python AHK GUI
+Description: Records mouse and keyboard events into a compact columnar buffer
+(typed arrays instead of one dict per event), with optional move decimation
+"""
+
+import math
+import threading
+import time
+from array import array
+
+EV_MOVE = 0
+EV_DOWN = 1
+EV_UP = 2
+EV_SCROLL = 3
+EV_HSCROLL = 4
+EV_KEY_DOWN = 5
+EV_KEY_UP = 6
+
+EVENT_NAMES = {
+    EV_MOVE: "move",
+    EV_DOWN: "mouse_down",
+    EV_UP: "mouse_up",
+    EV_SCROLL: "scroll",
+    EV_HSCROLL: "hscroll",
+    EV_KEY_DOWN: "key_down",
+    EV_KEY_UP: "key_up",
+}
+EVENT_CODES = {name: code for code, name in EVENT_NAMES.items()}
+BUTTONS = ["left", "right", "middle", "x1", "x2"]
+
+INITIAL_CAPACITY = 4096
+
+
+class EventBuffer:
+    """Growable columnar store of recorded events
+
+    Columns: t (ns since start), code, x, y and data. `data` holds the button
+    index for clicks, the scroll amount for scrolls, and an index into
+    `key_names` for key events.
+    """
+
+    COLUMNS = (("t", "q"), ("code", "B"), ("x", "i"), ("y", "i"), ("data", "i"))
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self._lock = threading.Lock()
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self._len = 0
+        self._capacity = 0
+        for name, typecode in self.COLUMNS:
+            setattr(self, name, array(typecode))
+        self.key_names = []
+        self._key_index = {}
+        self._grow(max(1, capacity))
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self.event(i)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("event index out of range")
+        return self.event(i)
+
+    def _grow(self, capacity):
+        # Preallocate zeroed slots so appends are plain index assignments
+        for name, typecode in self.COLUMNS:
+            column = getattr(self, name)
+            column.frombytes(bytes((capacity - self._capacity) * column.itemsize))
+        self._capacity = capacity
+
+    def append(self, t_ns, code, x=0, y=0, data=0):
+        """Store one event and return its timestamp
+
+        `t_ns` is either nanoseconds or a zero-argument clock; a clock is read
+        while the lock is held, so events from different listener threads are
+        stamped in the order they are stored. Events are kept in time order:
+        a timestamp earlier than the previous event's is raised to it.
+        """
+        with self._lock:
+            i = self._len
+            if callable(t_ns):
+                t_ns = t_ns()
+            if i and t_ns < self.t[i - 1]:
+                t_ns = self.t[i - 1]
+            if i == self._capacity:
+                self._grow(self._capacity * 2)
+            self.t[i] = t_ns
+            self.code[i] = code
+            self.x[i] = x
+            self.y[i] = y
+            self.data[i] = data
+            self._len = i + 1
+            return t_ns
+
+    def key_id(self, name):
+        """Intern a key name and return its index"""
+        index = self._key_index.get(name)
+        if index is None:
+            index = self._key_index[name] = len(self.key_names)
+            self.key_names.append(name)
+        return index
+
+    def clear(self):
+        """Drop all events and release the memory"""
+        with self._lock:
+            self._reset(INITIAL_CAPACITY)
+
+    @property
+    def duration(self):
+        """Seconds between the first and last event"""
+        if not self._len:
+            return 0.0
+        return (self.t[self._len - 1] - self.t[0]) / 1e9
+
+    @property
+    def nbytes(self):
+        """Bytes used by stored events"""
+        return self._len * sum(getattr(self, name).itemsize for name, _ in self.COLUMNS)
+
+    @property
+    def allocated_bytes(self):
+        """Bytes allocated for the columns, including spare capacity"""
+        return self._capacity * sum(getattr(self, name).itemsize for name, _ in self.COLUMNS)
+
+    def bytes_per_minute(self):
+        """Memory used per recorded minute"""
+        if self.duration <= 0:
+            return float(self.nbytes)
+        return self.nbytes / (self.duration / 60.0)
+
+    def event(self, i):
+        """Decode event `i` into a dict (for display and JSON export)"""
+        code = self.code[i]
+        event = {"type": EVENT_NAMES[code], "t": round(self.t[i] / 1e9, 6)}
+        if code in (EV_KEY_DOWN, EV_KEY_UP):
+            event["key"] = self.key_names[self.data[i]]
+            return event
+        event["x"] = self.x[i]
+        event["y"] = self.y[i]
+        if code in (EV_DOWN, EV_UP):
+            event["button"] = BUTTONS[self.data[i]]
+        elif code in (EV_SCROLL, EV_HSCROLL):
+            event["amount"] = self.data[i]
+        return event
+
+    def columns(self, start=0, stop=None):
+        """Copies of each column for events [start, stop), safe while recording"""
+        with self._lock:
+            stop = self._len if stop is None else min(stop, self._len)
+            return {name: getattr(self, name)[start:stop] for name, _ in self.COLUMNS}
+
+    @classmethod
+    def from_columns(cls, columns, key_names=()):
+        """Build a buffer from per-column bytes (or arrays) of equal length"""
+        buf = cls(1)
+        count = None
+        for name, typecode in cls.COLUMNS:
+            column = array(typecode)
+            column.frombytes(columns[name])
+            setattr(buf, name, column)
+            if count is not None and len(column) != count:
+                raise ValueError("Column lengths differ")
+            count = len(column)
+        buf._len = buf._capacity = count
+        if not count:
+            buf._reset(1)
+        for name in key_names:
+            buf.key_id(name)
+        return buf
+
+    def to_dicts(self):
+        """All events as a list of dicts"""
+        return list(self)
+
+    @classmethod
+    def from_dicts(cls, events):
+        """Build a buffer from dicts produced by `to_dicts`"""
+        buf = cls(max(len(events), 1))
+        for event in events:
+            code = EVENT_CODES[event["type"]]
+            if code in (EV_KEY_DOWN, EV_KEY_UP):
+                data = buf.key_id(event["key"])
+            elif code in (EV_DOWN, EV_UP):
+                data = BUTTONS.index(event.get("button", "left"))
+            else:
+                data = event.get("amount", 0)
+            buf.append(int(round(event["t"] * 1e9)), code,
+                       event.get("x", 0), event.get("y", 0), data)
+        return buf
+
+
+class MacroRecorder:
+    """Feeds pynput mouse/keyboard listener events into an EventBuffer"""
+
+    def __init__(self, buffer=None, record_mouse=True, record_clicks=True,
+                 record_keyboard=True, min_move_distance=0, min_move_interval_ms=0):
+        self.buffer = buffer if buffer is not None else EventBuffer()
+        self.record_mouse = record_mouse
+        self.record_clicks = record_clicks
+        self.record_keyboard = record_keyboard
+        self.min_move_distance = min_move_distance
+        self.min_move_interval_ns = int(min_move_interval_ms * 1e6)
+        self.dropped_moves = 0
+        self._listeners = []
+        self._start_ns = 0
+        # The mouse and keyboard listeners are separate threads that both touch
+        # the held-back move (on_move and every _flush_move)
+        self._move_lock = threading.Lock()
+        self._last_move = None
+        self._pending_move = None
+
+    @property
+    def recording(self):
+        return bool(self._listeners)
+
+    def start(self):
+        """Start the pynput listeners"""
+        from pynput import keyboard, mouse
+
+        if self.recording:
+            return
+        self._start_ns = time.perf_counter_ns() - (self.buffer.t[len(self.buffer) - 1]
+                                                   if len(self.buffer) else 0)
+        with self._move_lock:
+            self._last_move = None
+            self._pending_move = None
+        if self.record_mouse or self.record_clicks:
+            self._listeners.append(mouse.Listener(
+                on_move=self.on_move if self.record_mouse else None,
+                on_click=self.on_click if self.record_clicks else None,
+                on_scroll=self.on_scroll if self.record_clicks else None))
+        if self.record_keyboard:
+            self._listeners.append(keyboard.Listener(on_press=self.on_press,
+                                                     on_release=self.on_release))
+        for listener in self._listeners:
+            listener.start()
+
+    def stop(self):
+        """Stop the listeners and flush any held-back move"""
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+        self._flush_move()
+
+    def _now(self):
+        return time.perf_counter_ns() - self._start_ns
+
+    def _flush_move(self):
+        with self._move_lock:
+            pending = self._pending_move
+            if pending:
+                self._pending_move = None
+                self._last_move = pending
+                self.buffer.append(pending[0], EV_MOVE, pending[1], pending[2])
+
+    # ===== Listener callbacks =====
+
+    def on_move(self, x, y):
+        with self._move_lock:
+            t = self._now()
+            last = self._last_move
+            if last is not None:
+                too_close = (self.min_move_distance and
+                             math.hypot(x - last[1], y - last[2]) < self.min_move_distance)
+                too_soon = t - last[0] < self.min_move_interval_ns
+                if too_close or too_soon:
+                    # Keep the latest position so the end of a motion is never lost
+                    self._pending_move = (t, int(x), int(y))
+                    self.dropped_moves += 1
+                    return
+            self._pending_move = None
+            t = self.buffer.append(self._now, EV_MOVE, int(x), int(y))
+            self._last_move = (t, int(x), int(y))
+
+    def on_click(self, x, y, button, pressed):
+        self._flush_move()
+        name = getattr(button, "name", str(button))
+        data = BUTTONS.index(name) if name in BUTTONS else 0
+        self.buffer.append(self._now, EV_DOWN if pressed else EV_UP, int(x), int(y), data)
+
+    def on_scroll(self, x, y, dx, dy):
+        self._flush_move()
+        t = self._now
+        if dy:
+            t = self.buffer.append(t, EV_SCROLL, int(x), int(y), int(dy))
+        if dx:
+            self.buffer.append(t, EV_HSCROLL, int(x), int(y), int(dx))
+
+    def on_press(self, key):
+        self._flush_move()
+        self.buffer.append(self._now, EV_KEY_DOWN, data=self.buffer.key_id(key_name(key)))
+
+    def on_release(self, key):
+        self._flush_move()
+        self.buffer.append(self._now, EV_KEY_UP, data=self.buffer.key_id(key_name(key)))
+
+
+def key_name(key):
+    """Stable name for a pynput Key/KeyCode"""
+    char = getattr(key, "char", None)
+    if char:
+        return char
+    name = getattr(key, "name", None)
+    if name:
+        return name
+    vk = getattr(key, "vk", None)
+    return f"vk{vk}" if vk is not None else str(key)
+
+
+def benchmark(seconds=60, rate_hz=1000):
+    """Memory of a simulated 1 kHz mouse recording: columnar buffer vs list of dicts"""
+    import tracemalloc
+
+    count = seconds * rate_hz
+    step = int(1e9 / rate_hz)
+
+    tracemalloc.start()
+    buffer = EventBuffer()
+    for i in range(count):
+        buffer.append(i * step, EV_MOVE, i % 1920, (i // 1920) % 1080)
+    buffer_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    dicts = [{"type": "move", "t": i / rate_hz, "x": i % 1920, "y": (i // 1920) % 1080}
+             for i in range(count)]
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicts
+
+    decimated = MacroRecorder(min_move_distance=3, min_move_interval_ms=5)
+    now = [0]
+    decimated._now = lambda: now[0]
+    for i in range(count):
+        now[0] = i * step
+        decimated.on_move(i % 1920, (i // 1920) % 1080)
+    decimated.stop()
+
+    return {
+        "events": count,
+        "buffer_bytes_per_minute": buffer.bytes_per_minute(),
+        "buffer_allocated": buffer_bytes,
+        "dict_list_bytes": dict_bytes,
+        "decimated_events": len(decimated.buffer),
+        "decimated_bytes_per_minute": decimated.buffer.bytes_per_minute(),
+    }
+
+
+if __name__ == "__main__":
+    r = benchmark()
+    print(f"{r['events']} moves/minute: buffer {r['buffer_bytes_per_minute'] / 1024:.0f} KB/min "
+          f"({r['buffer_allocated'] / 1024:.0f} KB allocated) vs list of dicts "
+          f"{r['dict_list_bytes'] / 1024:.0f} KB")
+    print(f"decimated (3 px / 5 ms): {r['decimated_events']} events, "
+          f"{r['decimated_bytes_per_minute'] / 1024:.0f} KB/min")
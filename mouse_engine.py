@@ -0,0 +1,268 @@
+"""
+Mouse Engine - precomputed, human-like cursor paths streamed to an input backend
+Description: Builds a whole move (linear, Bezier, minimum-jerk timed, jittered) as
+NumPy arrays in one shot, timed by Fitts' law and scaled by a speed factor, then
+delivers the points in per-frame chunks at a target rate
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+
+PATH_STYLES = ("instant", "linear", "bezier", "human")
+RATE_HZ = 125
+CHUNK_MS = 16
+# Fitts' law: duration = a + b * log2(distance / width + 1)
+FITTS_A_S = 0.05
+FITTS_B_S = 0.12
+TARGET_WIDTH_PX = 20
+MAX_DURATION_S = 5.0
+# How far Bezier control points may bow away from the straight line, as a fraction of the distance
+CURVATURE = 0.2
+JITTER_PX = 1.2
+# Hand tremor is slow; jitter is drawn at this rate and interpolated between samples
+JITTER_HZ = 20
+
+
+def fitts_duration(distance, width=TARGET_WIDTH_PX, speed=1.0):
+    """Seconds a person would take to move `distance` px onto a `width` px target"""
+    if distance <= 0:
+        return 0.0
+    seconds = FITTS_A_S + FITTS_B_S * math.log2(distance / width + 1)
+    return min(MAX_DURATION_S, seconds / max(speed, 0.01))
+
+
+def minimum_jerk(u):
+    """Progress along the path at normalized time u (slow start, fast middle, slow end)"""
+    return u * u * u * (10 - 15 * u + 6 * u * u)
+
+
+class MousePath:
+    """Cursor positions (N x 2 int32) and their offsets from the start in seconds"""
+
+    __slots__ = ("points", "times")
+
+    def __init__(self, points, times):
+        self.points = points
+        self.times = times
+
+    def __len__(self):
+        return len(self.points)
+
+    @property
+    def duration(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+
+def plan_path(start, end, style="human", speed=1.0, rate=RATE_HZ, rng=None):
+    """MousePath from `start` to `end`
+
+    "instant" is a single point; "linear" moves at constant speed along the
+    straight line; "bezier" follows a random cubic curve with minimum-jerk
+    timing; "human" is "bezier" plus small jitter that fades out at both
+    ends. Consecutive duplicate pixels are dropped, so slow moves don't
+    resend the same position.
+    """
+    if style not in PATH_STYLES:
+        raise ValueError(f"Unknown path style '{style}'")
+    p0 = np.asarray(start, dtype=np.float64)
+    p3 = np.asarray(end, dtype=np.float64)
+    distance = float(np.hypot(*(p3 - p0)))
+    duration = fitts_duration(distance, speed=speed)
+    if style == "instant" or duration == 0.0:
+        return MousePath(np.array([end], dtype=np.int32), np.zeros(1))
+
+    n = max(2, int(duration * rate) + 1)
+    u = np.linspace(0.0, 1.0, n)
+    times = u * duration
+    # x and y are built as separate 1-D arrays: NumPy is much slower on (n, 2) rows
+    if style == "linear":
+        x = p0[0] + u * (p3[0] - p0[0])
+        y = p0[1] + u * (p3[1] - p0[1])
+    else:
+        rng = rng or np.random.default_rng()
+        s = minimum_jerk(u)
+        # Control points a third and two thirds of the way along, pushed sideways
+        direction = (p3 - p0) / distance
+        normal = np.array([-direction[1], direction[0]])
+        bow = rng.uniform(-CURVATURE, CURVATURE, 2) * distance
+        p1 = p0 + (p3 - p0) / 3 + normal * bow[0]
+        p2 = p0 + 2 * (p3 - p0) / 3 + normal * bow[1]
+        # Cubic Bernstein weights
+        r = 1 - s
+        rs = r * s
+        w0 = r * r * r
+        w1 = 3 * rs * r
+        w2 = 3 * rs * s
+        w3 = s * s * s
+        x = w0 * p0[0] + w1 * p1[0] + w2 * p2[0] + w3 * p3[0]
+        y = w0 * p0[1] + w1 * p1[1] + w2 * p2[1] + w3 * p3[1]
+        if style == "human":
+            knots = max(2, int(duration * JITTER_HZ) + 1)
+            noise = rng.normal(0.0, JITTER_PX, (2, knots))
+            knot_u = np.linspace(0.0, 1.0, knots)
+            # Fades to nothing at both ends so the move still lands exactly
+            taper = 4 * u * (1 - u)
+            x += np.interp(u, knot_u, noise[0]) * taper
+            y += np.interp(u, knot_u, noise[1]) * taper
+
+    points = np.empty((n, 2), dtype=np.int32)
+    points[:, 0] = np.rint(x)
+    points[:, 1] = np.rint(y)
+    points[-1] = np.rint(p3)
+    # Each row's two int32s viewed as one int64, so duplicate rows compare in one pass
+    packed = points.view(np.int64).ravel()
+    keep = np.empty(n, dtype=bool)
+    keep[0] = True
+    np.not_equal(packed[1:], packed[:-1], out=keep[1:])
+    index = np.flatnonzero(keep)
+    return MousePath(packed.take(index).view(np.int32).reshape(-1, 2), times.take(index))
+
+
+class DeliveryReport:
+    """How one path was delivered: points sent, wake-ups and lateness against the plan"""
+
+    def __init__(self, planned):
+        self.planned = planned
+        self.sent = 0
+        self.chunks = 0
+        self.max_late_ms = 0.0
+        self.elapsed_s = 0.0
+        self.cancelled = False
+
+    @property
+    def rate_hz(self):
+        return self.sent / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+
+class MouseEngine:
+    """Moves and drags through an input backend (move/button, as in AHKInputBackend)
+
+    Points are sent in chunks: the engine wakes at most once per `chunk_ms`,
+    sends every point that has come due since the last wake-up, and sleeps
+    again, so a 125 Hz path costs ~60 wake-ups a second rather than 125 timed
+    sleeps, and no point is ever sent before its time.
+    """
+
+    def __init__(self, backend, position=None, rate=RATE_HZ, chunk_ms=CHUNK_MS, seed=None):
+        self.backend = backend
+        self.position = position
+        self.rate = rate
+        self.chunk_ms = chunk_ms
+        self.rng = np.random.default_rng(seed)
+        self.last_report = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop the path being streamed (the cursor stays where it got to)"""
+        self._cancel.set()
+
+    def plan(self, start, end, style="human", speed=1.0):
+        return plan_path(start, end, style, speed, self.rate, self.rng)
+
+    def _start_point(self, fallback):
+        try:
+            return tuple(self.position()) if self.position else fallback
+        except Exception:
+            return fallback
+
+    def move(self, x, y, style="human", speed=1.0):
+        """Move from the current position to (x, y); returns the DeliveryReport"""
+        self._cancel.clear()
+        return self._move(x, y, style, speed)
+
+    def _move(self, x, y, style, speed):
+        start = self._start_point((x, y)) if style != "instant" else (x, y)
+        return self._play(self.plan(start, (x, y), style, speed))
+
+    def drag(self, x1, y1, x2, y2, button="left", style="human", speed=1.0):
+        """Move to (x1, y1), hold `button`, follow a path to (x2, y2) and release
+
+        A cancel() at any point stops the whole drag: if it lands during the
+        approach, the button is never pressed.
+        """
+        self._cancel.clear()
+        approach = self._move(x1, y1, style, speed)
+        if approach.cancelled or self._cancel.is_set():
+            approach.cancelled = True
+            return approach
+        self.backend.button(x1, y1, button, True)
+        try:
+            # A drag is always streamed so the target sees the cursor travel
+            report = self._play(self.plan((x1, y1), (x2, y2), "linear" if style == "instant" else style, speed))
+        finally:
+            self.backend.button(x2, y2, button, False)
+        return report
+
+    def play(self, path):
+        """Stream a MousePath to the backend, blocking until it is done or cancelled"""
+        self._cancel.clear()
+        return self._play(path)
+
+    def _play(self, path):
+        report = DeliveryReport(len(path))
+        points = path.points.tolist()
+        due_ns = (path.times * 1e9).astype(np.int64).tolist()
+        chunk_ns = int(self.chunk_ms * 1e6)
+        move = self.backend.move
+        start = time.perf_counter_ns()
+        i = 0
+        wake = 0
+        while i < len(points):
+            if self._cancel.is_set():
+                report.cancelled = True
+                break
+            now = time.perf_counter_ns() - start
+            if wake > now:
+                if self._cancel.wait((wake - now) / 1e9):
+                    report.cancelled = True
+                    break
+                now = time.perf_counter_ns() - start
+            report.max_late_ms = max(report.max_late_ms, (now - due_ns[i]) / 1e6)
+            report.chunks += 1
+            # Everything that has come due since the last wake-up goes out together
+            while i < len(points) and due_ns[i] <= now:
+                move(*points[i])
+                i += 1
+            report.sent = i
+            if i < len(points):
+                wake = max(due_ns[i], now + chunk_ns)
+        report.elapsed_s = (time.perf_counter_ns() - start) / 1e9
+        self.last_report = report
+        return report
+
+
+def benchmark(points=(1000, 5000, 10000), reps=50, distance=1500):
+    """Path generation time per style and size, and delivery rate against a stub backend"""
+    from stub_backend import StubInputBackend
+
+    rng = np.random.default_rng(0)
+    results = {"generate_us": {}}
+    for n in points:
+        # Pick the rate that gives n points over the Fitts duration of the move
+        rate = n / fitts_duration(distance)
+        for style in ("linear", "bezier", "human"):
+            times = []
+            for _ in range(reps):
+                start = time.perf_counter()
+                path = plan_path((0, 0), (distance, 0), style, rate=rate, rng=rng)
+                times.append(time.perf_counter() - start)
+            results["generate_us"][f"{style}_{n}"] = sorted(times)[reps // 2] * 1e6
+
+    for rate in (125, 500):
+        backend = StubInputBackend()
+        engine = MouseEngine(backend, position=lambda: (0, 0), rate=rate, seed=1)
+        path = engine.plan((0, 0), (distance, distance // 2), "human")
+        report = engine.play(path)
+        results[f"deliver_{rate}hz"] = {
+            "planned_points": report.planned, "sent": len(backend.events),
+            "duration_s": round(path.duration, 3), "elapsed_s": round(report.elapsed_s, 3),
+            "wakeups": report.chunks, "max_late_ms": round(report.max_late_ms, 2),
+            "rate_hz": round(report.rate_hz, 1)}
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
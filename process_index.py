@@ -0,0 +1,238 @@
+"""
+Process Index - background pid/name cache for the process tools
+Description: Snapshots the process table on an interval, keeps it indexed by PID and
+lowercased name, reports starts/exits between snapshots and serves sorted, paged
+listings without calling psutil on the GUI thread
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import psutil
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_PAGE_SIZE = 100
+ATTRS = ["pid", "name", "create_time", "cpu_times", "memory_info"]
+
+ProcessInfo = namedtuple("ProcessInfo", "pid name create_time cpu rss")
+
+SORT_KEYS = {
+    "pid": lambda p: p.pid,
+    "name": lambda p: (p.name.lower(), p.pid),
+    "cpu": lambda p: (p.cpu, p.pid),
+    "rss": lambda p: (p.rss, p.pid),
+}
+
+
+class ProcessDelta:
+    """Processes that started or exited between two snapshots"""
+
+    def __init__(self, started=(), exited=()):
+        self.started = list(started)
+        self.exited = list(exited)
+
+    def __bool__(self):
+        return bool(self.started or self.exited)
+
+    def __repr__(self):
+        return f"ProcessDelta(+{len(self.started)} -{len(self.exited)})"
+
+
+class ProcessIndex:
+    """Process table indexed by PID and name, refreshed off the GUI thread
+
+    CPU is the percentage of one core used since the previous snapshot,
+    computed from cpu_times deltas so no per-process psutil state is needed.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, process_iter=psutil.process_iter, on_change=None):
+        self.interval = interval
+        self._process_iter = process_iter
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self.by_pid = {}
+        self.by_name = {}
+        self._cpu_times = {}
+        self._sorted = {}
+        self.generation = 0
+        self.refreshed_at = 0.0
+        self.last_refresh_ms = 0.0
+        self.last_delta = ProcessDelta()
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.by_pid)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def ready(self):
+        return self.generation > 0
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ProcessIndex", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+
+    def refresh(self):
+        """Take a new snapshot and update the indexes for processes that came or went"""
+        start = time.perf_counter()
+        now = time.monotonic()
+        snapshot = {}
+        cpu_times = {}
+        for proc in self._process_iter(ATTRS):
+            info = proc.info
+            pid = info["pid"]
+            times = info.get("cpu_times")
+            total = (times.user + times.system) if times else 0.0
+            memory = info.get("memory_info")
+            key = (pid, info.get("create_time") or 0.0)
+            cpu_times[key] = (total, now)
+            cpu = 0.0
+            previous = self._cpu_times.get(key)
+            if previous and now > previous[1]:
+                cpu = max(0.0, (total - previous[0]) / (now - previous[1]) * 100)
+            snapshot[pid] = ProcessInfo(pid, info.get("name") or "", key[1], cpu,
+                                        memory.rss if memory else 0)
+
+        with self._lock:
+            delta = self._apply(snapshot)
+            self._cpu_times = cpu_times
+            self._sorted.clear()
+            self.generation += 1
+            self.refreshed_at = now
+            self.last_delta = delta
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        if self.on_change and delta:
+            self.on_change(delta)
+        return delta
+
+    def _apply(self, snapshot):
+        started, exited = [], []
+        for pid, old in self.by_pid.items():
+            new = snapshot.get(pid)
+            # Same PID with a different start time is a reused PID: an exit plus a start
+            if new is None or new.create_time != old.create_time or new.name != old.name:
+                exited.append(old)
+        for pid, new in snapshot.items():
+            old = self.by_pid.get(pid)
+            if old is None or new.create_time != old.create_time or new.name != old.name:
+                started.append(new)
+
+        for info in exited:
+            pids = self.by_name.get(info.name.lower())
+            if pids:
+                pids.discard(info.pid)
+                if not pids:
+                    del self.by_name[info.name.lower()]
+        for info in started:
+            self.by_name.setdefault(info.name.lower(), set()).add(info.pid)
+        self.by_pid = snapshot
+        return ProcessDelta(started, exited)
+
+    # Lookups below never touch psutil
+
+    def is_running(self, name):
+        return name.strip().lower() in self.by_name
+
+    def pids(self, name):
+        """Sorted PIDs of processes called `name` (case-insensitive)"""
+        with self._lock:
+            return sorted(self.by_name.get(name.strip().lower(), ()))
+
+    def get(self, pid):
+        return self.by_pid.get(pid)
+
+    def name_of(self, pid):
+        info = self.by_pid.get(pid)
+        return info.name if info else None
+
+    def sorted_processes(self, key="pid", descending=False):
+        """All processes ordered by `key` (pid, name, cpu or rss); cached per snapshot"""
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key '{key}'")
+        with self._lock:
+            cached = self._sorted.get((key, descending))
+            if cached is None:
+                cached = sorted(self.by_pid.values(), key=SORT_KEYS[key], reverse=descending)
+                self._sorted[(key, descending)] = cached
+        return cached
+
+    def page(self, page=0, page_size=DEFAULT_PAGE_SIZE, key="pid", descending=False, name_filter=""):
+        """(rows, page, page_count, total) for one page of the sorted listing"""
+        rows = self.sorted_processes(key, descending)
+        name_filter = name_filter.strip().lower()
+        if name_filter:
+            rows = [p for p in rows if name_filter in p.name.lower()]
+        total = len(rows)
+        page_count = max(1, -(-total // page_size))
+        page = max(0, min(page, page_count - 1))
+        return rows[page * page_size:(page + 1) * page_size], page, page_count, total
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.errors += 1
+                print(f"Error refreshing process index: {e}")
+            self._stop.wait(self.interval)
+
+
+def benchmark(processes=2500, lookups=1000):
+    """Linear process_iter scans vs indexed lookups on a synthetic process table"""
+    from stub_backend import SyntheticProcessTable
+
+    table = SyntheticProcessTable(processes)
+    names = [p.info["name"] for p in table.process_iter(["name"])]
+    wanted = [names[i * 7919 % len(names)] for i in range(lookups)]
+
+    start = time.perf_counter()
+    for name in wanted[:50]:
+        any(p.info["name"].lower() == name.lower() for p in table.process_iter(["name"]))
+    legacy_us = (time.perf_counter() - start) * 1e6 / 50
+
+    index = ProcessIndex(process_iter=table.process_iter)
+    start = time.perf_counter()
+    index.refresh()
+    first_ms = (time.perf_counter() - start) * 1000
+
+    table.churn(started=40, exited=25)
+    start = time.perf_counter()
+    delta = index.refresh()
+    refresh_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for name in wanted:
+        index.is_running(name)
+    indexed_us = (time.perf_counter() - start) * 1e6 / lookups
+
+    timings = {}
+    for key in SORT_KEYS:
+        start = time.perf_counter()
+        index.page(3, key=key, descending=key in ("cpu", "rss"))
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        index.page(4, key=key, descending=key in ("cpu", "rss"))
+        timings[key] = (cold * 1000, (time.perf_counter() - start) * 1000)
+
+    return {"processes": processes, "legacy_check_us": legacy_us, "indexed_check_us": indexed_us,
+            "first_refresh_ms": first_ms, "refresh_ms": refresh_ms, "delta": repr(delta),
+            "page_ms_cold_warm": timings}
+
+
+if __name__ == "__main__":
+    for key, value in benchmark().items():
+        print(f"{key:<20} {value}")
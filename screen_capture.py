@@ -0,0 +1,324 @@
+"""
+Screen Capture - shared capture service for pixel reads, image search and screenshots
+Description: Grabs only the bounding box a caller needs (a BitBlt of just that
+rectangle on Windows, in virtual-screen coordinates so every monitor is reachable)
+and keeps recent frames for a short TTL, so lookups that land inside a fresh frame
+are served as NumPy slices
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_TTL = 0.05
+MAX_FRAMES = 4
+# Cached frames older than this are dropped even if nothing asks for a new one
+MAX_FRAME_AGE_S = 1.0
+
+# GetSystemMetrics indexes of the virtual screen (the union of all monitors)
+SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN = 76, 77, 78, 79
+SRCCOPY = 0x00CC0020
+# Include layered (translucent) windows in the copy
+CAPTUREBLT = 0x40000000
+_gdi = None
+
+
+def _win32():
+    """user32 and gdi32 with pointer-sized handle types declared (set up once)"""
+    global _gdi
+    if _gdi is None:
+        import ctypes
+        from ctypes import wintypes
+        user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+        user32.GetDC.argtypes = [wintypes.HWND]
+        user32.GetDC.restype = wintypes.HDC
+        user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+        gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+        gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                 wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+        gdi32.GetDIBits.argtypes = [wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+                                    ctypes.c_void_p, ctypes.c_void_p, wintypes.UINT]
+        gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        _gdi = (ctypes, user32, gdi32)
+    return _gdi
+
+
+def virtual_screen_bbox():
+    """(left, top, right, bottom) of all monitors together; left/top are negative when a
+    monitor sits left of or above the primary one"""
+    _, user32, _ = _win32()
+    left = user32.GetSystemMetrics(SM_XVIRTUALSCREEN)
+    top = user32.GetSystemMetrics(SM_YVIRTUALSCREEN)
+    return (left, top, left + user32.GetSystemMetrics(SM_CXVIRTUALSCREEN),
+            top + user32.GetSystemMetrics(SM_CYVIRTUALSCREEN))
+
+
+def win32_grab(bbox=None):
+    """BitBlt exactly `bbox` (virtual-screen coordinates, None for all monitors) into an RGB array
+
+    PIL's ImageGrab copies the whole primary screen and crops afterwards;
+    this copies only the requested rectangle, from any monitor.
+    """
+    ctypes, user32, gdi32 = _win32()
+    left, top, right, bottom = bbox if bbox is not None else virtual_screen_bbox()
+    width, height = right - left, bottom - top
+    # BITMAPINFOHEADER: negative height asks for top-down rows, 32-bit BGRA
+    header = (ctypes.c_uint32 * 10)(40, width & 0xFFFFFFFF, -height & 0xFFFFFFFF, 1 | (32 << 16), 0)
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    screen_dc = user32.GetDC(None)
+    memory_dc = gdi32.CreateCompatibleDC(screen_dc)
+    bitmap = gdi32.CreateCompatibleBitmap(screen_dc, width, height)
+    previous = gdi32.SelectObject(memory_dc, bitmap)
+    try:
+        if not gdi32.BitBlt(memory_dc, 0, 0, width, height, screen_dc, left, top, SRCCOPY | CAPTUREBLT):
+            raise OSError(f"BitBlt failed for {bbox}")
+        if gdi32.GetDIBits(memory_dc, bitmap, 0, height, pixels.ctypes.data, header, 0) != height:
+            raise OSError(f"GetDIBits failed for {bbox}")
+    finally:
+        gdi32.SelectObject(memory_dc, previous)
+        gdi32.DeleteObject(bitmap)
+        gdi32.DeleteDC(memory_dc)
+        user32.ReleaseDC(None, screen_dc)
+    # BGRA -> RGB in one copy
+    return np.ascontiguousarray(pixels[..., 2::-1])
+
+
+def pil_grab(bbox=None):
+    """Grab `bbox` (left, top, right, bottom) or the whole screen as an RGB array
+
+    Used where there is no win32_grab; on Windows it captures the full
+    primary screen and crops, so it is no cheaper for small regions.
+    """
+    from PIL import ImageGrab
+    image = ImageGrab.grab(bbox=bbox)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    # np.asarray reads the image buffer once; no intermediate PIL copies
+    return np.asarray(image)
+
+
+def default_grab():
+    """(grab, bounds) for this platform: bounds() gives the full-screen bbox, or None if it starts at 0, 0"""
+    if os.name == "nt":
+        return win32_grab, virtual_screen_bbox
+    return pil_grab, None
+
+
+def region_to_bbox(region):
+    """(x, y, w, h) -> (left, top, right, bottom)"""
+    if region is None:
+        return None
+    x, y, w, h = region
+    return (x, y, x + w, y + h)
+
+
+class Frame:
+    """A captured RGB array and the screen rectangle it covers
+
+    `convert` results (e.g. a grayscale version) are cached per frame, so
+    every lookup served by the same frame converts it only once.
+    """
+
+    def __init__(self, bbox, pixels, grabbed_at, full=False):
+        self.bbox = bbox
+        self.pixels = pixels
+        self.grabbed_at = grabbed_at
+        self.full = full
+        self._converted = {}
+
+    def contains(self, bbox):
+        left, top, right, bottom = self.bbox
+        return (bbox[0] >= left and bbox[1] >= top and
+                bbox[2] <= right and bbox[3] <= bottom)
+
+    def image(self, convert=None):
+        """The frame's pixels, or convert(pixels) computed once and kept"""
+        if convert is None:
+            return self.pixels
+        image = self._converted.get(convert)
+        if image is None:
+            image = self._converted[convert] = convert(self.pixels)
+        return image
+
+    def crop(self, bbox, convert=None):
+        """View of the part of this frame covering `bbox` (no copy)"""
+        left, top = self.bbox[0], self.bbox[1]
+        return self.image(convert)[bbox[1] - top:bbox[3] - top, bbox[0] - left:bbox[2] - left]
+
+
+class ScreenCapture:
+    """Region grabs with a short-lived frame cache shared by all screen features"""
+
+    def __init__(self, ttl=DEFAULT_TTL, grab=None, max_frames=MAX_FRAMES, max_frame_age=MAX_FRAME_AGE_S,
+                 bounds=None):
+        if grab is None:
+            grab, default_bounds = default_grab()
+            bounds = bounds or default_bounds
+        self.ttl = ttl
+        self.max_frame_age = max(ttl, max_frame_age)
+        self._grab = grab
+        self._bounds = bounds
+        self._frames = deque(maxlen=max_frames)
+        self._lock = threading.Lock()
+        self._expiry = None
+        self.grabs = 0
+        self.hits = 0
+
+    @property
+    def origin(self):
+        """Screen (x, y) of the top-left pixel of a full-screen grab; negative when a
+        monitor sits left of or above the primary one"""
+        return tuple(self._bounds()[:2]) if self._bounds else (0, 0)
+
+    def invalidate(self):
+        """Forget all cached frames"""
+        with self._lock:
+            self._frames.clear()
+
+    def _expire(self):
+        """Drop frames past max_frame_age; re-arms itself while frames remain"""
+        with self._lock:
+            cutoff = time.monotonic() - self.max_frame_age
+            # Frames are appended in time order, so the stale ones are at the left
+            while self._frames and self._frames[0].grabbed_at < cutoff:
+                self._frames.popleft()
+            self._expiry = None
+            if self._frames:
+                self._schedule_expiry()
+
+    def _schedule_expiry(self):
+        if self._expiry is None:
+            delay = self._frames[0].grabbed_at + self.max_frame_age - time.monotonic()
+            self._expiry = threading.Timer(max(0.01, delay), self._expire)
+            self._expiry.daemon = True
+            self._expiry.start()
+
+    def grab_bbox(self, bbox=None, max_age=None, convert=None):
+        """RGB array for `bbox` (left, top, right, bottom), or the full screen for None
+
+        With `convert` (a function of an RGB array, such as a grayscale
+        conversion) the converted image is returned, cached with the frame.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.monotonic()
+        if max_age > 0:
+            with self._lock:
+                for frame in reversed(self._frames):
+                    if now - frame.grabbed_at > max_age:
+                        continue
+                    if bbox is None:
+                        if frame.full:
+                            self.hits += 1
+                            return frame.image(convert)
+                    elif frame.contains(bbox):
+                        self.hits += 1
+                        return frame.crop(bbox, convert)
+
+        pixels = self._grab(bbox)
+        self.grabs += 1
+        if bbox is None:
+            screen = self._bounds() if self._bounds else (0, 0, pixels.shape[1], pixels.shape[0])
+            frame = Frame(screen, pixels, now, full=True)
+        else:
+            frame = Frame(tuple(bbox), pixels, now)
+        with self._lock:
+            self._frames.append(frame)
+            self._schedule_expiry()
+        return frame.image(convert)
+
+    def grab(self, region=None, max_age=None, convert=None):
+        """RGB array for an (x, y, w, h) region, or the full screen for None"""
+        return self.grab_bbox(region_to_bbox(region), max_age, convert)
+
+    def get_pixel(self, x, y, max_age=None):
+        """(r, g, b) at screen position x, y"""
+        pixel = self.grab_bbox((x, y, x + 1, y + 1), max_age)[0, 0]
+        return tuple(int(c) for c in pixel[:3])
+
+    def get_pixels(self, points, max_age=None):
+        """N x 3 uint8 array of the colors at [(x, y), ...], from one grab of their bounding box"""
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        if not len(pts):
+            return np.empty((0, 3), dtype=np.uint8)
+        left, top = pts.min(axis=0)
+        right, bottom = pts.max(axis=0) + 1
+        bbox = (int(left), int(top), int(right), int(bottom))
+        pixels = self.grab_bbox(bbox, max_age)
+        return pixels[pts[:, 1] - top, pts[:, 0] - left, :3]
+
+
+def benchmark(counts=(1, 100, 10_000), width=11520, height=2160):
+    """Full-frame vs region vs cached pixel lookups on a simulated 3x4K desktop
+
+    The synthetic screen's "grab" is only a NumPy slice, so these figures
+    measure the cache and array cost, not capture; see benchmark_grabber
+    for what a real grab of each size costs.
+    """
+    from stub_backend import SyntheticScreen
+
+    screen = SyntheticScreen(width, height)
+    rng = np.random.default_rng(0)
+    results = []
+    for count in counts:
+        # Queries clustered in one 400x300 area, as with a watched widget
+        pts = np.column_stack([rng.integers(5000, 5400, count), rng.integers(900, 1200, count)])
+
+        start = time.perf_counter()
+        frame = screen.grab(None)
+        legacy = [tuple(frame[y, x]) for x, y in pts]
+        full = time.perf_counter() - start
+
+        capture = ScreenCapture(ttl=0, grab=screen.grab)
+        start = time.perf_counter()
+        region = capture.get_pixels(pts)
+        batched = time.perf_counter() - start
+
+        capture = ScreenCapture(ttl=1.0, grab=screen.grab)
+        capture.grab_bbox((5000, 900, 5400, 1200))
+        start = time.perf_counter()
+        cached = capture.get_pixels(pts)
+        cached_time = time.perf_counter() - start
+
+        assert [tuple(p) for p in region] == legacy and (cached == region).all()
+        results.append({"pixels": count, "full_frame_ms": full * 1000,
+                        "region_ms": batched * 1000, "cached_ms": cached_time * 1000})
+    return results
+
+
+def benchmark_grabber(sizes=((1, 1), (400, 300), (1920, 1080)), reps=20):
+    """Median time of a real screen grab (this platform's default grabber) per region size and full screen
+
+    Returns None when there is no screen to capture.
+    """
+    grab, bounds = default_grab()
+    try:
+        screen = bounds() if bounds else (0, 0) + grab(None).shape[1::-1]
+    except Exception:
+        return None
+    left, top = screen[:2]
+    results = {}
+    for name, bbox in [(f"{w}x{h}", (left, top, left + w, top + h)) for w, h in sizes] + [("full", None)]:
+        times = []
+        for _ in range(reps):
+            start = time.perf_counter()
+            grab(bbox)
+            times.append(time.perf_counter() - start)
+        results[name] = sorted(times)[reps // 2] * 1000
+    return {"grabber": grab.__name__, "screen": screen, "ms": results}
+
+
+if __name__ == "__main__":
+    for r in benchmark():
+        print(f"{r['pixels']:>6} px  full frame {r['full_frame_ms']:8.2f} ms  "
+              f"region {r['region_ms']:7.3f} ms  cached {r['cached_ms']:7.3f} ms")
+    real = benchmark_grabber()
+    print(real if real else "Real grabber: no screen available")
@@ -0,0 +1,270 @@
+"""
+Screen Watch - wait-for-color and wait-for-change triggers for the Advanced tab
+Description: Samples all registered regions at a fixed rate from one union capture
+per tick and compares them with NumPy (per-channel tolerance, changed-pixel
+fraction or perceptual hash), firing callbacks when a watch matches
+"""
+
+import itertools
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from screen_capture import ScreenCapture
+
+WATCH_COLOR = "color"
+WATCH_CHANGE = "change"
+WATCH_HASH = "hash"
+DEFAULT_RATE_HZ = 10.0
+# dhash compares an 8x8 grid, so two hashes differ in at most HASH_SIZE bits
+HASH_SIZE = 64
+DEFAULT_HASH_BITS = 8
+
+
+def parse_color(text):
+    """'#RRGGBB', 'RRGGBB' or 'r,g,b' -> (r, g, b)"""
+    text = text.strip()
+    if "," in text:
+        rgb = tuple(int(v) for v in text.split(","))
+    else:
+        text = text.lstrip("#")
+        if len(text) != 6:
+            raise ValueError(f"Invalid color '{text}'")
+        rgb = tuple(int(text[i:i + 2], 16) for i in (0, 2, 4))
+    if len(rgb) != 3 or not all(0 <= c <= 255 for c in rgb):
+        raise ValueError(f"Invalid color '{text}'")
+    return rgb
+
+
+def dhash(pixels):
+    """64-bit difference hash of an RGB region, as a bool array"""
+    gray = cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_RGB2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    return (small[:, 1:] > small[:, :-1]).ravel()
+
+
+class Watch:
+    """One watched screen region and the condition that triggers it"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, region, mode=WATCH_COLOR, color=None, tolerance=0, fraction=1.0,
+                 hash_bits=DEFAULT_HASH_BITS, callback=None, once=True, name=None):
+        x, y, w, h = region
+        if w <= 0 or h <= 0:
+            raise ValueError("Watch region must have a positive size")
+        if mode == WATCH_COLOR and color is None:
+            raise ValueError("A color watch needs a target color")
+        if mode not in (WATCH_COLOR, WATCH_CHANGE, WATCH_HASH):
+            raise ValueError(f"Unknown watch mode '{mode}'")
+        if not 1 <= hash_bits <= HASH_SIZE:
+            # 0 bits would match an unchanged region on the first comparison
+            raise ValueError(f"Hash bits must be 1-{HASH_SIZE}, got {hash_bits}")
+        self.id = next(self._ids)
+        self.name = name or f"watch {self.id}"
+        self.bbox = (x, y, x + w, y + h)
+        self.mode = mode
+        self.color = np.array(color, dtype=np.int16) if color is not None else None
+        self.tolerance = tolerance
+        self.fraction = fraction
+        self.hash_bits = hash_bits
+        self.callback = callback
+        self.once = once
+        self.active = True
+        self.matched = False
+        self.fired = 0
+        self.last_score = 0.0
+        self._baseline = None
+        self._baseline_hash = None
+
+    def _within_tolerance(self, pixels, reference):
+        diff = np.abs(pixels.astype(np.int16) - reference)
+        return (diff <= self.tolerance).all(axis=-1)
+
+    def evaluate(self, pixels):
+        """(matched, score) for the current RGB pixels of this region"""
+        pixels = pixels[..., :3]
+        if self.mode == WATCH_COLOR:
+            score = float(self._within_tolerance(pixels, self.color).mean())
+            return score >= self.fraction, score
+
+        if self.mode == WATCH_CHANGE:
+            if self._baseline is None:
+                self._baseline = pixels.astype(np.int16)
+                return False, 0.0
+            score = float(1.0 - self._within_tolerance(pixels, self._baseline).mean())
+            return score >= self.fraction, score
+
+        bits = dhash(pixels)
+        if self._baseline_hash is None:
+            self._baseline_hash = bits
+            return False, 0.0
+        distance = int(np.count_nonzero(bits != self._baseline_hash))
+        return distance >= self.hash_bits, float(distance)
+
+    def rebaseline(self, pixels):
+        """Make `pixels` the new reference for change/hash watches"""
+        pixels = pixels[..., :3]
+        if self.mode == WATCH_CHANGE:
+            self._baseline = pixels.astype(np.int16)
+        elif self.mode == WATCH_HASH:
+            self._baseline_hash = dhash(pixels)
+
+    def describe(self):
+        x1, y1, x2, y2 = self.bbox
+        state = "fired" if not self.active else ("matched" if self.matched else "waiting")
+        return (f"{self.name}: {self.mode} ({x1},{y1},{x2 - x1},{y2 - y1}) "
+                f"score {self.last_score:.2f}, fired {self.fired}x, {state}")
+
+
+def union_bbox(bboxes):
+    """Smallest bbox covering all of `bboxes`"""
+    lefts, tops, rights, bottoms = zip(*bboxes)
+    return (min(lefts), min(tops), max(rights), max(bottoms))
+
+
+class ScreenWatcher:
+    """Background sampler that serves every watch from one capture per tick"""
+
+    def __init__(self, capture=None, rate_hz=DEFAULT_RATE_HZ):
+        self.capture = capture if capture is not None else ScreenCapture()
+        self.rate_hz = rate_hz
+        self.watches = []
+        self.ticks = 0
+        self.last_tick_ms = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def add(self, watch):
+        """Register a watch, starting the sampler if needed"""
+        with self._lock:
+            self.watches.append(watch)
+        self.start()
+        return watch
+
+    def remove(self, watch):
+        with self._lock:
+            if watch in self.watches:
+                self.watches.remove(watch)
+
+    def clear(self):
+        with self._lock:
+            self.watches.clear()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ScreenWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+
+    def tick(self):
+        """Sample every active watch once; returns the watches that fired"""
+        with self._lock:
+            watches = [w for w in self.watches if w.active]
+        if not watches:
+            return []
+
+        union = union_bbox([w.bbox for w in watches])
+        # Always a fresh frame: a cached one would hide the change being waited for
+        frame = self.capture.grab_bbox(union, max_age=0)
+        left, top = union[0], union[1]
+        fired = []
+        for watch in watches:
+            x1, y1, x2, y2 = watch.bbox
+            pixels = frame[y1 - top:y2 - top, x1 - left:x2 - left]
+            matched, watch.last_score = watch.evaluate(pixels)
+            # Edge triggered: fire when the condition becomes true, not while it stays true
+            if matched and not watch.matched:
+                watch.fired += 1
+                fired.append(watch)
+                if watch.once:
+                    watch.active = False
+                else:
+                    watch.rebaseline(pixels)
+            watch.matched = matched
+        self.ticks += 1
+        for watch in fired:
+            if watch.callback:
+                try:
+                    watch.callback(watch)
+                except Exception as e:
+                    print(f"Error in screen watch callback: {e}")
+        return fired
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            try:
+                self.tick()
+            except Exception as e:
+                self.errors += 1
+                print(f"Error sampling screen watches: {e}")
+            self.last_tick_ms = (time.perf_counter() - start) * 1000
+            next_tick += 1.0 / self.rate_hz
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                # Fell behind; don't try to catch up with a burst of ticks
+                next_tick = time.perf_counter()
+                delay = 0
+            self._stop.wait(delay)
+
+
+def benchmark(watches=20, ticks=50):
+    """Per-tick cost of overlapping watches: one union grab vs one grab per watch
+
+    Each simulated grab costs 2 ms of fixed overhead plus the copy, roughly what a
+    GDI BitBlt round-trip costs on Windows.
+    """
+    from stub_backend import SyntheticScreen
+
+    screen = SyntheticScreen(3840, 2160, latency=0.002)
+    rng = np.random.default_rng(1)
+
+    def make_watches():
+        result = []
+        for i in range(watches):
+            x, y = int(rng.integers(1000, 1400)), int(rng.integers(600, 900))
+            mode = (WATCH_COLOR, WATCH_CHANGE, WATCH_HASH)[i % 3]
+            result.append(Watch((x, y, 200, 150), mode, color=(0, 255, 0), tolerance=10,
+                                fraction=0.5, once=False))
+        return result
+
+    watcher = ScreenWatcher(ScreenCapture(ttl=0, grab=screen.grab))
+    watcher.watches = make_watches()
+    grabs = screen.grabs
+    start = time.perf_counter()
+    for _ in range(ticks):
+        watcher.tick()
+    union_ms = (time.perf_counter() - start) * 1000 / ticks
+    union_grabs = (screen.grabs - grabs) / ticks
+
+    separate = make_watches()
+    grabs = screen.grabs
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for watch in separate:
+            watch.evaluate(screen.grab(watch.bbox))
+    separate_ms = (time.perf_counter() - start) * 1000 / ticks
+    separate_grabs = (screen.grabs - grabs) / ticks
+
+    return {"watches": watches, "union_ms_per_tick": union_ms, "union_grabs_per_tick": union_grabs,
+            "separate_ms_per_tick": separate_ms, "separate_grabs_per_tick": separate_grabs}
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,469 @@
+"""
+Script Manager - non-blocking AHK script runs with output capture and stop controls
+Description: Launches each script as its own interpreter process, streams its
+stdout/stderr line by line into a bounded per-run buffer, enforces optional
+timeouts and can stop one run or all of them. Prepared scripts are cached by
+content hash and warm interpreters are kept waiting so repeated runs skip
+process startup
+"""
+
+import hashlib
+import itertools
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+
+MAX_OUTPUT_LINES = 1000
+MAX_LINE_CHARS = 4096
+MAX_FINISHED_RUNS = 100
+STOP_GRACE_S = 2.0
+CACHE_ENTRIES = 256
+POOL_IDLE_TIMEOUT_S = 300.0
+POOL_CHECK_S = 5.0
+POOL_REFILL_DELAY_S = 0.1
+LAUNCH_SAMPLES = 200
+
+RUNNING = "running"
+EXITED = "exited"
+STOPPED = "stopped"
+TIMED_OUT = "timed out"
+FAILED = "failed"
+
+
+def ahk_script_command(ahk=None, executable_path=None):
+    """Interpreter argv: AutoHotkey reading the script from stdin
+
+    Mirrors how the ahk library runs scripts itself (`/ErrorStdOut *`).
+    Pass the same `executable_path` the AHK object was configured with. If
+    it is omitted, the path the ahk library resolved is read from its
+    transport; that attribute is private (ahk 1.x), so it is checked and a
+    clear error is raised if a future version drops it.
+    """
+    if not executable_path:
+        transport = getattr(ahk, "_transport", None)
+        executable_path = getattr(transport, "_executable_path", None)
+        if not executable_path:
+            raise RuntimeError("Can't find the AutoHotkey executable of this AHK object; "
+                               "pass executable_path explicitly")
+    return [executable_path, "/CP65001", "/ErrorStdOut", "*"]
+
+
+def _spawn(command):
+    return subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class CachedScript:
+    """A prepared script: UTF-8 bytes and their content hash"""
+
+    __slots__ = ("digest", "data")
+
+    def __init__(self, digest, data):
+        self.digest = digest
+        self.data = data
+
+
+class ScriptCache:
+    """Prepared scripts keyed by content hash (LRU)
+
+    The same hotkey script run a thousand times is normalized, encoded and
+    hashed once. Scripts are never written to disk: every run, warm or
+    cold, is piped to the interpreter's stdin, so A_ScriptDir, A_ScriptName
+    and #Include resolve the same way however the run was started.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def prepare(self, script):
+        """CachedScript for `script` text"""
+        if not script.endswith("\n"):
+            script += "\n"
+        data = script.encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = CachedScript(digest, data)
+        with self._lock:
+            self._entries[digest] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+class InterpreterPool:
+    """Interpreter processes started ahead of time, blocked reading their script from stdin
+
+    A warm process has already paid for process creation and interpreter
+    startup, so dispatch is just a pipe write. Each process runs one script;
+    a background thread refills the pool, drops processes that died while
+    waiting (health check) and evicts the whole pool after `idle_timeout`
+    seconds without a run, refilling on the next demand.
+    """
+
+    def __init__(self, command, size=2, idle_timeout=POOL_IDLE_TIMEOUT_S):
+        self.command = list(command)
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._warm = deque()
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._closed = False
+        self.last_used = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.spawned = 0
+        self.evicted = 0
+        self.unhealthy = 0
+        self._wanted.set()
+        self._thread = threading.Thread(target=self._maintain, daemon=True, name="ScriptPool")
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._warm)
+
+    def acquire(self):
+        """A live warm process, or None if the pool is empty (the caller starts one cold)"""
+        with self._lock:
+            self.last_used = time.monotonic()
+            proc = None
+            while self._warm:
+                candidate = self._warm.popleft()
+                if candidate.poll() is None:
+                    proc = candidate
+                    break
+                self.unhealthy += 1
+            if proc is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._wanted.set()
+        return proc
+
+    def _maintain(self):
+        while True:
+            self._wanted.wait(POOL_CHECK_S)
+            self._wanted.clear()
+            if self._closed:
+                return
+            if self._warm:
+                # Starting an interpreter competes for CPU with the script just
+                # dispatched; while a spare is still warm, let that script go first
+                time.sleep(max(0.0, self.last_used + POOL_REFILL_DELAY_S - time.monotonic()))
+            idle = time.monotonic() - self.last_used > self.idle_timeout
+            with self._lock:
+                alive = [proc for proc in self._warm if proc.poll() is None]
+                self.unhealthy += len(self._warm) - len(alive)
+                self._warm = deque(alive)
+                evict = list(self._warm) if idle else []
+                if idle:
+                    self._warm.clear()
+                    self.evicted += len(evict)
+                missing = 0 if idle else self.size - len(self._warm)
+            for proc in evict:
+                proc.kill()
+                proc.wait()
+            for _ in range(missing):
+                try:
+                    proc = _spawn(self.command)
+                except OSError as e:
+                    print(f"Script pool failed to start an interpreter: {e}")
+                    break
+                with self._lock:
+                    self.spawned += 1
+                    self._warm.append(proc)
+
+    def stats(self):
+        with self._lock:
+            return {"warm": len(self._warm), "size": self.size, "hits": self.hits,
+                    "misses": self.misses, "spawned": self.spawned,
+                    "evicted": self.evicted, "unhealthy": self.unhealthy}
+
+    def close(self):
+        """Stop refilling and kill the waiting processes"""
+        self._closed = True
+        self._wanted.set()
+        with self._lock:
+            warm, self._warm = list(self._warm), deque()
+        for proc in warm:
+            proc.kill()
+            proc.wait()
+
+
+class ScriptRun:
+    """One launched script: process, status, resource usage and its recent output"""
+
+    def __init__(self, run_id, name, proc, timeout, max_lines, warm=False, digest=None):
+        self.id = run_id
+        self.name = name
+        self.proc = proc
+        self.pid = proc.pid
+        self.timeout = timeout
+        self.warm = warm
+        self.digest = digest
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.ended = None
+        # start() call to the script being in the interpreter's hands, and to its first output
+        self.launch_ms = None
+        self.first_output_ms = None
+        self.status = RUNNING
+        self.exit_code = None
+        # (stream, line) pairs; the oldest are dropped once the buffer is full
+        self.output = deque(maxlen=max_lines)
+        self.lines = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._ps = None
+
+    @property
+    def running(self):
+        return self.status == RUNNING
+
+    @property
+    def elapsed(self):
+        return (self.ended or time.perf_counter()) - self.started
+
+    def _append(self, stream, line):
+        with self._lock:
+            if len(self.output) == self.output.maxlen:
+                self.dropped += 1
+            if self.first_output_ms is None:
+                self.first_output_ms = (time.perf_counter() - self.started) * 1000
+            self.output.append((stream, line))
+            self.lines += 1
+
+    def tail(self, count=None):
+        """The most recent `count` (stream, line) pairs, or all that are buffered"""
+        with self._lock:
+            lines = list(self.output)
+        return lines if count is None else lines[-count:]
+
+    def usage(self):
+        """(cpu_percent, rss_bytes) of the script process, or (0.0, 0) once it has exited"""
+        if not self.running:
+            return 0.0, 0
+        import psutil
+        try:
+            if self._ps is None:
+                self._ps = psutil.Process(self.pid)
+            # cpu_percent measures since the previous call on the same Process
+            return self._ps.cpu_percent(None), self._ps.memory_info().rss
+        except psutil.Error:
+            return 0.0, 0
+
+    def __repr__(self):
+        return f"ScriptRun(#{self.id} {self.name!r} pid={self.pid} {self.status})"
+
+
+class ScriptManager:
+    """Concurrent script runs keyed by id, newest last
+
+    `command` is the interpreter argv reading its script from stdin ("*" as
+    the script argument, as AutoHotkey does). With `pool_size` that many
+    interpreters are kept warm; cold runs start a new interpreter and are
+    piped the same script, so both run with identical script-relative
+    variables. `on_output(run, stream, line)` and `on_exit(run)` are
+    called from the run's reader/watcher threads.
+    """
+
+    def __init__(self, command, max_output_lines=MAX_OUTPUT_LINES, on_output=None, on_exit=None,
+                 pool_size=0, cache=None):
+        self.command = list(command)
+        self.max_output_lines = max_output_lines
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.cache = cache or ScriptCache()
+        self.pool = InterpreterPool(self.command, pool_size) if pool_size else None
+        self.runs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._launch_ms = {"warm": deque(maxlen=LAUNCH_SAMPLES), "cold": deque(maxlen=LAUNCH_SAMPLES)}
+        self._first_output_ms = {"warm": deque(maxlen=LAUNCH_SAMPLES), "cold": deque(maxlen=LAUNCH_SAMPLES)}
+
+    def _launch(self, prepared):
+        """(process, warm, already_dispatched) for a prepared script"""
+        proc = self.pool.acquire() if self.pool else None
+        if proc is not None:
+            try:
+                proc.stdin.write(prepared.data)
+                proc.stdin.close()
+                return proc, True, True
+            except OSError:
+                # Died between the health check and the write; fall back to a cold start
+                proc.kill()
+        return _spawn(self.command), False, False
+
+    def start(self, script, name=None, timeout=None):
+        """Launch `script` (AHK source text) without waiting; returns its ScriptRun"""
+        called = time.perf_counter()
+        prepared = self.cache.prepare(script)
+        proc, warm, dispatched = self._launch(prepared)
+        run_id = next(self._ids)
+        run = ScriptRun(run_id, name or f"Script {run_id}", proc, timeout, self.max_output_lines,
+                        warm=warm, digest=prepared.digest)
+        run.started = called
+        if dispatched:
+            run.launch_ms = (time.perf_counter() - called) * 1000
+            self._launch_ms["warm" if warm else "cold"].append(run.launch_ms)
+        with self._lock:
+            self.runs[run_id] = run
+            finished = [i for i, r in self.runs.items() if not r.running]
+            for old_id in finished[:max(0, len(finished) - MAX_FINISHED_RUNS)]:
+                del self.runs[old_id]
+
+        readers = [threading.Thread(target=self._read, args=(run, stream, pipe), daemon=True,
+                                    name=f"Script{run_id}-{stream}")
+                   for stream, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))]
+        for reader in readers:
+            reader.start()
+        stdin_data = None if dispatched else prepared.data
+        threading.Thread(target=self._watch, args=(run, stdin_data, readers), daemon=True,
+                         name=f"Script{run_id}-watch").start()
+        return run
+
+    def _read(self, run, stream, pipe):
+        # A bounded readline keeps one endless line from growing without limit
+        with pipe:
+            for raw in iter(lambda: pipe.readline(MAX_LINE_CHARS), b""):
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                run._append(stream, line)
+                if self.on_output:
+                    self.on_output(run, stream, line)
+
+    def _watch(self, run, stdin_data, readers):
+        try:
+            if stdin_data is not None:
+                run.proc.stdin.write(stdin_data)
+                run.launch_ms = (time.perf_counter() - run.started) * 1000
+                self._launch_ms["cold"].append(run.launch_ms)
+            run.proc.stdin.close()
+        except OSError:
+            # The interpreter exited before reading the whole script
+            pass
+        try:
+            run.exit_code = run.proc.wait(run.timeout)
+        except subprocess.TimeoutExpired:
+            self._terminate(run, TIMED_OUT)
+        for reader in readers:
+            reader.join()
+        run.ended = time.perf_counter()
+        if run.first_output_ms is not None:
+            self._first_output_ms["warm" if run.warm else "cold"].append(run.first_output_ms)
+        if run.status == RUNNING:
+            run.status = EXITED if run.exit_code == 0 else FAILED
+        if self.on_exit:
+            self.on_exit(run)
+
+    def _terminate(self, run, status):
+        with run._lock:
+            if run.status != RUNNING:
+                return
+            run.status = status
+        run.proc.terminate()
+        try:
+            run.exit_code = run.proc.wait(STOP_GRACE_S)
+        except subprocess.TimeoutExpired:
+            run.proc.kill()
+            run.exit_code = run.proc.wait()
+
+    def stop(self, run_id):
+        """Stop one run; returns False if it had already finished"""
+        run = self.runs.get(run_id)
+        if run is None or not run.running:
+            return False
+        self._terminate(run, STOPPED)
+        return True
+
+    def stop_all(self):
+        """Stop every running script; returns how many were stopped"""
+        return sum(self.stop(run.id) for run in self.running())
+
+    def running(self):
+        with self._lock:
+            return [run for run in self.runs.values() if run.running]
+
+    def launch_stats(self):
+        """Count and p50/p99 ms of launch (dispatch) and first-output latency, warm vs cold"""
+        stats = {}
+        for kind in ("warm", "cold"):
+            launch = list(self._launch_ms[kind])
+            first = list(self._first_output_ms[kind])
+            stats[kind] = {"count": len(launch),
+                           "launch_p50": _percentile(launch, 50), "launch_p99": _percentile(launch, 99),
+                           "first_output_p50": _percentile(first, 50)}
+        return stats
+
+    def shutdown(self):
+        """Stop all runs and the warm pool"""
+        self.stop_all()
+        if self.pool:
+            self.pool.close()
+
+    def clear_finished(self):
+        """Forget finished runs (and their output)"""
+        with self._lock:
+            for run_id in [i for i, run in self.runs.items() if not run.running]:
+                del self.runs[run_id]
+
+
+def benchmark(scripts=50, lines=20000, max_output_lines=MAX_OUTPUT_LINES, repeats=30):
+    """Many chatty scripts at once, then cold vs warm launches of a short hotkey-style script"""
+    from stub_backend import stub_script_command
+
+    done = threading.Semaphore(0)
+    manager = ScriptManager(stub_script_command(), max_output_lines=max_output_lines,
+                            on_exit=lambda run: done.release())
+    chatty = f"Loop, {lines}\n    FileAppend, line %A_Index%`n, *\n"
+
+    start = time.perf_counter()
+    runs = [manager.start(chatty) for _ in range(scripts)]
+    for _ in runs:
+        done.acquire()
+    elapsed = time.perf_counter() - start
+
+    hung = manager.start("Sleep, 60000\n", timeout=0.5)
+    done.acquire()
+
+    results = {"scripts": scripts, "elapsed_s": elapsed,
+               "lines_seen": sum(run.lines for run in runs),
+               "lines_retained": sum(len(run.output) for run in runs),
+               "exit_codes": sorted({run.exit_code for run in runs}),
+               "timeout_status": hung.status, "timeout_after_s": round(hung.elapsed, 2)}
+
+    short = "FileAppend, hotkey fired`n, *\n"
+    for mode, pool_size in (("cold", 0), ("warm", 2)):
+        manager = ScriptManager(stub_script_command(), pool_size=pool_size,
+                                on_exit=lambda run: done.release())
+        for _ in range(repeats):
+            # Hotkeys fire a human interval apart, which is when the pool refills
+            time.sleep(0.3)
+            manager.start(short)
+            done.acquire()
+        stats = manager.launch_stats()[mode]
+        results[f"{mode}_launch_p50_ms"] = round(stats["launch_p50"], 2)
+        results[f"{mode}_launch_p99_ms"] = round(stats["launch_p99"], 2)
+        results[f"{mode}_first_output_p50_ms"] = round(stats["first_output_p50"], 2)
+        manager.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    print(benchmark())
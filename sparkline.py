@@ -0,0 +1,40 @@
+"""
+Sparkline - minimal line graph widget for live series
+Description: Draws a NumPy series as one canvas polyline, bucketing long series
+down to one point per pixel column so redraw cost depends on the widget width
+"""
+
+import tkinter as tk
+
+import numpy as np
+
+
+def bucket_max(values, columns):
+    """Reduce `values` to at most `columns` points, keeping each bucket's peak"""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= columns:
+        return values
+    edges = np.linspace(0, len(values), columns + 1).astype(np.int64)
+    return np.maximum.reduceat(values, edges[:-1])
+
+
+class Sparkline(tk.Canvas):
+    """Canvas showing the recent history of one value"""
+
+    def __init__(self, master, width=260, height=48, color="#3B8ED0", background="#1D1E1E", **kwargs):
+        super().__init__(master, width=width, height=height, bg=background,
+                         highlightthickness=0, bd=0, **kwargs)
+        self._line = self.create_line(0, 0, 0, 0, fill=color, width=1.5)
+
+    def plot(self, values, maximum=None):
+        """Replace the graph with `values`, scaled to `maximum` (default: the series peak)"""
+        width = max(2, self.winfo_width())
+        height = max(2, self.winfo_height())
+        points = bucket_max(values, width)
+        if len(points) < 2:
+            self.coords(self._line, 0, 0, 0, 0)
+            return
+        top = maximum if maximum else max(float(points.max()), 1e-9)
+        xs = np.linspace(0, width - 1, len(points))
+        ys = (height - 2) - np.clip(points / top, 0, 1) * (height - 4)
+        self.coords(self._line, *np.column_stack([xs, ys]).ravel().tolist())
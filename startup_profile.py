@@ -0,0 +1,147 @@
+"""
+Startup Profile - in-app equivalent of `python -X importtime` plus startup phase marks
+Description: A meta path hook times every module import (self and cumulative, nested
+like -X importtime) and named marks record when each startup phase finished, so
+startup regressions can be read from inside the running app
+"""
+
+import sys
+import threading
+import time
+
+_START = time.perf_counter()
+
+
+class _TimedLoader:
+    """Wraps a module loader to time create_module/exec_module"""
+
+    def __init__(self, loader, profiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        # The timing opened here closes at the end of exec_module, so one record
+        # covers both; extension modules do their real loading (dlopen) here
+        self._profiler._enter(spec.name)
+        try:
+            return self._loader.create_module(spec)
+        except BaseException:
+            self._profiler._exit()
+            raise
+
+    def exec_module(self, module):
+        # Hand the real loader back so nothing downstream ever sees the wrapper
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit()
+
+
+class StartupProfiler:
+    """Records (module, self_us, cumulative_us, depth) per import and named phase marks"""
+
+    def __init__(self):
+        self.imports = []
+        self.marks = []
+        self.installed = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # ===== Import hook (a meta path finder) =====
+
+    def find_spec(self, name, path=None, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def install(self):
+        if not self.installed:
+            sys.meta_path.insert(0, self)
+            self.installed = True
+
+    def uninstall(self):
+        if self.installed:
+            sys.meta_path.remove(self)
+            self.installed = False
+
+    def _enter(self, name):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # [name, start, time spent in nested imports]
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        stack = self._local.stack
+        name, start, children = stack.pop()
+        cumulative = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += cumulative
+        with self._lock:
+            self.imports.append((name, (cumulative - children) * 1e6, cumulative * 1e6, len(stack)))
+
+    # ===== Phases =====
+
+    def mark(self, label):
+        """Record that a startup phase finished, as seconds since this module loaded"""
+        with self._lock:
+            self.marks.append((label, time.perf_counter() - _START))
+
+    def report(self, top=25):
+        """Text report: phase marks, then the slowest imports and an -X importtime style tree"""
+        with self._lock:
+            marks = list(self.marks)
+            imports = list(self.imports)
+        lines = ["=== Startup Phases (ms since profiler start) ==="]
+        previous = 0.0
+        for label, at in marks:
+            lines.append(f"{at * 1000:9.1f}  (+{(at - previous) * 1000:7.1f})  {label}")
+            previous = at
+
+        total_us = sum(self_us for _, self_us, _, _ in imports)
+        lines.append(f"\n=== Imports: {len(imports)} modules, {total_us / 1000:.1f} ms total ===")
+        lines.append(f"Top {top} by cumulative time:")
+        roots = sorted((i for i in imports if i[3] == 0), key=lambda i: i[2], reverse=True)
+        for name, self_us, cumulative_us, _ in roots[:top]:
+            lines.append(f"{cumulative_us / 1000:9.1f} ms  {name}")
+
+        lines.append("\nimport time: self [us] | cumulative | imported package")
+        for name, self_us, cumulative_us, depth in imports:
+            lines.append(f"import time: {self_us:9.0f} | {cumulative_us:10.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+PROFILER = StartupProfiler()
+
+
+def install():
+    """Start timing imports; call before the imports you want to see"""
+    PROFILER.install()
+
+
+def mark(label):
+    PROFILER.mark(label)
+
+
+def report(top=25):
+    return PROFILER.report(top)
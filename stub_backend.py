@@ -0,0 +1,344 @@
+"""
+Stub AHK Backend - stand-in for the AHK daemon used by the benchmarks
+Description: Records every call and simulates the per-call round-trip cost of the real daemon
+"""
+
+import time
+from collections import Counter
+
+
+class StubAHK:
+    """Fake AHK object that counts daemon round-trips instead of injecting input"""
+
+    def __init__(self, latency=0.0002, char_latency=0.0):
+        self.latency = latency
+        # Extra cost per injected keystroke (the target app processing each key)
+        self.char_latency = char_latency
+        self.calls = Counter()
+        self.sent_chars = 0
+        self.clipboard = ""
+        self.pasted = []
+        self.hotkey_callbacks = {}
+        # WindowInfo tuples describing the fake desktop, front-most first
+        self.desktop = []
+
+    @property
+    def round_trips(self):
+        """Total number of calls made into the fake daemon"""
+        return sum(self.calls.values())
+
+    def reset(self):
+        """Forget all recorded calls"""
+        self.calls.clear()
+        self.sent_chars = 0
+
+    def _call(self, name):
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _keys(self, s):
+        self.sent_chars += len(s)
+        if self.char_latency:
+            time.sleep(len(s) * self.char_latency)
+
+    def send(self, s, *, raw=False, key_delay=None, key_press_duration=None,
+             send_mode=None, blocking=True):
+        if s == "^v" and not raw:
+            self.pasted.append(self.clipboard)
+        else:
+            self._keys(s)
+        self._call("send")
+
+    def send_input(self, s, *, blocking=True):
+        self._keys(s)
+        self._call("send_input")
+
+    def type(self, s, *, blocking=True):
+        self._keys(s)
+        self._call("type")
+
+    def get_clipboard(self, *, blocking=True):
+        self._call("get_clipboard")
+        return self.clipboard
+
+    def set_clipboard(self, s, *, blocking=True):
+        self._call("set_clipboard")
+        self.clipboard = s
+
+    def get_clipboard_all(self, *, blocking=True):
+        self._call("get_clipboard_all")
+        return self.clipboard.encode("utf-8")
+
+    def set_clipboard_all(self, contents, *, blocking=True):
+        self._call("set_clipboard_all")
+        self.clipboard = contents.decode("utf-8")
+
+    def clip_wait(self, timeout=None, wait_for_any_data=False, *, blocking=True):
+        self._call("clip_wait")
+
+    def win_get_process_name(self, title="", *, blocking=True):
+        """Process of the front-most desktop window (the only title understood is "A")"""
+        self._call("win_get_process_name")
+        return self.desktop[0].process if self.desktop else None
+
+    def run_script(self, script_text_or_path, *, blocking=True, timeout=None):
+        self._call("run_script")
+        if "WinGet, ids, List" in script_text_or_path:
+            from window_registry import format_window_list
+            return format_window_list(self.desktop)
+        return ""
+
+    def windows(self, *, blocking=True):
+        self._call("windows")
+        return [StubWindow(self, info) for info in self.desktop]
+
+    def click(self, x=None, y=None, button=None, click_count=None, direction=None, *,
+              relative=None, blocking=True, coord_mode=None, send_mode=None):
+        self._call("click")
+
+    # Hotkeys live in one resident process; any change restarts it
+    def add_hotkey(self, keyname, callback, ex_handler=None):
+        self.hotkey_callbacks[keyname] = callback
+        self._call("add_hotkey")
+
+    def remove_hotkey(self, keyname):
+        self.hotkey_callbacks.pop(keyname, None)
+        self._call("remove_hotkey")
+
+    def start_hotkeys(self):
+        self._call("start_hotkeys")
+
+    def stop_hotkeys(self):
+        self._call("stop_hotkeys")
+
+    def trigger_hotkey(self, keyname):
+        """Simulate the hotkey process firing `keyname`"""
+        self.hotkey_callbacks[keyname]()
+
+
+class StubWindow:
+    """Window handle whose every property read is a daemon round-trip"""
+
+    def __init__(self, ahk, info):
+        self._ahk = ahk
+        self._info = info
+
+    @property
+    def title(self):
+        self._ahk._call("win_get_title")
+        return self._info.title
+
+
+class StubEventLoop:
+    """Single-threaded timer loop with Tk's after() semantics, for headless benchmarks"""
+
+    def __init__(self):
+        import threading
+        self._timers = []
+        self._seq = 0
+        self._wake = threading.Condition()
+
+    def after(self, ms, fn, *args):
+        """Schedule `fn(*args)` in `ms` milliseconds; safe to call from any thread"""
+        import heapq
+        with self._wake:
+            self._seq += 1
+            heapq.heappush(self._timers, (time.perf_counter() + ms / 1000, self._seq, fn, args))
+            self._wake.notify()
+
+    def run(self, seconds):
+        """Run callbacks in due order on this thread for `seconds`"""
+        import heapq
+        end = time.perf_counter() + seconds
+        while True:
+            with self._wake:
+                now = time.perf_counter()
+                if now >= end:
+                    return
+                if not self._timers or self._timers[0][0] > now:
+                    due = self._timers[0][0] if self._timers else end
+                    self._wake.wait(min(due, end) - now)
+                    continue
+                _, _, fn, args = heapq.heappop(self._timers)
+            fn(*args)
+
+
+class StubTextWidget:
+    """Tk Text stand-in for headless benchmarks: keeps the lines, counts widget calls
+
+    Only the index forms the GUI uses are understood: "end", "end-1c", "1.0" and "N.0".
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.calls = 0
+
+    def insert(self, index, text):
+        self.calls += 1
+        if self.lines and not self.lines[-1].endswith("\n"):
+            text = self.lines.pop() + text
+        self.lines.extend(text.splitlines(keepends=True))
+
+    def delete(self, first, last=None):
+        self.calls += 1
+        if last == "end":
+            self.lines.clear()
+        else:
+            del self.lines[:int(last.split(".")[0]) - 1]
+
+    def index(self, index):
+        self.calls += 1
+        return f"{len(self.lines) + 1}.0"
+
+    def see(self, index):
+        self.calls += 1
+
+
+class StubClipboard:
+    """In-memory clipboard with pyperclip's paste/copy and a Windows-style change counter"""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.sequence_number = 1
+
+    def paste(self):
+        return self.text
+
+    def copy(self, text):
+        self.text = text
+        self.sequence_number += 1
+
+    def sequence(self):
+        return self.sequence_number
+
+
+class StubInputBackend:
+    """Input backend that timestamps every injected event instead of sending it"""
+
+    def __init__(self):
+        self.events = []
+
+    def move(self, x, y):
+        self.events.append((time.perf_counter_ns(), "move", x, y))
+
+    def button(self, x, y, button, down):
+        self.events.append((time.perf_counter_ns(), "down" if down else "up", x, y, button))
+
+    def scroll(self, x, y, amount, horizontal=False):
+        self.events.append((time.perf_counter_ns(), "hscroll" if horizontal else "scroll", x, y, amount))
+
+    def key(self, name, down):
+        self.events.append((time.perf_counter_ns(), "key_down" if down else "key_up", name))
+
+
+class SyntheticScreen:
+    """Fake desktop whose grabs copy the requested area out of a random RGB frame"""
+
+    def __init__(self, width=1920, height=1080, seed=0, latency=0.0):
+        import numpy as np
+        self.pixels = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        self.latency = latency
+        self.grabs = 0
+
+    def grab(self, bbox=None):
+        self.grabs += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if bbox is None:
+            return self.pixels.copy()
+        left, top, right, bottom = bbox
+        return self.pixels[top:bottom, left:right].copy()
+
+
+class SyntheticProcessTable:
+    """Fake process table with psutil.process_iter's interface (proc.info dicts)"""
+
+    NAMES = ["chrome.exe", "svchost.exe", "code.exe", "python.exe", "conhost.exe",
+             "explorer.exe", "RuntimeBroker.exe", "node.exe", "msedge.exe", "java.exe"]
+
+    def __init__(self, count=2000, seed=0):
+        import random
+        from collections import namedtuple
+        self._rng = random.Random(seed)
+        self._times = namedtuple("pcputimes", "user system")
+        self._memory = namedtuple("pmem", "rss vms")
+        self._next_pid = 4
+        self.procs = {}
+        for _ in range(count):
+            self._spawn()
+
+    def _spawn(self):
+        rng = self._rng
+        pid = self._next_pid
+        self._next_pid += 4
+        name = rng.choice(self.NAMES)
+        if rng.random() < 0.3:
+            name = f"app{pid}.exe"
+        self.procs[pid] = {"pid": pid, "name": name, "create_time": 1.7e9 + pid,
+                           "user": rng.random() * 100, "system": rng.random() * 10,
+                           "rss": rng.randint(1, 800) * 1024 * 1024}
+
+    def churn(self, started=10, exited=10):
+        """Exit some processes, start new ones and burn a little CPU in the rest"""
+        for pid in self._rng.sample(sorted(self.procs), exited):
+            del self.procs[pid]
+        for _ in range(started):
+            self._spawn()
+        for proc in self.procs.values():
+            proc["user"] += self._rng.random() * 0.05
+
+    def process_iter(self, attrs=None):
+        for proc in list(self.procs.values()):
+            yield _SyntheticProcess({
+                "pid": proc["pid"], "name": proc["name"], "create_time": proc["create_time"],
+                "cpu_times": self._times(proc["user"], proc["system"]),
+                "memory_info": self._memory(proc["rss"], proc["rss"] * 2),
+            })
+
+
+class _SyntheticProcess:
+    def __init__(self, info):
+        self.info = info
+
+
+# A tiny interpreter for the handful of AHK v1 commands the script benchmarks use:
+# FileAppend to * (stdout) or ** (stderr), Sleep, ExitApp and single-line Loop
+_STUB_INTERPRETER = r'''
+import sys, time
+script = sys.argv[1] if len(sys.argv) > 1 else "*"
+lines = (sys.stdin.read() if script == "*" else open(script, encoding="utf-8").read()).splitlines()
+
+def run(line, index):
+    cmd, _, args = line.strip().partition(",")
+    args = [a.strip() for a in args.split(",")] if args else []
+    if cmd == "FileAppend":
+        text = args[0].replace("%A_Index%", str(index)).replace("`n", "\n")
+        (sys.stderr if args[1:] == ["**"] else sys.stdout).write(text)
+    elif cmd == "Sleep":
+        sys.stdout.flush()
+        time.sleep(int(args[0]) / 1000)
+    elif cmd == "ExitApp":
+        sys.stdout.flush()
+        sys.exit(int(args[0]) if args else 0)
+
+i = 0
+while i < len(lines):
+    cmd, _, count = lines[i].strip().partition(",")
+    if cmd == "Loop" and i + 1 < len(lines):
+        for n in range(1, int(count) + 1):
+            run(lines[i + 1], n)
+        i += 2
+        continue
+    run(lines[i], 0)
+    i += 1
+'''
+
+
+def stub_script_command():
+    """Interpreter argv that stands in for `AutoHotkey.exe /ErrorStdOut *`
+
+    Like AutoHotkey, "*" reads the script from stdin; a path in its place runs that file.
+    """
+    import sys
+    return [sys.executable, "-c", _STUB_INTERPRETER, "*"]
@@ -0,0 +1,215 @@
+"""
+System Monitor - continuous CPU, memory, disk and network sampling for the System tab
+Description: Samples psutil counters on a background thread into fixed-size NumPy
+ring buffers and answers min/avg/max/p95 over recent time windows; the per-process
+top-N comes from the shared ProcessIndex instead of a second process walk
+"""
+
+import threading
+import time
+
+import numpy as np
+import psutil
+
+DEFAULT_RATE_HZ = 10.0
+DEFAULT_HISTORY_S = 600
+# Memory and I/O counters move slowly and cost the most to read; sample them every Nth tick
+SLOW_EVERY = 5
+STAT_WINDOWS = {"10s": 10, "1m": 60, "5m": 300, "10m": 600}
+SERIES = ("cpu", "memory", "disk_read", "disk_write", "net_sent", "net_recv")
+UNITS = {"cpu": "%", "memory": "%", "disk_read": "B/s", "disk_write": "B/s",
+         "net_sent": "B/s", "net_recv": "B/s"}
+
+
+class RingBuffer:
+    """Fixed-capacity (time, values...) samples; old samples are overwritten in place"""
+
+    def __init__(self, capacity, width=1):
+        self.capacity = capacity
+        self.width = width
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros((capacity, width), dtype=np.float32)
+        self.count = 0
+        self._next = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, t, values):
+        self.times[self._next] = t
+        self.values[self._next] = values
+        self._next = (self._next + 1) % self.capacity
+        self.count += 1
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[(self._next - 1) % self.capacity]
+
+    def window(self, seconds=None, now=None):
+        """(times, values) of samples in the last `seconds`, oldest first (copies)"""
+        n = len(self)
+        if not n:
+            return self.times[:0].copy(), self.values[:0].copy()
+        order = np.arange(self._next - n, self._next) % self.capacity
+        times = self.times[order]
+        values = self.values[order]
+        if seconds is not None:
+            now = times[-1] if now is None else now
+            start = np.searchsorted(times, now - seconds, side="left")
+            times, values = times[start:], values[start:]
+        return times, values
+
+    def stats(self, seconds=None):
+        """Per-column min/avg/max/p95 over the last `seconds`"""
+        _, values = self.window(seconds)
+        if not len(values):
+            zero = np.zeros(self.width)
+            return {"min": zero, "avg": zero, "max": zero, "p95": zero, "samples": 0}
+        return {"min": values.min(axis=0), "avg": values.mean(axis=0), "max": values.max(axis=0),
+                "p95": np.percentile(values, 95, axis=0), "samples": len(values)}
+
+
+class SystemMonitor:
+    """Background sampler of system-wide counters into ring buffers"""
+
+    def __init__(self, rate_hz=DEFAULT_RATE_HZ, history_s=DEFAULT_HISTORY_S, process_index=None,
+                 top_n=5, slow_every=SLOW_EVERY):
+        self.rate_hz = rate_hz
+        self.slow_every = max(1, slow_every)
+        self.process_index = process_index
+        self.top_n = top_n
+        capacity = int(rate_hz * history_s)
+        self.cores = psutil.cpu_count() or 1
+        self.series = {name: RingBuffer(capacity) for name in SERIES}
+        self.cpu_cores = RingBuffer(capacity, self.cores)
+        self.samples = 0
+        self.errors = 0
+        self.sample_cpu_s = 0.0
+        self.started_at = None
+        self._last_io = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        # Prime the cpu_percent delta so the first real sample is meaningful
+        psutil.cpu_percent(percpu=True)
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self.sample_cpu_s = 0.0
+        self._thread = threading.Thread(target=self._run, name="SystemMonitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(1.0)
+
+    def _io_counters(self):
+        # nowrap=False skips psutil's wraparound bookkeeping; sample() clamps
+        # negative deltas itself, which is all a rate needs
+        disk = psutil.disk_io_counters(nowrap=False)
+        net = psutil.net_io_counters(nowrap=False)
+        return (disk.read_bytes if disk else 0, disk.write_bytes if disk else 0,
+                net.bytes_sent if net else 0, net.bytes_recv if net else 0)
+
+    def sample(self, now=None):
+        """Take one sample of the CPU series, and of the slow series every `slow_every` calls"""
+        now = time.monotonic() if now is None else now
+        cores = psutil.cpu_percent(percpu=True)
+        self.cpu_cores.append(now, cores)
+        self.series["cpu"].append(now, sum(cores) / len(cores))
+
+        if self.samples % self.slow_every == 0:
+            io = self._io_counters()
+            if self._last_io is not None:
+                elapsed = now - self._last_io[0]
+                if elapsed > 0:
+                    rates = [max(0, cur - prev) / elapsed for cur, prev in zip(io, self._last_io[1])]
+                    for name, rate in zip(("disk_read", "disk_write", "net_sent", "net_recv"), rates):
+                        self.series[name].append(now, rate)
+            self._last_io = (now, io)
+            self.series["memory"].append(now, psutil.virtual_memory().percent)
+        self.samples += 1
+
+    def stats(self, window="1m"):
+        """{series: {min, avg, max, p95}} over a window name from STAT_WINDOWS or seconds"""
+        seconds = STAT_WINDOWS.get(window, window)
+        result = {}
+        for name, ring in self.series.items():
+            s = ring.stats(seconds)
+            result[name] = {k: (float(v[0]) if k != "samples" else v) for k, v in s.items()}
+        return result
+
+    def history(self, name, seconds=None):
+        """Values of one series (or 'cores' for the per-core matrix) over the last `seconds`"""
+        ring = self.cpu_cores if name == "cores" else self.series[name]
+        _, values = ring.window(seconds)
+        return values if name == "cores" else values[:, 0]
+
+    def top_processes(self, key="cpu"):
+        """Top-N processes by cpu or rss from the process index's latest snapshot"""
+        if self.process_index is None or not self.process_index.ready:
+            return []
+        return self.process_index.sorted_processes(key, descending=True)[:self.top_n]
+
+    @property
+    def overhead_percent(self):
+        """CPU time spent sampling as a percentage of one core since start()"""
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        return self.sample_cpu_s / elapsed * 100 if elapsed > 0 else 0.0
+
+    def _run(self):
+        interval = 1.0 / self.rate_hz
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            cpu_start = time.thread_time()
+            try:
+                self.sample()
+            except Exception as e:
+                self.errors += 1
+                print(f"Error sampling system counters: {e}")
+            self.sample_cpu_s += time.thread_time() - cpu_start
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                next_tick = time.perf_counter()
+                delay = 0
+            self._stop.wait(delay)
+
+
+def format_rate(value):
+    """Bytes per second as a short human-readable string"""
+    for unit in ("B/s", "KB/s", "MB/s", "GB/s"):
+        if value < 1024 or unit == "GB/s":
+            return f"{value:.0f} {unit}" if unit == "B/s" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def benchmark(seconds=10.0, rate_hz=DEFAULT_RATE_HZ):
+    """Sampling overhead at `rate_hz` (target: under 1% of one core) and stats cost"""
+    monitor = SystemMonitor(rate_hz=rate_hz)
+    monitor.start()
+    time.sleep(seconds)
+    monitor.stop()
+
+    start = time.perf_counter()
+    for window in STAT_WINDOWS:
+        monitor.stats(window)
+    stats_ms = (time.perf_counter() - start) * 1000 / len(STAT_WINDOWS)
+
+    return {"samples": monitor.samples, "achieved_hz": monitor.samples / seconds,
+            "per_sample_us": monitor.sample_cpu_s / max(1, monitor.samples) * 1e6,
+            "overhead_percent": monitor.overhead_percent, "stats_ms": stats_ms}
+
+
+if __name__ == "__main__":
+    print(benchmark())
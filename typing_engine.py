@@ -0,0 +1,328 @@
+"""
+Typing Engine - batched text injection for the Python AHK GUI
+Description: Sends text through one long-lived worker in chunked AHK Send calls,
+with the per-key delay applied inside AHK (SetKeyDelay) instead of Python sleeps;
+large payloads are pasted through the clipboard (saved and restored) instead of
+being typed key by key
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+DEFAULT_CHUNK_SIZE = 512
+# Longest a single chunk may keep AHK busy, so cancellation is noticed quickly
+CANCEL_LATENCY_MS = 250
+
+# Send modes: "auto" pastes payloads of PASTE_THRESHOLD chars or more unless the
+# target is known not to take Ctrl+V
+MODE_AUTO = "auto"
+MODE_TYPE = "type"
+MODE_PASTE = "paste"
+SEND_MODES = (MODE_AUTO, MODE_TYPE, MODE_PASTE)
+PASTE_THRESHOLD = 2000
+# Terminals and remote/VM viewers where Ctrl+V is a keystroke, not a paste
+TYPE_ONLY_PROCESSES = frozenset({"putty.exe", "kitty.exe", "mintty.exe", "mstsc.exe",
+                                 "vmconnect.exe", "vncviewer.exe", "vmware.exe", "virtualbox.exe"})
+CLIP_WAIT_S = 2
+# How long the target gets to read the clipboard after Ctrl+V before it is restored
+PASTE_SETTLE_MS = 50
+PASTE_SETTLE_MS_PER_MB = 200
+PASTE_SETTLE_MAX_MS = 2000
+
+
+def paste_settle_ms(chars):
+    """Wait after Ctrl+V before restoring the clipboard, longer for bigger payloads"""
+    return min(PASTE_SETTLE_MAX_MS, PASTE_SETTLE_MS + PASTE_SETTLE_MS_PER_MB * chars // (1024 * 1024))
+
+
+def split_chunks(text, size):
+    """Split text into pieces of at most `size` characters"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class ClipboardUnavailable(Exception):
+    """The clipboard could not be saved or set, so a paste was not attempted"""
+
+
+class TypingJob:
+    """A block of text queued for typing, with its progress"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, text, delay_ms=0, mode=MODE_AUTO):
+        if mode not in SEND_MODES:
+            raise ValueError(f"Unknown send mode: {mode}")
+        self.id = next(self._ids)
+        self.text = text
+        self.delay_ms = max(0, int(delay_ms))
+        self.mode = mode
+        # "type" or "paste" once the worker has picked one
+        self.method = None
+        self.sent = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def total(self):
+        return len(self.text)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def cancel(self):
+        """Stop the job before its next chunk is sent"""
+        self._cancelled.set()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes, fails or is cancelled"""
+        return self._done.wait(timeout)
+
+
+class TypingEngine:
+    """Single worker thread that types queued jobs in batched AHK calls"""
+
+    def __init__(self, ahk, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None,
+                 paste_threshold=PASTE_THRESHOLD, type_only_processes=TYPE_ONLY_PROCESSES):
+        self.ahk = ahk
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.paste_threshold = paste_threshold
+        self.type_only_processes = type_only_processes
+        self.current = None
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def submit(self, text, delay_ms=0, mode=MODE_AUTO):
+        """Queue text for typing (or pasting, see `mode`) and return its TypingJob"""
+        job = TypingJob(text, delay_ms, mode)
+        self._ensure_worker()
+        self._queue.put(job)
+        return job
+
+    def pending(self):
+        """Number of jobs waiting behind the current one"""
+        return self._queue.qsize()
+
+    def cancel_all(self):
+        """Cancel the running job and everything queued behind it"""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            job.cancel()
+            self._finish(job)
+        job = self.current
+        if job:
+            job.cancel()
+
+    def shutdown(self, timeout=1.0):
+        """Cancel all work and stop the worker thread"""
+        self._stopping = True
+        self.cancel_all()
+        self._queue.put(None)
+        if self._worker:
+            self._worker.join(timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping = False
+                self._worker = threading.Thread(target=self._run, name="TypingEngine",
+                                                daemon=True)
+                self._worker.start()
+
+    def _chunk_size_for(self, delay_ms):
+        if not delay_ms:
+            return self.chunk_size
+        return max(1, min(self.chunk_size, CANCEL_LATENCY_MS // delay_ms))
+
+    def _run(self):
+        while not self._stopping:
+            job = self._queue.get()
+            if job is None:
+                break
+            if job.cancelled:
+                self._finish(job)
+                continue
+            self.current = job
+            try:
+                self._type_job(job)
+            except Exception as e:
+                job.error = e
+            finally:
+                self.current = None
+                self._finish(job)
+
+    def choose_method(self, job):
+        """"type" or "paste" for a job, looking at the active window only for large payloads"""
+        if job.mode != MODE_AUTO:
+            return job.mode
+        # A per-key delay asks for visible typing
+        if job.delay_ms or job.total < self.paste_threshold:
+            return MODE_TYPE
+        try:
+            process = self.ahk.win_get_process_name(title="A")
+        except Exception:
+            process = None
+        if process and process.lower() in self.type_only_processes:
+            return MODE_TYPE
+        return MODE_PASTE
+
+    def _type_job(self, job):
+        job.started_at = time.perf_counter()
+        job.method = self.choose_method(job)
+        if job.method == MODE_PASTE:
+            try:
+                self._paste_job(job)
+                return
+            except ClipboardUnavailable as e:
+                print(f"Pasting failed, typing instead: {e}")
+                job.method = MODE_TYPE
+        size = self._chunk_size_for(job.delay_ms)
+        for chunk in split_chunks(job.text, size):
+            if job.cancelled:
+                break
+            self._send_chunk(chunk, job.delay_ms)
+            job.sent += len(chunk)
+            self._notify(job)
+
+    def _paste_job(self, job):
+        """Put the text on the clipboard, send Ctrl+V, then put the old clipboard back
+
+        Raises ClipboardUnavailable if the text never reached the clipboard,
+        in which case nothing was sent and the job can still be typed.
+        """
+        try:
+            saved = self.ahk.get_clipboard_all()
+            self.ahk.set_clipboard(job.text)
+            self.ahk.clip_wait(CLIP_WAIT_S)
+        except Exception as e:
+            raise ClipboardUnavailable(e) from e
+        try:
+            if job.cancelled:
+                return
+            self.ahk.send("^v")
+            # Ctrl+V only posts the request; the target reads the clipboard when it gets to it
+            time.sleep(paste_settle_ms(job.total) / 1000)
+            job.sent = job.total
+            self._notify(job)
+        finally:
+            if saved:
+                self.ahk.set_clipboard_all(saved)
+            else:
+                self.ahk.set_clipboard("")
+
+    def _send_chunk(self, chunk, delay_ms):
+        if delay_ms:
+            # SendInput ignores SetKeyDelay, so delayed typing uses Event mode
+            self.ahk.send(chunk, raw=True, key_delay=delay_ms, send_mode="Event")
+        else:
+            self.ahk.send(chunk, raw=True, send_mode="Input")
+
+    def _finish(self, job):
+        job.finished_at = time.perf_counter()
+        job._done.set()
+        self._notify(job)
+
+    def _notify(self, job):
+        if self.on_progress:
+            try:
+                self.on_progress(job)
+            except Exception as e:
+                print(f"Error in typing progress callback: {e}")
+
+
+def benchmark(sizes=(1024, 100 * 1024), latency=0.0002):
+    """Compare per-character typing with the batched engine on a stub backend"""
+    from stub_backend import StubAHK
+
+    results = []
+    for size in sizes:
+        text = ("The quick brown fox jumps over the lazy dog. " * (size // 45 + 1))[:size]
+
+        stub = StubAHK(latency=latency)
+        start = time.perf_counter()
+        for char in text:
+            stub.type(char)
+            time.sleep(0)
+        legacy_time = time.perf_counter() - start
+        legacy_trips = stub.round_trips
+
+        stub = StubAHK(latency=latency)
+        engine = TypingEngine(stub)
+        start = time.perf_counter()
+        engine.submit(text, mode=MODE_TYPE).wait()
+        engine_time = time.perf_counter() - start
+        engine.shutdown()
+
+        results.append({
+            "size": size,
+            "legacy_round_trips": legacy_trips,
+            "legacy_seconds": legacy_time,
+            "engine_round_trips": stub.round_trips,
+            "engine_seconds": engine_time,
+        })
+    return results
+
+
+def benchmark_paste(sizes=(256, 1024, 2048, 4096, 16 * 1024, 64 * 1024), large=(1024 * 1024, 4 * 1024 * 1024),
+                    latency=0.0002, char_latency=0.00005):
+    """Typed vs pasted send time per payload size, to place PASTE_THRESHOLD
+
+    The stub charges `char_latency` per typed key (50 us, ~20k keys/s, which
+    puts a few MB at minutes as with real SendInput into an editor); pasting
+    costs its round-trips plus the settle wait. Payloads in `large` are only
+    pasted, their typed time is extrapolated from the largest typed size.
+    """
+    from stub_backend import StubAHK
+
+    results = []
+    per_char = None
+    for size in sorted(sizes + large):
+        text = ("The quick brown fox jumps over the lazy dog. " * (size // 45 + 1))[:size]
+        row = {"size": size}
+        modes = (MODE_PASTE,) if size in large else (MODE_TYPE, MODE_PASTE)
+        for mode in modes:
+            stub = StubAHK(latency=latency, char_latency=char_latency)
+            stub.clipboard = "saved"
+            engine = TypingEngine(stub)
+            start = time.perf_counter()
+            engine.submit(text, mode=mode).wait()
+            row[f"{mode}_seconds"] = time.perf_counter() - start
+            engine.shutdown()
+            if mode == MODE_PASTE:
+                row["clipboard_restored"] = stub.clipboard == "saved" and stub.pasted == [text]
+        if MODE_TYPE + "_seconds" in row:
+            per_char = row["type_seconds"] / size
+        else:
+            row["type_seconds"] = per_char * size
+            row["type_estimated"] = True
+        results.append(row)
+    crossover = next((r["size"] for r in results if r["paste_seconds"] < r["type_seconds"]), None)
+    return {"rows": results, "crossover_chars": crossover, "paste_threshold": PASTE_THRESHOLD}
+
+
+if __name__ == "__main__":
+    for r in benchmark():
+        print(f"{r['size'] // 1024:>4} KB  per-char: {r['legacy_round_trips']:>7} calls "
+              f"{r['legacy_seconds']:8.3f}s  |  engine: {r['engine_round_trips']:>5} calls "
+              f"{r['engine_seconds']:8.3f}s")
+    paste = benchmark_paste()
+    for r in paste["rows"]:
+        estimated = " (estimated)" if r.get("type_estimated") else ""
+        print(f"{r['size']:>8} chars  typed {r['type_seconds']:9.3f}s{estimated:<12}  "
+              f"pasted {r['paste_seconds']:7.3f}s  restored={r['clipboard_restored']}")
+    print(f"crossover: {paste['crossover_chars']} chars (PASTE_THRESHOLD={paste['paste_threshold']})")
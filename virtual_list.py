@@ -0,0 +1,144 @@
+"""
+Virtual List - scrollable list widget that only draws the rows in view
+Description: Canvas-backed list for large row counts; rows are fetched on demand
+through a callback, so the cost of a redraw depends on the visible height only
+"""
+
+import tkinter as tk
+
+import customtkinter as ctk
+
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualList(ctk.CTkFrame):
+    """List of `count` rows whose text comes from `get_row(index)`
+
+    Only the rows currently in view exist as canvas items; scrolling re-fills
+    that fixed pool instead of creating widgets, so a million rows cost the same
+    to display as fifty.
+    """
+
+    def __init__(self, master, get_row, count=0, on_select=None, on_activate=None,
+                 row_height=DEFAULT_ROW_HEIGHT, height=200, font=("Consolas", 11), **kwargs):
+        super().__init__(master, **kwargs)
+        self.get_row = get_row
+        self.count = count
+        self.on_select = on_select
+        self.on_activate = on_activate
+        self.row_height = row_height
+        self.font = font
+        self.top = 0
+        self.selected = None
+        self._items = []
+        self._highlight = None
+
+        self.text_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkLabel"]["text_color"])
+        self.select_color = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkButton"]["fg_color"])
+        background = self._apply_appearance_mode(ctk.ThemeManager.theme["CTkTextbox"]["fg_color"])
+
+        self.canvas = tk.Canvas(self, height=height, bg=background, highlightthickness=0, bd=0)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll(3))
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+
+    @property
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def set_count(self, count, follow=False):
+        """Change the number of rows; with `follow` keep the last row in view"""
+        self.count = count
+        if self.selected is not None and self.selected >= count:
+            self.selected = None
+        if follow:
+            self.top = max(0, count - self.visible_rows)
+        self.redraw()
+
+    def scroll(self, rows):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, top):
+        self.top = max(0, min(int(top), self.count - self.visible_rows))
+        self.redraw()
+
+    def see(self, index):
+        """Scroll just enough to bring row `index` into view"""
+        if index < self.top:
+            self.scroll_to(index)
+        elif index >= self.top + self.visible_rows:
+            self.scroll_to(index - self.visible_rows + 1)
+
+    def select(self, index):
+        self.selected = index
+        if index is not None:
+            self.see(index)
+        self.redraw()
+
+    def yview(self, *args):
+        """Scrollbar protocol: 'moveto fraction' or 'scroll n units|pages'"""
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.count)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self.visible_rows if args[2] == "pages" else step)
+
+    def _fractions(self):
+        if not self.count:
+            return 0.0, 1.0
+        return self.top / self.count, min(1.0, (self.top + self.visible_rows) / self.count)
+
+    def redraw(self):
+        """Re-fill the on-screen rows from `get_row`"""
+        rows = self.visible_rows
+        self.top = max(0, min(self.top, self.count - rows))
+        width = self.canvas.winfo_width()
+
+        while len(self._items) < rows:
+            y = len(self._items) * self.row_height
+            self._items.append(self.canvas.create_text(6, y + self.row_height // 2, anchor="w",
+                                                       font=self.font, fill=self.text_color))
+        if self._highlight is None:
+            self._highlight = self.canvas.create_rectangle(0, 0, 0, 0, width=0,
+                                                           fill=self.select_color, state="hidden")
+            self.canvas.tag_lower(self._highlight)
+
+        for slot, item in enumerate(self._items):
+            index = self.top + slot
+            text = self.get_row(index) if slot < rows and index < self.count else ""
+            self.canvas.itemconfigure(item, text=text)
+
+        if self.selected is not None and self.top <= self.selected < self.top + rows:
+            y = (self.selected - self.top) * self.row_height
+            self.canvas.coords(self._highlight, 0, y, width, y + self.row_height)
+            self.canvas.itemconfigure(self._highlight, state="normal")
+        else:
+            self.canvas.itemconfigure(self._highlight, state="hidden")
+        self.scrollbar.set(*self._fractions())
+
+    def _row_at(self, event):
+        index = self.top + event.y // self.row_height
+        return index if index < self.count else None
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_click(self, event):
+        index = self._row_at(event)
+        self.select(index)
+        if index is not None and self.on_select:
+            self.on_select(index)
+
+    def _on_double_click(self, event):
+        index = self._row_at(event)
+        if index is not None and self.on_activate:
+            self.on_activate(index)
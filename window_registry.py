@@ -0,0 +1,284 @@
+"""
+Window Registry - indexed window cache for the Windows tab
+Description: Fetches every top-level window's handle, title, class, process and
+geometry in one batched AHK script run, keeps them indexed by hwnd, title and
+process, and refreshes by diffing against the previous snapshot
+"""
+
+import re
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_TTL = 1.0
+FIELD_SEP = "\t"
+
+WindowInfo = namedtuple("WindowInfo", "hwnd title cls pid process x y width height minmax visible")
+
+# One script run instead of one daemon round-trip per window and property.
+# Tabs and newlines in titles are flattened so each window is exactly one line.
+WINDOW_LIST_SCRIPT = r"""
+#NoTrayIcon
+DetectHiddenWindows, On
+WinGet, ids, List
+out := ""
+Loop, %ids%
+{
+    hwnd := ids%A_Index%
+    WinGetTitle, title, ahk_id %hwnd%
+    WinGetClass, cls, ahk_id %hwnd%
+    WinGet, pid, PID, ahk_id %hwnd%
+    WinGet, proc, ProcessName, ahk_id %hwnd%
+    WinGet, mm, MinMax, ahk_id %hwnd%
+    WinGet, style, Style, ahk_id %hwnd%
+    WinGetPos, x, y, w, h, ahk_id %hwnd%
+    title := StrReplace(StrReplace(StrReplace(title, "`t", " "), "`r", " "), "`n", " ")
+    visible := (style & 0x10000000) ? 1 : 0
+    out .= hwnd "`t" pid "`t" x "`t" y "`t" w "`t" h "`t" mm "`t" visible "`t" cls "`t" proc "`t" title "`n"
+}
+FileAppend, %out%, *, UTF-8
+"""
+
+
+def _int(text):
+    try:
+        return int(text)
+    except ValueError:
+        return 0
+
+
+def parse_window_list(output):
+    """WindowInfo tuples from the output of WINDOW_LIST_SCRIPT, in z-order"""
+    windows = []
+    for line in output.splitlines():
+        parts = line.split(FIELD_SEP, 10)
+        if len(parts) < 11:
+            continue
+        hwnd, pid, x, y, w, h, mm, visible, cls, process, title = parts
+        windows.append(WindowInfo(hwnd.lower(), title, cls, _int(pid), process,
+                                  _int(x), _int(y), _int(w), _int(h), _int(mm), visible == "1"))
+    return windows
+
+
+def format_window_list(windows):
+    """Inverse of parse_window_list (used by the stub backend)"""
+    return "".join(FIELD_SEP.join(str(v) for v in (
+        w.hwnd, w.pid, w.x, w.y, w.width, w.height, w.minmax, int(w.visible),
+        w.cls, w.process, w.title)) + "\n" for w in windows)
+
+
+class WindowDiff:
+    """What changed between two snapshots"""
+
+    def __init__(self, added=(), removed=(), changed=()):
+        self.added = list(added)
+        self.removed = list(removed)
+        self.changed = list(changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return f"WindowDiff(+{len(self.added)} -{len(self.removed)} ~{len(self.changed)})"
+
+
+class WindowRegistry:
+    """Snapshot of all windows with lookup indexes, refreshed incrementally
+
+    Query syntax for `find`/`resolve` (first match wins):
+        "ahk_id 0x1234"     window handle
+        "ahk_exe app.exe"   process name
+        "ahk_class Notepad" window class
+        "re:pattern"        case-insensitive regex on the title
+        anything else       exact title, then case-insensitive substring
+    """
+
+    def __init__(self, ahk, ttl=DEFAULT_TTL, query=None):
+        self.ahk = ahk
+        self.ttl = ttl
+        self._query = query or (lambda: ahk.run_script(WINDOW_LIST_SCRIPT))
+        self._lock = threading.Lock()
+        self.by_hwnd = {}
+        self.by_title = {}
+        self.by_process = {}
+        self.by_class = {}
+        self._lower_titles = {}
+        self.order = []
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self.last_refresh_ms = 0.0
+        self.last_diff = WindowDiff()
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def stale(self):
+        return time.monotonic() - self.refreshed_at > self.ttl
+
+    def refresh(self):
+        """Re-query all windows and update the indexes for what changed"""
+        start = time.perf_counter()
+        snapshot = parse_window_list(self._query() or "")
+        with self._lock:
+            diff = self._apply(snapshot)
+            self.refreshed_at = time.monotonic()
+            self.refreshes += 1
+            self.last_diff = diff
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        return diff
+
+    def _index(self, info):
+        self.by_title.setdefault(info.title, []).append(info.hwnd)
+        self.by_process.setdefault(info.process.lower(), []).append(info.hwnd)
+        self.by_class.setdefault(info.cls, []).append(info.hwnd)
+        self._lower_titles[info.hwnd] = info.title.lower()
+
+    def _unindex(self, info):
+        for index, key in ((self.by_title, info.title), (self.by_process, info.process.lower()),
+                           (self.by_class, info.cls)):
+            hwnds = index.get(key)
+            if hwnds:
+                hwnds.remove(info.hwnd)
+                if not hwnds:
+                    del index[key]
+        self._lower_titles.pop(info.hwnd, None)
+
+    def _apply(self, snapshot):
+        current = {info.hwnd: info for info in snapshot}
+        added, changed = [], []
+        for hwnd, info in current.items():
+            old = self.by_hwnd.get(hwnd)
+            if old is None:
+                added.append(info)
+            elif old != info:
+                changed.append(info)
+        removed = [info for hwnd, info in self.by_hwnd.items() if hwnd not in current]
+
+        for info in removed:
+            self._unindex(info)
+            del self.by_hwnd[info.hwnd]
+        for info in changed:
+            old = self.by_hwnd[info.hwnd]
+            # Geometry-only changes leave the lookup indexes alone
+            if (old.title, old.process, old.cls) != (info.title, info.process, info.cls):
+                self._unindex(old)
+                self._index(info)
+            self.by_hwnd[info.hwnd] = info
+        for info in added:
+            self.by_hwnd[info.hwnd] = info
+            self._index(info)
+        self.order = [info.hwnd for info in snapshot]
+        return WindowDiff(added, removed, changed)
+
+    def windows(self, visible_only=True):
+        """WindowInfo for every window in z-order"""
+        with self._lock:
+            infos = [self.by_hwnd[hwnd] for hwnd in self.order]
+        if visible_only:
+            infos = [w for w in infos if w.visible and w.title]
+        return infos
+
+    def find(self, query, visible_only=False):
+        """All windows matching `query` (see class docstring), in z-order"""
+        query = query.strip()
+        if not query:
+            return []
+        with self._lock:
+            lowered = query.lower()
+            if lowered.startswith("ahk_id "):
+                hwnd = lowered[7:].strip()
+                if not hwnd.startswith("0x"):
+                    hwnd = hex(_int(hwnd))
+                hwnds = [hwnd] if hwnd in self.by_hwnd else []
+            elif lowered.startswith("ahk_exe "):
+                hwnds = list(self.by_process.get(lowered[8:].strip(), ()))
+            elif lowered.startswith("ahk_class "):
+                hwnds = list(self.by_class.get(query[10:].strip(), ()))
+            elif query.startswith("re:"):
+                pattern = re.compile(query[3:], re.IGNORECASE)
+                hwnds = [hwnd for hwnd in self.order if pattern.search(self.by_hwnd[hwnd].title)]
+            else:
+                hwnds = list(self.by_title.get(query, ()))
+                if not hwnds:
+                    hwnds = [hwnd for hwnd in self.order if lowered in self._lower_titles[hwnd]]
+            infos = [self.by_hwnd[hwnd] for hwnd in hwnds]
+        if visible_only:
+            infos = [w for w in infos if w.visible]
+        # Index lists are in insertion order; present matches front-most first
+        rank = {hwnd: i for i, hwnd in enumerate(self.order)} if len(infos) > 1 else {}
+        return sorted(infos, key=lambda w: rank.get(w.hwnd, 0))
+
+    def resolve(self, query, visible_only=False):
+        """Front-most window matching `query`, refreshing first if the snapshot is stale
+
+        A miss on a fresh snapshot triggers one more refresh, so windows opened
+        since the last refresh are still found.
+        """
+        if self.stale:
+            self.refresh()
+            return next(iter(self.find(query, visible_only)), None)
+        match = next(iter(self.find(query, visible_only)), None)
+        if match is None:
+            self.refresh()
+            match = next(iter(self.find(query, visible_only)), None)
+        return match
+
+    def window(self, info):
+        """ahk Window object for a WindowInfo, without another lookup"""
+        from ahk import Window
+        return Window(engine=self.ahk, ahk_id=info.hwnd)
+
+    def invalidate(self):
+        """Force the next resolve to refresh (e.g. after moving or closing a window)"""
+        self.refreshed_at = 0.0
+
+
+def benchmark(windows=400, lookups=200, latency=0.0002):
+    """Per-window AHK calls vs one batched script run, and indexed vs linear lookups"""
+    import random
+    from stub_backend import StubAHK
+
+    rng = random.Random(0)
+    stub = StubAHK(latency=latency)
+    procs = ["chrome.exe", "explorer.exe", "code.exe", "notepad.exe", "slack.exe"]
+    stub.desktop = [WindowInfo(hex(0x10000 + i * 4), f"Window {i} - {rng.choice(procs)[:-4]}",
+                               "AppClass", 1000 + i % 50, rng.choice(procs),
+                               i, i, 800, 600, 0, True) for i in range(windows)]
+
+    stub.reset()
+    start = time.perf_counter()
+    titles = [w.title for w in stub.windows()]
+    legacy_ms = (time.perf_counter() - start) * 1000
+    legacy_trips = stub.round_trips
+
+    registry = WindowRegistry(stub)
+    stub.reset()
+    start = time.perf_counter()
+    registry.refresh()
+    batched_ms = (time.perf_counter() - start) * 1000
+    batched_trips = stub.round_trips
+
+    # Incremental refresh: a few windows open, close and move
+    stub.desktop = stub.desktop[3:] + [stub.desktop[0]._replace(hwnd="0xfffff")]
+    stub.desktop[5] = stub.desktop[5]._replace(x=500)
+    diff = registry.refresh()
+
+    wanted = [rng.choice(titles) for _ in range(lookups)]
+    start = time.perf_counter()
+    for title in wanted:
+        next((w for w in stub.desktop if w.title == title), None)
+    linear_us = (time.perf_counter() - start) * 1e6 / lookups
+    start = time.perf_counter()
+    for title in wanted:
+        registry.find(title)
+    indexed_us = (time.perf_counter() - start) * 1e6 / lookups
+
+    return {"windows": windows, "legacy_ms": legacy_ms, "legacy_round_trips": legacy_trips,
+            "batched_ms": batched_ms, "batched_round_trips": batched_trips,
+            "incremental_diff": repr(diff), "linear_lookup_us": linear_us,
+            "indexed_lookup_us": indexed_us}
+
+
+if __name__ == "__main__":
+    print(benchmark())